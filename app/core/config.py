@@ -11,15 +11,89 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALLOWED_HOSTS: List[str] = ["*"]  # Configure properly for production
     
-    # Database (for future use)
+    # Database (SQLite file holding background jobs and the calculation history)
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./tbm_calculator.db")
     
-    # Logging
+    # Logging (records go through a bounded queue; LOG_SAMPLING is "logger=rate,...")
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    LOG_SAMPLING: str = os.getenv("LOG_SAMPLING", "")
     
     # Model parameters
     MODEL_VERSION: str = "1.0"
     
+    # Trained regression coefficients (written by train_regression.py, reloaded when the file changes)
+    REGRESSION_MODEL_PATH: str = os.getenv("REGRESSION_MODEL_PATH", f"models/regression_v{MODEL_VERSION}.json")
+    REGRESSION_RELOAD_INTERVAL: float = float(os.getenv("REGRESSION_RELOAD_INTERVAL", "5"))
+    
+    # Per-project coefficient calibration (versioned sets and online RLS state under CALIBRATION_DIR)
+    CALIBRATION_DIR: str = os.getenv("CALIBRATION_DIR", "models/calibration")
+    CALIBRATION_FORGETTING: float = float(os.getenv("CALIBRATION_FORGETTING", "1.0"))
+    CALIBRATION_PRIOR_WEIGHT: float = float(os.getenv("CALIBRATION_PRIOR_WEIGHT", "20"))
+    CALIBRATION_RELOAD_INTERVAL: float = float(os.getenv("CALIBRATION_RELOAD_INTERVAL", "5"))
+    
+    # Batch calculation
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "10000"))
+    BATCH_CHUNK_SIZE: int = int(os.getenv("BATCH_CHUNK_SIZE", "500"))
+    
+    # Result cache (size 0 disables; 0 significant digits keeps keys exact)
+    RESULT_CACHE_SIZE: int = int(os.getenv("RESULT_CACHE_SIZE", "4096"))
+    RESULT_CACHE_TTL: float = float(os.getenv("RESULT_CACHE_TTL", "300"))
+    RESULT_CACHE_SIGNIFICANT_DIGITS: int = int(os.getenv("RESULT_CACHE_SIGNIFICANT_DIGITS", "0"))
+    
+    # Shared result store for all workers on a host (empty path disables it)
+    SHARED_CACHE_PATH: str = os.getenv("SHARED_CACHE_PATH", "")
+    SHARED_CACHE_MAX_ENTRIES: int = int(os.getenv("SHARED_CACHE_MAX_ENTRIES", "200000"))
+    SHARED_CACHE_TTL: float = float(os.getenv("SHARED_CACHE_TTL", "86400"))
+    
+    # Surrogate grid (built offline with build_surrogate.py)
+    SURROGATE_GRID_PATH: str = os.getenv("SURROGATE_GRID_PATH", "models/surrogate_grid.npy")
+    
+    # Telemetry ingest
+    TELEMETRY_CHUNK_SIZE: int = int(os.getenv("TELEMETRY_CHUNK_SIZE", "10000"))
+    
+    # Live telemetry WebSocket (connections per worker; idle ones are closed after the timeout in seconds)
+    LIVE_MAX_CONNECTIONS: int = int(os.getenv("LIVE_MAX_CONNECTIONS", "1000"))
+    LIVE_IDLE_TIMEOUT: float = float(os.getenv("LIVE_IDLE_TIMEOUT", "300"))
+    
+    # Monte Carlo simulation (0 workers uses every CPU, 1 runs in-process)
+    MONTE_CARLO_WORKERS: int = int(os.getenv("MONTE_CARLO_WORKERS", "0"))
+    MONTE_CARLO_CHUNK_SIZE: int = int(os.getenv("MONTE_CARLO_CHUNK_SIZE", "50000"))
+    MONTE_CARLO_MAX_SAMPLES: int = int(os.getenv("MONTE_CARLO_MAX_SAMPLES", "5000000"))
+    
+    # Background jobs (worker threads per process; running jobs without a heartbeat for
+    # JOB_LEASE_TIMEOUT seconds are requeued, finished ones are deleted after JOB_RESULT_TTL)
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_MAX_QUEUED: int = int(os.getenv("JOB_MAX_QUEUED", "1000"))
+    JOB_BATCH_MAX_ITEMS: int = int(os.getenv("JOB_BATCH_MAX_ITEMS", "500000"))
+    JOB_LEASE_TIMEOUT: float = float(os.getenv("JOB_LEASE_TIMEOUT", "60"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+    JOB_RESULT_TTL: float = float(os.getenv("JOB_RESULT_TTL", "604800"))
+    
+    # Calculation history (buffered in memory, written in one transaction per HISTORY_FLUSH_SIZE
+    # rows at least every HISTORY_FLUSH_INTERVAL seconds; the oldest are dropped when the buffer is full)
+    HISTORY_ENABLED: bool = os.getenv("HISTORY_ENABLED", "True").lower() == "true"
+    HISTORY_BUFFER_SIZE: int = int(os.getenv("HISTORY_BUFFER_SIZE", "100000"))
+    HISTORY_FLUSH_SIZE: int = int(os.getenv("HISTORY_FLUSH_SIZE", "5000"))
+    HISTORY_FLUSH_INTERVAL: float = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1"))
+    
+    # Browser/proxy cache lifetime of the static metadata endpoints (seconds)
+    METADATA_CACHE_MAX_AGE: int = int(os.getenv("METADATA_CACHE_MAX_AGE", "3600"))
+    
+    # Browser cache lifetime of /static assets (0 always revalidates with the ETag)
+    STATIC_CACHE_MAX_AGE: int = int(os.getenv("STATIC_CACHE_MAX_AGE", "0"))
+    
+    # Prometheus /metrics (a directory shared by all workers aggregates their snapshots)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    METRICS_DIR: str = os.getenv("METRICS_DIR", "")
+    METRICS_FLUSH_INTERVAL: float = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+    
+    # Per-request profiling via ?profile= or X-Profile (reports saved to PROFILE_DIR when set)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "True").lower() == "true"
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "")
+    
     # Monitoring (optional fields)
     SENTRY_DSN: Optional[str] = None
     MONITORING_ENABLED: bool = False
@@ -0,0 +1,28 @@
+import sqlite3
+from pathlib import Path
+
+SQLITE_PREFIX = "sqlite:///"
+
+def sqlite_path(url: str) -> str:
+    """File path of a ``sqlite:///`` DATABASE_URL
+
+    ``sqlite:///./tbm.db`` is relative to the working directory and
+    ``sqlite:////var/lib/tbm.db`` is absolute. Raises ValueError for other
+    URLs.
+    """
+    if not url.startswith(SQLITE_PREFIX) or len(url) == len(SQLITE_PREFIX):
+        raise ValueError(f"DATABASE_URL must be a sqlite:///<path> URL, got {url!r}")
+    return url[len(SQLITE_PREFIX):]
+
+def connect(path: str, busy_timeout: float = 5.0) -> sqlite3.Connection:
+    """Autocommit connection in WAL mode, so readers never wait for the writer
+
+    Callers group writes with ``BEGIN IMMEDIATE`` ... ``COMMIT``. A
+    connection must stay on the thread that opened it.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
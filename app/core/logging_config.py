@@ -1,24 +1,178 @@
-import logging
 import sys
+import json
+import math
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from app.core.config import settings
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and any ``extra`` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fixed fraction of the records of each logger
+
+    ``rates`` maps logger names to the fraction kept (0-1). A rate applies
+    to the logger and its children, the most specific name wins and other
+    loggers keep everything. Sampling is deterministic: at 0.1 the first
+    record and then every tenth one pass. WARNING and above always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = {name: min(max(float(rate), 0.0), 1.0) for name, rate in rates.items()}
+        self.sampled_out = 0
+        self._resolved: Dict[str, float] = {}
+        self._seen: Dict[str, int] = {}
+
+    def rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            matches = [prefix for prefix in self.rates if name == prefix or name.startswith(prefix + ".")]
+            rate = self.rates[max(matches, key=len)] if matches else 1.0
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0:
+            return True
+
+        # Keep the record whenever the running quota ceil(seen * rate) goes up
+        seen = self._seen.get(record.name, 0) + 1
+        self._seen[record.name] = seen
+        if math.ceil(round(seen * rate, 9)) > math.ceil(round((seen - 1) * rate, 9)):
+            return True
+        self.sampled_out += 1
+        return False
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks the caller
+
+    Records are queued unformatted (``%`` arguments are only merged by the
+    listener thread) and dropped, counted in ``dropped``, once ``capacity``
+    records are waiting. ``on_drop`` is called for every dropped record.
+    The queue is a lock-free SimpleQueue, so concurrent callers may
+    overshoot the capacity by a few records.
+    """
+
+    def __init__(self, capacity: int, on_drop: Optional[Callable[[], None]] = None):
+        super().__init__(queue.SimpleQueue())
+        self.capacity = capacity
+        self.on_drop = on_drop
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.queue.qsize() >= self.capacity:
+            self.dropped += 1
+            if self.on_drop is not None:
+                self.on_drop()
+            return
+        self.queue.put_nowait(record)
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued": self.queue.qsize(), "capacity": self.capacity, "dropped": self.dropped}
+
+def parse_sampling_rates(value: str) -> Dict[str, float]:
+    """``"app.services.calculator=0.1,app.routers=0.5"`` as a logger -> rate mapping"""
+    rates = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, separator, rate = item.partition("=")
+        if not separator or not name.strip():
+            raise ValueError(f"Invalid log sampling entry {item.strip()!r}, expected logger=rate")
+        rates[name.strip()] = float(rate)
+    return rates
+
+# Installed by setup_logging
+queue_handler: Optional[BoundedQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging(on_drop: Optional[Callable[[], None]] = None) -> BoundedQueueHandler:
+    """Configure logging for the application
+
+    Loggers only put records on a bounded in-memory queue; a listener
+    thread formats them (JSON unless LOG_FORMAT=text) and writes them to
+    logs/app.log and stdout, so request handlers never wait on disk or
+    terminal I/O. Records of loggers listed in LOG_SAMPLING are sampled
+    before they are queued.
+    """
+    global queue_handler, _listener
 
-def setup_logging():
-    """Configure logging for the application"""
-    
     # Create logs directory if it doesn't exist
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
-    
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(log_dir / "app.log"),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-    
+
+    formatter = logging.Formatter(TEXT_FORMAT) if settings.LOG_FORMAT == "text" else JsonFormatter()
+    handlers = [logging.FileHandler(log_dir / "app.log"), logging.StreamHandler(sys.stdout)]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    root = logging.getLogger()
+    if queue_handler is not None:
+        stop_logging()
+        root.removeHandler(queue_handler)
+
+    queue_handler = BoundedQueueHandler(settings.LOG_QUEUE_SIZE, on_drop)
+    queue_handler.addFilter(SamplingFilter(parse_sampling_rates(settings.LOG_SAMPLING)))
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    # Skip record fields no formatter here uses (caller frame lookup, thread
+    # and process names); they make up about half of each logging call
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
     # Set specific loggers
     logging.getLogger("uvicorn").setLevel(logging.INFO)
-    logging.getLogger("fastapi").setLevel(logging.INFO)
\ No newline at end of file
+    logging.getLogger("fastapi").setLevel(logging.INFO)
+    return queue_handler
+
+def stop_logging():
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+# Flush whatever is still queued when the worker exits
+atexit.register(stop_logging)
@@ -0,0 +1,420 @@
+import os
+import json
+import math
+import functools
+import logging
+import threading
+from time import perf_counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Whole-request latency buckets (seconds)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Calculator stage latency buckets (seconds); single stages take microseconds
+STAGE_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 5e-3, 0.025, 0.1)
+
+# Predicted advance rate buckets (mm/min)
+ADVANCE_RATE_BUCKETS = (1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 25.0, 30.0, 40.0, 50.0, 75.0, 100.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Series updates take no lock: every read-modify-write below runs between
+# calls and backward jumps, the only points where CPython switches threads,
+# so concurrent updates cannot interleave. A lock would cost more than the
+# update itself.
+
+# Raw observations buffered per histogram series before they are bucketed
+PENDING_LIMIT = 1024
+
+class CounterSeries:
+    """Monotonic counter for one label value combination"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+class HistogramSeries:
+    """Bucketed observations for one label value combination
+
+    ``observe`` only appends the raw value (~0.1 µs); values are bucketed in
+    bulk once PENDING_LIMIT are buffered or when a snapshot is taken.
+    ``counts`` holds per-bucket (not cumulative) counts with the +Inf bucket
+    last; cumulative counts are only built when exporting.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "_pending")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._pending: List[float] = []
+
+    def observe(self, value: float):
+        pending = self._pending
+        pending.append(value)
+        if len(pending) >= PENDING_LIMIT:
+            self._fold()
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        self._fold()
+        # Count and sum may be one observation apart, as with any scrape
+        return list(self.counts), self.sum
+
+    def _fold(self):
+        pending = self._pending
+        values = pending[:]
+        del pending[:len(values)]
+        if not values:
+            return
+        indices = np.searchsorted(self.bounds, values, side="left")
+        for index, count in enumerate(np.bincount(indices, minlength=len(self.counts)).tolist()):
+            if count:
+                self.counts[index] += count
+        total = math.fsum(values)
+        self.sum += total
+
+class Metric:
+    """Family of series with the same name, one per label value combination
+
+    Label values must be strings; ``labels`` returns the (cached) series so
+    hot paths can look it up once and call ``inc``/``observe`` directly.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            with self._lock:
+                series = self._series.setdefault(values, self._new_series())
+        return series
+
+    def collect(self) -> Dict[str, Any]:
+        return {
+            "type": self.kind,
+            "help": self.documentation,
+            "label_names": list(self.label_names),
+            "series": [[list(labels), *self._snapshot(series)] for labels, series in list(self._series.items())]
+        }
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def _snapshot(self, series) -> list:
+        raise NotImplementedError
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_series(self) -> CounterSeries:
+        return CounterSeries()
+
+    def _snapshot(self, series: CounterSeries) -> list:
+        return [series.snapshot()]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = REQUEST_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+
+    def collect(self) -> Dict[str, Any]:
+        return {**super().collect(), "buckets": list(self.buckets)}
+
+    def _new_series(self) -> HistogramSeries:
+        return HistogramSeries(self.buckets)
+
+    def _snapshot(self, series: HistogramSeries) -> list:
+        return list(series.snapshot())
+
+class MetricsRegistry:
+    """Metrics of this process, collected into a JSON-serializable snapshot"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = REQUEST_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        return {name: metric.collect() for name, metric in self._metrics.items()}
+
+class MetricsExporter:
+    """Prometheus exposition of the metrics of every worker process
+
+    With a ``directory`` (shared by all uvicorn workers of the host) each
+    worker writes its snapshot to ``metrics-<pid>.json`` every
+    ``flush_interval`` seconds and on shutdown; a scrape, whichever worker
+    serves it, sums those files with its own live values. Files of exited
+    workers are kept so counters never go backwards, which means the
+    directory must be emptied before the server starts (``run.py`` does
+    this, and the Docker image starts through it). Without a directory
+    only the serving worker's metrics are shown.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: str = "", flush_interval: float = 5.0):
+        self.registry = registry
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def path(self) -> Optional[Path]:
+        # Looked up per call: forked workers must not share their parent's file
+        return self.directory / f"metrics-{os.getpid()}.json" if self.directory else None
+
+    def start(self):
+        """Start periodic flushing (no-op without a directory)"""
+        if self.directory is None or self._thread is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._flush_periodically, name="metrics-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop flushing and write the final snapshot"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def flush(self):
+        path = self.path
+        if path is None:
+            return
+        try:
+            temporary = path.with_name(path.name + ".tmp")
+            temporary.write_text(json.dumps(self.registry.collect()))
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.warning("Could not write metrics snapshot %s: %s", path, e)
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """Live metrics of this process merged with the other workers' snapshots"""
+        snapshots = [self.registry.collect()]
+        if self.directory is not None and self.directory.is_dir():
+            own = self.path
+            for path in sorted(self.directory.glob("metrics-*.json")):
+                if path == own:
+                    continue
+                try:
+                    snapshots.append(json.loads(path.read_text()))
+                except (OSError, ValueError) as e:
+                    logger.warning("Skipping unreadable metrics snapshot %s: %s", path, e)
+        return merge_snapshots(snapshots)
+
+    def exposition(self) -> str:
+        return render(self.collect())
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+def reset_directory(directory: str):
+    """Remove snapshots left by a previous server run"""
+    if not directory:
+        return
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for snapshot in path.glob("metrics-*.json*"):
+        snapshot.unlink(missing_ok=True)
+
+def merge_snapshots(snapshots: Sequence[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Sum series with the same metric name and labels across snapshots"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = {**metric, "series": {}}
+            elif target["type"] != metric["type"] or target.get("buckets") != metric.get("buckets"):
+                logger.warning("Skipping incompatible snapshot of metric %s", name)
+                continue
+
+            series = target["series"]
+            for labels, *values in metric["series"]:
+                key = tuple(labels)
+                if key not in series:
+                    series[key] = [list(value) if isinstance(value, list) else value for value in values]
+                elif metric["type"] == "histogram":
+                    counts, total = values
+                    series[key][0] = [a + b for a, b in zip(series[key][0], counts)]
+                    series[key][1] += total
+                else:
+                    series[key][0] += values[0]
+
+    for metric in merged.values():
+        metric["series"] = [[list(labels), *values] for labels, values in sorted(metric["series"].items())]
+    return merged
+
+def render(snapshot: Dict[str, Dict[str, Any]]) -> str:
+    """Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    for name, metric in sorted(snapshot.items()):
+        lines.append(f"# HELP {name} {_escape_help(metric['help'])}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        label_names = metric["label_names"]
+        for labels, *values in metric["series"]:
+            pairs = list(zip(label_names, labels))
+            if metric["type"] == "histogram":
+                counts, total = values
+                cumulative = 0
+                for bound, count in zip(metric["buckets"] + ["+Inf"], counts):
+                    cumulative += count
+                    le = bound if isinstance(bound, str) else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(pairs + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(pairs)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(pairs)} {cumulative}")
+            else:
+                lines.append(f"{name}{_format_labels(pairs)} {_format_value(values[0])}")
+    return "\n".join(lines) + "\n"
+
+def _format_labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+def timed(method: Callable, series: Any) -> Callable:
+    """``method`` wrapped to pass each call's duration to ``series.observe``"""
+    observe = series.observe
+
+    @functools.wraps(method)
+    def timed_method(*args, **kwargs):
+        start = perf_counter()
+        result = method(*args, **kwargs)
+        observe(perf_counter() - start)
+        return result
+
+    return timed_method
+
+def instrument_methods(target: Any, methods: Dict[str, str], histogram: Histogram):
+    """Time ``target``'s methods into ``histogram``, labelled by stage name
+
+    ``methods`` maps stage label to method name. The wrappers are instance
+    attributes, so other instances of the class stay uninstrumented.
+    """
+    for stage, method_name in methods.items():
+        method = getattr(target, method_name)
+        method = getattr(method, "__wrapped__", method)
+        setattr(target, method_name, timed(method, histogram.labels(stage)))
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests and timing them per route
+
+    Requests are labelled with the route template (``/api/v1/calculate``,
+    ``/static/{path:path}``), never the raw path, so label cardinality stays
+    bounded; unmatched paths share the ``<unmatched>`` label. Streaming
+    responses are timed until their last body chunk has been sent.
+    """
+
+    def __init__(self, app, requests: Counter, latency: Histogram):
+        self.app = app
+        self.requests = requests
+        self.latency = latency
+        self._route_paths: Dict[Any, str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = self._route_path(scope)
+            self.latency.labels(scope["method"], route).observe(perf_counter() - start)
+            self.requests.labels(scope["method"], route, str(status)).inc()
+
+    def _route_path(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "<unmatched>"
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            for route in getattr(scope.get("app"), "routes", ()):
+                if getattr(route, "endpoint", None) is not None:
+                    self._route_paths.setdefault(route.endpoint, route.path)
+            path = self._route_paths.setdefault(endpoint, "<unmatched>")
+        return path
+
+# Process-wide registry and the metrics recorded by the API
+registry = MetricsRegistry()
+exporter = MetricsExporter(registry, settings.METRICS_DIR, settings.METRICS_FLUSH_INTERVAL)
+
+http_requests = registry.counter(
+    "tbm_http_requests_total", "HTTP requests by method, route template and status code",
+    ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "tbm_http_request_duration_seconds", "HTTP request latency by method and route template",
+    ("method", "route"), REQUEST_BUCKETS
+)
+calculator_stage_duration = registry.histogram(
+    "tbm_calculator_stage_duration_seconds",
+    "Time spent in calculator stages (empirical, theoretical, regression, risk_factors) and result serialization",
+    ("stage",), STAGE_BUCKETS
+)
+log_records_dropped = registry.counter(
+    "tbm_log_records_dropped_total", "Log records dropped because the logging queue was full"
+)
+predicted_advance_rate = registry.histogram(
+    "tbm_predicted_advance_rate_mm_per_min", "Predicted advance rate returned to clients by soil type",
+    ("soil_type",), ADVANCE_RATE_BUCKETS
+)
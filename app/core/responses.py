@@ -0,0 +1,121 @@
+import gzip
+import json
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are kept
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_LENGTH = 256
+
+class PrecomputedResponse:
+    """Response body encoded once and served from memory
+
+    The body is serialized and compressed (gzip, plus brotli when the
+    ``brotli`` package is installed) at construction time. Each
+    representation has its own strong ETag. ``respond`` picks the best
+    encoding the client accepts and answers ``If-None-Match`` (or, without
+    it, ``If-Modified-Since``) with 304 Not Modified.
+    """
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str = "no-cache",
+                 last_modified: Optional[float] = None):
+        self.body = body
+        self.media_type = media_type
+        self.last_modified = int(last_modified) if last_modified is not None else None
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+
+        # Compressed variants in order of preference
+        self.variants: Dict[str, Tuple[bytes, str]] = {}
+        if len(body) >= GZIP_MIN_LENGTH:
+            candidates = {}
+            if brotli is not None:
+                candidates["br"] = brotli.compress(body, quality=11)
+            candidates["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            for encoding, compressed in candidates.items():
+                if len(compressed) < len(body):
+                    self.variants[encoding] = (compressed, f'"{digest}-{encoding}"')
+
+        self.headers = {"Cache-Control": cache_control}
+        if self.variants:
+            self.headers["Vary"] = "Accept-Encoding"
+        if self.last_modified is not None:
+            self.headers["Last-Modified"] = formatdate(self.last_modified, usegmt=True)
+
+    @property
+    def gzipped(self) -> Optional[bytes]:
+        variant = self.variants.get("gzip")
+        return variant[0] if variant else None
+
+    @classmethod
+    def json(cls, payload: Any, cache_control: str = "no-cache") -> "PrecomputedResponse":
+        """Compact JSON encoding of ``payload`` (enums, models and dates included)"""
+        body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode()
+        return cls(body, "application/json", cache_control)
+
+    def respond(self, request: Request) -> Response:
+        accept_encoding = request.headers.get("accept-encoding", "")
+        encoding = next((name for name in self.variants if accepts_encoding(accept_encoding, name)), None)
+        body, etag = self.variants[encoding] if encoding else (self.body, self.etag)
+        headers = {**self.headers, "ETag": etag}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            all_etags = (self.etag,) + tuple(tag for _, tag in self.variants.values())
+            if etag_matches(if_none_match, all_etags):
+                return Response(status_code=304, headers=headers)
+        elif self._not_modified_since(request.headers.get("if-modified-since")):
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(body, media_type=self.media_type, headers=headers)
+
+    def _not_modified_since(self, if_modified_since: Optional[str]) -> bool:
+        if self.last_modified is None or not if_modified_since:
+            return False
+        try:
+            return self.last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows ``encoding`` (q=0 refuses it)"""
+    wildcard = False
+    for coding in accept_encoding.lower().split(","):
+        name, _, params = coding.strip().partition(";")
+        name = name.strip()
+        if name not in (encoding, "*"):
+            continue
+        quality = params.strip()
+        allowed = not (quality.startswith("q=") and _is_zero(quality[2:]))
+        if name == encoding:
+            return allowed
+        wildcard = allowed
+    return wildcard
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    return accepts_encoding(accept_encoding, "gzip")
+
+def etag_matches(if_none_match: Optional[str], etags: tuple) -> bool:
+    """If-None-Match check using weak comparison, as RFC 9110 requires"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return any(etag in candidates for etag in etags if etag)
+
+def _is_zero(value: str) -> bool:
+    try:
+        return float(value) == 0
+    except ValueError:
+        return False
@@ -0,0 +1,73 @@
+import os
+import logging
+import mimetypes
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.core.responses import PrecomputedResponse
+
+logger = logging.getLogger(__name__)
+
+# Non text/* types that still need an explicit charset (Starlette adds it for text/*)
+TEXT_MEDIA_TYPES = ("application/javascript", "application/json", "image/svg+xml")
+
+class StaticAssets:
+    """Static files held in memory with precompressed variants
+
+    Every file under ``directory`` is read and compressed once at startup
+    and served as a PrecomputedResponse (ETag, Last-Modified, gzip/brotli
+    negotiation). With ``reload`` set (debug mode) a file is re-read when
+    its mtime changes and new files are picked up; otherwise the disk is
+    never touched after startup.
+    """
+
+    def __init__(self, directory: str, reload: bool = False, cache_control: str = "no-cache"):
+        self.directory = Path(directory).resolve()
+        self.reload = reload
+        self.cache_control = cache_control
+        self._assets: Dict[str, Tuple[float, PrecomputedResponse]] = {}
+        for path in sorted(self.directory.rglob("*")):
+            if path.is_file():
+                self._load(path.relative_to(self.directory).as_posix())
+        logger.info("Loaded %s static assets from %s", len(self._assets), self.directory)
+
+    def get(self, name: str) -> Optional[PrecomputedResponse]:
+        asset = self._assets.get(name)
+        if self.reload:
+            try:
+                mtime = self._path(name).stat().st_mtime
+            except (OSError, ValueError):
+                return None
+            if asset is None or asset[0] != mtime:
+                return self._load(name)
+        return asset[1] if asset else None
+
+    def respond(self, request: Request, name: str) -> Response:
+        asset = self.get(name)
+        if asset is None:
+            return Response("Not Found", status_code=404, media_type="text/plain")
+        return asset.respond(request)
+
+    def _path(self, name: str) -> Path:
+        path = (self.directory / name).resolve()
+        if self.directory not in path.parents:
+            raise ValueError(f"{name} is outside the static directory")
+        return path
+
+    def _load(self, name: str) -> Optional[PrecomputedResponse]:
+        path = self._path(name)
+        try:
+            mtime = os.stat(path).st_mtime
+            body = path.read_bytes()
+        except OSError:
+            self._assets.pop(name, None)
+            return None
+
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if media_type.startswith(TEXT_MEDIA_TYPES):
+            media_type += "; charset=utf-8"
+        response = PrecomputedResponse(body, media_type, self.cache_control, last_modified=mtime)
+        self._assets[name] = (mtime, response)
+        return response
@@ -1,24 +1,37 @@
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
-from app.routers import calculator, health
+from app.routers import calculator, health, telemetry, drive, calibration, live, jobs, history, metrics
 from app.core.config import settings
 from app.core.logging_config import setup_logging
+from app.core.static import StaticAssets
+from app.core.metrics import MetricsMiddleware, exporter, http_requests, http_request_duration, log_records_dropped
 
-# Setup logging
-setup_logging()
+# Setup logging (queued, written by a background thread)
+setup_logging(on_drop=log_records_dropped.labels().inc)
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting TBM Advance Rate Calculator API")
+    calculator.surrogate_service.load()
+    if settings.HISTORY_ENABLED:
+        history.history_recorder.start()
+    jobs.job_queue.start()
+    if settings.METRICS_ENABLED:
+        exporter.start()
     yield
     # Shutdown
     logger.info("Shutting down TBM Advance Rate Calculator API")
+    jobs.job_queue.stop()
+    # After the job queue: batch jobs record their results
+    history.history_recorder.stop()
+    calculator.monte_carlo_engine.shutdown()
+    if settings.METRICS_ENABLED:
+        exporter.stop()
 
 app = FastAPI(
     title="TBM Advance Rate Calculator",
@@ -38,18 +51,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+# Per-route request counters and latency histograms for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, requests=http_requests, latency=http_request_duration)
+
+# Static files, held in memory with precompressed variants (re-read on change in debug mode)
+static_assets = StaticAssets(
+    "app/static",
+    reload=settings.DEBUG,
+    cache_control=f"public, max-age={settings.STATIC_CACHE_MAX_AGE}" if settings.STATIC_CACHE_MAX_AGE else "no-cache"
+)
+
+@app.api_route("/static/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def static_file(request: Request, path: str):
+    """Serve a static asset from memory"""
+    return static_assets.respond(request, path)
 
 # Include routers
 app.include_router(health.router, prefix="/api/v1", tags=["health"])
 app.include_router(calculator.router, prefix="/api/v1", tags=["calculator"])
+app.include_router(telemetry.router, prefix="/api/v1", tags=["telemetry"])
+app.include_router(drive.router, prefix="/api/v1", tags=["drive"])
+app.include_router(calibration.router, prefix="/api/v1", tags=["calibration"])
+app.include_router(live.router, prefix="/api/v1", tags=["live"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
+app.include_router(history.router, prefix="/api/v1", tags=["history"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["metrics"])
 
 @app.get("/", response_class=HTMLResponse)
-async def root():
+async def root(request: Request):
     """Serve the main application page"""
-    with open("app/static/index.html", "r") as f:
-        return HTMLResponse(content=f.read())
+    return static_assets.respond(request, "index.html")
 
 if __name__ == "__main__":
     import uvicorn
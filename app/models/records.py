@@ -0,0 +1,111 @@
+from typing import Optional, Dict, Any, Tuple, Union
+
+from app.models.schemas import TBMParameters, SoilType, TBMType
+
+class ParameterRecord:
+    """Unvalidated TBM parameters for trusted internal callers
+
+    Has the same attributes as TBMParameters but skips pydantic validation
+    entirely, so building one costs about as much as a tuple. Use it for
+    values that were already validated at the HTTP edge or that are
+    generated within the schema bounds (simulators, optimizers, batch jobs).
+    ``soil_type``/``tbm_type`` may be enum members or their string values.
+    """
+
+    __slots__ = (
+        "tbm_diameter", "tbm_type", "cutterhead_power", "soil_type", "ucs", "rqd", "water_pressure",
+        "thrust_force", "cutterhead_speed", "chamber_pressure", "depth", "temperature"
+    )
+
+    def __init__(self, tbm_diameter: float, tbm_type: Union[TBMType, str], cutterhead_power: float,
+                 soil_type: Union[SoilType, str], thrust_force: float, cutterhead_speed: float, depth: float,
+                 ucs: Optional[float] = None, rqd: Optional[float] = None, water_pressure: float = 0.0,
+                 chamber_pressure: float = 0.0, temperature: float = 20.0):
+        self.tbm_diameter = tbm_diameter
+        self.tbm_type = tbm_type
+        self.cutterhead_power = cutterhead_power
+        self.soil_type = soil_type
+        self.ucs = ucs
+        self.rqd = rqd
+        self.water_pressure = water_pressure
+        self.thrust_force = thrust_force
+        self.cutterhead_speed = cutterhead_speed
+        self.chamber_pressure = chamber_pressure
+        self.depth = depth
+        self.temperature = temperature
+
+    @classmethod
+    def from_parameters(cls, params: TBMParameters) -> "ParameterRecord":
+        """Copy of an already validated TBMParameters"""
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(record, name, getattr(params, name))
+        return record
+
+    def to_parameters(self) -> TBMParameters:
+        """Validated TBMParameters with the same values"""
+        return TBMParameters(**self.as_dict())
+
+    def replace(self, **changes: Any) -> "ParameterRecord":
+        """Copy with some fields changed"""
+        record = ParameterRecord.__new__(ParameterRecord)
+        for name in self.__slots__:
+            setattr(record, name, changes.pop(name, getattr(self, name)))
+        if changes:
+            raise TypeError(f"Unknown parameter fields: {', '.join(changes)}")
+        return record
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ParameterRecord):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"ParameterRecord({fields})"
+
+class ResultRecord:
+    """Unrounded calculation result from the calculator's fast path"""
+
+    __slots__ = (
+        "advance_rate", "daily_advance", "penetration_rate", "specific_energy", "confidence_score", "risk_factors"
+    )
+
+    def __init__(self, advance_rate: float, daily_advance: float, penetration_rate: float,
+                 specific_energy: float, confidence_score: float, risk_factors: Optional[Dict[str, Any]] = None):
+        self.advance_rate = advance_rate
+        self.daily_advance = daily_advance
+        self.penetration_rate = penetration_rate
+        self.specific_energy = specific_energy
+        self.confidence_score = confidence_score
+        self.risk_factors = risk_factors
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"ResultRecord({fields})"
+
+class StagedResult:
+    """Fast path result with the stage outputs it was combined from
+
+    Returned by ``calculate_staged`` and ``recalculate``. Pass it back to
+    ``recalculate`` of the same calculator with changed parameters to rerun
+    only the stages that read them. ``recomputed`` names the stages this
+    result ran; ``stages`` is shared between results and never modified.
+    """
+
+    __slots__ = ("params", "stages", "record", "recomputed", "regression_fingerprint")
+
+    def __init__(self, params: Union[ParameterRecord, TBMParameters], stages: Dict[str, Any],
+                 record: ResultRecord, recomputed: Tuple[str, ...] = (),
+                 regression_fingerprint: Optional[tuple] = None):
+        self.params = params
+        self.stages = stages
+        self.record = record
+        self.recomputed = recomputed
+        self.regression_fingerprint = regression_fingerprint
+
+    def __repr__(self) -> str:
+        return f"StagedResult(recomputed={self.recomputed!r}, record={self.record!r})"
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, Dict, Any, List, Tuple, Type
+from datetime import datetime
 from enum import Enum
 
 class SoilType(str, Enum):
@@ -117,6 +118,35 @@ class TBMParameters(BaseModel):
                 raise ValueError('RQD is required for rock types')
         return v
 
+def field_bounds(model: Type[BaseModel] = TBMParameters) -> Dict[str, Tuple[float, float]]:
+    """Inclusive (ge, le) bounds declared on the numeric fields of a model"""
+    bounds = {}
+    for name, field in model.model_fields.items():
+        ge = next((m.ge for m in field.metadata if hasattr(m, 'ge')), None)
+        le = next((m.le for m in field.metadata if hasattr(m, 'le')), None)
+        if ge is not None and le is not None:
+            bounds[name] = (float(ge), float(le))
+    return bounds
+
+class TelemetryContext(BaseModel):
+    """Machine and ground parameters that apply to a whole telemetry log
+    
+    Operational fields left unset here must be supplied by log columns.
+    """
+    
+    tbm_diameter: float = Field(..., ge=1.0, le=20.0, description="TBM diameter in meters")
+    tbm_type: TBMType = Field(..., description="Type of TBM")
+    soil_type: SoilType = Field(..., description="Primary soil/rock type")
+    depth: float = Field(..., ge=1, le=200, description="Depth below surface in meters")
+    ucs: Optional[float] = Field(None, ge=0, le=300, description="Unconfined compressive strength in MPa")
+    rqd: Optional[float] = Field(None, ge=0, le=100, description="Rock Quality Designation (%)")
+    water_pressure: float = Field(0, ge=0, le=10, description="Water pressure in bar")
+    temperature: float = Field(20, ge=-10, le=60, description="Ground temperature in Celsius")
+    cutterhead_power: Optional[float] = Field(None, ge=100, le=10000, description="Cutterhead power in kW")
+    thrust_force: Optional[float] = Field(None, ge=100, le=50000, description="Thrust force in kN")
+    cutterhead_speed: Optional[float] = Field(None, ge=0.1, le=10.0, description="Cutterhead rotation speed in RPM")
+    chamber_pressure: float = Field(0, ge=0, le=10, description="Chamber pressure in bar")
+
 class AdvanceRateResult(BaseModel):
     """Result of advance rate calculation"""
     
@@ -151,6 +181,360 @@ class AdvanceRateResult(BaseModel):
         description="Method used for calculation"
     )
 
+class SurrogateResult(BaseModel):
+    """Advance rate metrics from the surrogate grid or an exact fallback"""
+    
+    advance_rate: float = Field(..., description="Predicted advance rate in mm/min")
+    daily_advance: float = Field(..., description="Daily advance in meters (assuming 20h operation)")
+    penetration_rate: float = Field(..., description="Penetration rate in mm/rev")
+    specific_energy: float = Field(..., description="Specific energy in kWh/m³")
+    confidence_score: float = Field(..., description="Confidence score of the prediction (0-1)")
+    source: str = Field(..., description="'surrogate' for interpolated values, 'exact' for a full calculation")
+    error_bound: Optional[Dict[str, float]] = Field(
+        None, 
+        description="Largest absolute interpolation error per metric measured for this soil/TBM pair"
+    )
+
+class FieldSensitivity(BaseModel):
+    """Local sensitivity of the outputs to one input"""
+    
+    field: str = Field(..., description="TBMParameters field name")
+    value: float = Field(..., description="Input value at which sensitivities were taken")
+    derivatives: Dict[str, float] = Field(..., description="Partial derivative of each output with respect to the field")
+    elasticities: Dict[str, float] = Field(..., description="Normalized sensitivity (dy/y)/(dx/x) of each output")
+
+class TornadoBar(BaseModel):
+    """Advance rate swing when one input is varied either way"""
+    
+    field: str
+    low_value: float
+    high_value: float
+    low_advance_rate: float
+    high_advance_rate: float
+    swing: float
+
+class SensitivityResult(BaseModel):
+    """Sensitivity analysis of advance rate, specific energy and confidence score"""
+    
+    base: Dict[str, float] = Field(..., description="Outputs at the given parameters")
+    sensitivities: List[FieldSensitivity] = Field(..., description="Per-field sensitivities, largest advance rate elasticity first")
+    tornado: List[TornadoBar] = Field(..., description="Tornado chart data, largest swing first")
+    evaluations: int = Field(..., description="Parameter sets evaluated in the batch")
+
+class ProfileMode(str, Enum):
+    STAGES = "stages"
+    CPROFILE = "cprofile"
+
+class DistributionKind(str, Enum):
+    NORMAL = "normal"
+    LOGNORMAL = "lognormal"
+    UNIFORM = "uniform"
+    TRIANGULAR = "triangular"
+
+class InputDistribution(BaseModel):
+    """Probability distribution of one uncertain input"""
+    
+    kind: DistributionKind = Field(..., description="Distribution family")
+    mean: Optional[float] = Field(None, description="Mean (normal, lognormal)")
+    std: Optional[float] = Field(None, gt=0, description="Standard deviation (normal, lognormal)")
+    low: Optional[float] = Field(None, description="Lower limit (uniform, triangular)")
+    high: Optional[float] = Field(None, description="Upper limit (uniform, triangular)")
+    mode: Optional[float] = Field(None, description="Most likely value (triangular)")
+    
+    @model_validator(mode='after')
+    def validate_parameters(self):
+        if self.kind in (DistributionKind.NORMAL, DistributionKind.LOGNORMAL):
+            if self.mean is None or self.std is None:
+                raise ValueError(f'{self.kind.value} distribution requires mean and std')
+            if self.kind == DistributionKind.LOGNORMAL and self.mean <= 0:
+                raise ValueError('lognormal distribution requires a positive mean')
+        else:
+            if self.low is None or self.high is None or self.low >= self.high:
+                raise ValueError(f'{self.kind.value} distribution requires low < high')
+            if self.kind == DistributionKind.TRIANGULAR and (self.mode is None or not self.low <= self.mode <= self.high):
+                raise ValueError('triangular distribution requires low <= mode <= high')
+        return self
+
+class MonteCarloRequest(BaseModel):
+    """Base parameters plus distributions for the uncertain inputs"""
+    
+    parameters: TBMParameters = Field(..., description="Base case; inputs without a distribution stay fixed")
+    distributions: Dict[str, InputDistribution] = Field(..., description="Distribution per numeric TBMParameters field")
+    samples: int = Field(100000, ge=100, description="Number of Monte Carlo samples")
+    seed: Optional[int] = Field(None, ge=0, description="Seed for reproducible results; a random one is reported if omitted")
+    bins: int = Field(50, ge=5, le=500, description="Histogram bins per output")
+    
+    @field_validator('distributions')
+    @classmethod
+    def validate_distribution_fields(cls, v):
+        unknown = set(v) - set(field_bounds())
+        if unknown:
+            raise ValueError(f'No distribution allowed for: {", ".join(sorted(unknown))}')
+        return v
+
+class OutputDistribution(BaseModel):
+    """Summary statistics and histogram of one simulated output"""
+    
+    mean: float
+    std: float
+    p10: float
+    p50: float
+    p90: float
+    histogram_edges: List[float] = Field(..., description="Bin edges, one more than the counts")
+    histogram_counts: List[int]
+
+class MonteCarloResult(BaseModel):
+    """Monte Carlo distributions of advance rate and daily advance"""
+    
+    samples: int
+    seed: int = Field(..., description="Seed that reproduces this result")
+    outputs: Dict[str, OutputDistribution] = Field(..., description="Distribution per output metric")
+
+class TBMMachine(BaseModel):
+    """Machine and operating parameters held constant over a drive"""
+    
+    tbm_diameter: float = Field(..., ge=1.0, le=20.0, description="TBM diameter in meters")
+    tbm_type: TBMType = Field(..., description="Type of TBM")
+    cutterhead_power: float = Field(..., ge=100, le=10000, description="Cutterhead power in kW")
+    thrust_force: float = Field(..., ge=100, le=50000, description="Thrust force in kN")
+    cutterhead_speed: float = Field(..., ge=0.1, le=10.0, description="Cutterhead rotation speed in RPM")
+    chamber_pressure: float = Field(0, ge=0, le=10, description="Chamber pressure in bar")
+    temperature: float = Field(20, ge=-10, le=60, description="Ground temperature in Celsius")
+
+class AlignmentSegment(BaseModel):
+    """Stretch of the alignment with uniform ground conditions"""
+    
+    start_chainage: float = Field(..., ge=0, description="Segment start chainage in meters")
+    end_chainage: float = Field(..., description="Segment end chainage in meters")
+    soil_type: SoilType = Field(..., description="Primary soil/rock type")
+    ucs: Optional[float] = Field(None, ge=0, le=300, description="Unconfined compressive strength in MPa")
+    rqd: Optional[float] = Field(None, ge=0, le=100, description="Rock Quality Designation (%)")
+    depth: float = Field(..., ge=1, le=200, description="Depth below surface in meters")
+    water_pressure: float = Field(0, ge=0, le=10, description="Water pressure in bar")
+    
+    @model_validator(mode='after')
+    def validate_segment(self):
+        if self.end_chainage <= self.start_chainage:
+            raise ValueError('end_chainage must be greater than start_chainage')
+        if 'rock' in self.soil_type and (self.ucs is None or self.rqd is None):
+            raise ValueError('UCS and RQD are required for rock types')
+        return self
+
+class ChainageRange(BaseModel):
+    """Chainage interval to report the drive time for"""
+    
+    start: float = Field(..., description="Start chainage in meters")
+    end: float = Field(..., description="End chainage in meters")
+    
+    @model_validator(mode='after')
+    def validate_range(self):
+        if self.end < self.start:
+            raise ValueError('end must not be less than start')
+        return self
+
+class DriveRequest(BaseModel):
+    """Drive simulation over a longitudinal geological profile"""
+    
+    machine: TBMMachine
+    segments: List[AlignmentSegment] = Field(..., min_length=1, description="Contiguous segments in chainage order")
+    ring_length: float = Field(1.5, gt=0, le=5, description="Ring length in meters")
+    ring_build_time: float = Field(0, ge=0, le=600, description="Ring erection time per ring in minutes")
+    working_hours: float = Field(20, gt=0, le=24, description="Operating hours per day")
+    profile_points: int = Field(200, ge=2, le=5000, description="Points in the returned time-chainage curve")
+    ranges: List[ChainageRange] = Field([], description="Chainage ranges to report drive times for")
+    
+    @field_validator('segments')
+    @classmethod
+    def validate_contiguous(cls, v):
+        for previous, segment in zip(v, v[1:]):
+            if segment.start_chainage != previous.end_chainage:
+                raise ValueError(
+                    f'Segment starting at {segment.start_chainage} does not continue from {previous.end_chainage}'
+                )
+        return v
+
+class SegmentSummary(BaseModel):
+    """Simulated drive through one alignment segment"""
+    
+    start_chainage: float
+    end_chainage: float
+    soil_type: SoilType
+    rings: int = Field(..., description="Rings whose midpoint lies in the segment")
+    advance_rate: float = Field(..., description="Average advance rate while boring in mm/min")
+    hours: float = Field(..., description="Operating hours including ring build")
+
+class ChainageTime(BaseModel):
+    """Point on the cumulative time-chainage curve"""
+    
+    chainage: float
+    hours: float = Field(..., description="Cumulative operating hours")
+    days: float = Field(..., description="Cumulative working days")
+
+class RangeTime(BaseModel):
+    """Drive time between two chainages"""
+    
+    start: float
+    end: float
+    hours: float
+    days: float
+
+class DriveResult(BaseModel):
+    """Result of a drive simulation"""
+    
+    length: float = Field(..., description="Alignment length in meters")
+    rings: int
+    total_hours: float = Field(..., description="Operating hours including ring build")
+    total_days: float = Field(..., description="Working days at the given operating hours per day")
+    advance_rate: float = Field(..., description="Average advance rate while boring in mm/min")
+    segments: List[SegmentSummary]
+    profile: List[ChainageTime] = Field(..., description="Cumulative time-chainage curve")
+    ranges: List[RangeTime]
+
+class OptimizationRequest(BaseModel):
+    """Ground and machine to find the best thrust and cutterhead speed for"""
+    
+    parameters: TBMParameters = Field(..., description="Ground and machine; thrust and speed are the current operating point")
+    max_specific_energy: Optional[float] = Field(None, gt=0, description="Specific energy ceiling in kWh/m³")
+    max_thrust_force: Optional[float] = Field(None, ge=100, le=50000, description="Machine thrust limit in kN")
+    max_cutterhead_speed: Optional[float] = Field(None, ge=0.1, le=10.0, description="Machine speed limit in RPM")
+    torque_coefficient: float = Field(
+        0.1, 
+        gt=0, 
+        le=1, 
+        description="Cutterhead torque per unit thrust and diameter; torque ≈ coefficient × thrust × diameter / 3"
+    )
+    grid_points: int = Field(41, ge=5, le=201, description="Candidate grid points per axis")
+
+class OperatingPoint(BaseModel):
+    """Predicted performance at one thrust and cutterhead speed"""
+    
+    thrust_force: float = Field(..., description="Thrust force in kN")
+    cutterhead_speed: float = Field(..., description="Cutterhead rotation speed in RPM")
+    advance_rate: float = Field(..., description="Predicted advance rate in mm/min")
+    specific_energy: float = Field(..., description="Specific energy in kWh/m³")
+    required_power: float = Field(..., description="Estimated cutterhead power demand in kW")
+    confidence_score: float
+    feasible: bool = Field(..., description="Whether the point respects power, specific energy and machine limits")
+
+class ResponseSurface(BaseModel):
+    """Advance rate over the candidate grid (rows follow thrust, columns speed)"""
+    
+    thrust_force: List[float]
+    cutterhead_speed: List[float]
+    advance_rate: List[List[float]]
+    feasible: List[List[bool]]
+
+class OptimizationResult(BaseModel):
+    """Recommended operating point and the evaluated response surface"""
+    
+    optimum: OperatingPoint
+    current: OperatingPoint
+    surface: ResponseSurface
+    evaluations: int = Field(..., description="Parameter sets evaluated by the grid and local search")
+
+class CalibrationObservation(TBMParameters):
+    """Parameters of one ring with the advance rate actually achieved"""
+    
+    observed_advance_rate: float = Field(..., gt=0, le=1000, description="Measured advance rate in mm/min")
+
+class CalibrationUpdate(BaseModel):
+    """Observations to add to a project's online calibration, oldest first"""
+    
+    observations: List[CalibrationObservation] = Field(..., min_length=1, max_length=10000)
+    publish: bool = Field(False, description="Publish the updated coefficients as a new version")
+
+class CalibrationStatus(BaseModel):
+    """State of a project's calibration"""
+    
+    project: str
+    samples: int = Field(..., description="Observations in the online estimate")
+    multipliers: Dict[str, float] = Field(..., description="Estimated multiplier of each base coefficient")
+    versions: List[int] = Field(..., description="Published coefficient set versions")
+    latest_version: Optional[int] = None
+    rmse_before: Optional[float] = Field(None, description="RMSE of the update's observations before it in mm/min")
+    rmse_after: Optional[float] = Field(None, description="RMSE of the update's observations after it in mm/min")
+    published_version: Optional[int] = Field(None, description="Version published by this update")
+
+class JobKind(str, Enum):
+    BATCH = "batch"
+    MONTE_CARLO = "montecarlo"
+    DRIVE = "drive"
+
+class JobState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class JobInfo(BaseModel):
+    """State and progress of a background job"""
+    
+    id: str
+    kind: JobKind
+    status: JobState
+    completed: int = Field(..., description="Work units done: batch items, Monte Carlo samples or drive simulations")
+    total: int = Field(..., description="Work units of the whole job")
+    attempts: int = Field(..., description="Times a worker started the job")
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class HistoryGroupBy(str, Enum):
+    SOIL_TYPE = "soil_type"
+    TBM_TYPE = "tbm_type"
+    MODEL_VERSION = "model_version"
+    PROJECT = "project"
+    SOURCE = "source"
+    HOUR = "hour"
+    DAY = "day"
+    MONTH = "month"
+
+class HistoryEntry(BaseModel):
+    """One recorded calculation"""
+    
+    model_config = {"protected_namespaces": ()}
+    
+    id: int
+    created_at: datetime
+    soil_type: SoilType
+    tbm_type: TBMType
+    model_version: str = Field(..., description="MODEL_VERSION, plus the regression model's training time")
+    project: Optional[str] = None
+    calibration_version: Optional[int] = None
+    source: str = Field(..., description="Endpoint family: calculate or batch")
+    parameters: Dict[str, Any]
+    advance_rate: float
+    daily_advance: float
+    penetration_rate: float
+    specific_energy: float
+    confidence_score: float
+    risk_level: Optional[str] = None
+
+class HistoryPage(BaseModel):
+    """Newest-first page of recorded calculations"""
+    
+    items: List[HistoryEntry]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` for the next page; absent on the last")
+
+class HistoryGroup(BaseModel):
+    """Statistics of the calculations sharing one group key"""
+    
+    key: Dict[str, Any] = Field(..., description="Value of each group_by field (UTC bucket start for time buckets)")
+    count: int
+    advance_rate_mean: float
+    advance_rate_min: float
+    advance_rate_max: float
+    daily_advance_mean: float
+    confidence_mean: float
+
+class HistoryAggregate(BaseModel):
+    """Page of aggregate groups in key order"""
+    
+    groups: List[HistoryGroup]
+    next_offset: Optional[int] = Field(None, description="Pass as `offset` for the next page; absent on the last")
+
 class HealthCheck(BaseModel):
     """Health check response"""
     status: str
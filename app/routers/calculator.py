@@ -1,35 +1,355 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Body, Query, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from contextlib import nullcontext
+import json
+import time
 import logging
 
-from app.models.schemas import TBMParameters, AdvanceRateResult, SoilType, TBMType
-from app.services.calculator import TBMAdvanceRateCalculator
+from app.models.schemas import (TBMParameters, AdvanceRateResult, SurrogateResult, SensitivityResult,
+                                MonteCarloRequest, MonteCarloResult, OptimizationRequest, OptimizationResult,
+                                ProfileMode, SoilType, TBMType)
+from app.services.calculator import TBMAdvanceRateCalculator, STAGE_METHODS
+from app.services.cache import result_cache
+from app.services.surrogate import SurrogateService
+from app.services.sensitivity import analyze_sensitivity
+from app.services.montecarlo import MonteCarloEngine, MonteCarloRun
+from app.services.optimizer import OperatingPointOptimizer
+from app.services.regression import RegressionModel
+from app.services.profiling import RequestProfiler
+from app.services.calibration import calibration_store
+from app.services.history import history_recorder
+from app.core.config import settings
+from app.core.responses import PrecomputedResponse
+from app.core.metrics import calculator_stage_duration, predicted_advance_rate, instrument_methods
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # Initialize calculator service
-calculator_service = TBMAdvanceRateCalculator()
+calculator_service = TBMAdvanceRateCalculator(settings.REGRESSION_MODEL_PATH)
+surrogate_service = SurrogateService(settings.SURROGATE_GRID_PATH)
+monte_carlo_engine = MonteCarloEngine(settings.MONTE_CARLO_WORKERS, settings.MONTE_CARLO_CHUNK_SIZE)
+
+if settings.METRICS_ENABLED:
+    instrument_methods(calculator_service, STAGE_METHODS, calculator_stage_duration)
+serialization_duration = calculator_stage_duration.labels("serialization")
+
+# Calculators using published project calibrations, by (project, version)
+_calibrated_calculators: Dict[Tuple[str, int], TBMAdvanceRateCalculator] = {}
+
+def calibrated_calculator(project: Optional[str],
+                          version: Optional[int] = None) -> Tuple[TBMAdvanceRateCalculator, Optional[int]]:
+    """Calculator for a project's calibration version (the latest by default)
+
+    Returns the calculator and the version it was built from, so callers
+    record the version actually used even if a newer one is published
+    meanwhile. Without a project this is the uncalibrated calculator
+    service and no version. Raises HTTPException 400 for invalid project
+    names and 404 for unknown versions.
+    """
+    if project is None:
+        return calculator_service, None
+    try:
+        coefficients = calibration_store.load(project, version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if coefficients is None:
+        raise HTTPException(status_code=404, detail=f"No calibration version {version or 'published'} for project {project}")
+    
+    key = (project, coefficients.version)
+    calculator = _calibrated_calculators.get(key)
+    if calculator is None:
+        calculator = calculator_service.with_coefficients(coefficients.soil_coefficients, coefficients.tbm_efficiency)
+        if settings.METRICS_ENABLED:
+            instrument_methods(calculator, STAGE_METHODS, calculator_stage_duration)
+        _calibrated_calculators[key] = calculator
+    return calculator, coefficients.version
 
 @router.post("/calculate", response_model=AdvanceRateResult)
-async def calculate_advance_rate(parameters: TBMParameters):
+async def calculate_advance_rate(
+    parameters: TBMParameters,
+    project: Optional[str] = Query(None, description="Use this project's published calibration"),
+    calibration_version: Optional[int] = Query(None, ge=1, description="Calibration version (default: latest)"),
+    profile: Optional[ProfileMode] = Query(None, description="Profile this request: stages or cprofile"),
+    x_profile: Optional[ProfileMode] = Header(None, description="Same as the profile query flag")
+):
     """
     Calculate TBM advance rate based on input parameters
     
     This endpoint uses multiple calculation methods (empirical, theoretical, and regression)
     to provide accurate advance rate predictions for tunnel boring machines.
+    
+    With `profile=stages` (or `cprofile`) the result cache is bypassed and the
+    response is `{"result": {...}, "profile": {...}}` with the wall-clock time
+    per calculator stage (plus the top cProfile functions), also sent as a
+    Server-Timing header.
+    
+    With `project` the coefficient tables of the project's latest published
+    calibration (or `calibration_version`) are used; such results are not
+    cached.
+    """
+    calculator, version = calibrated_calculator(project, calibration_version)
+    mode = profile or x_profile
+    if mode is not None and settings.PROFILING_ENABLED:
+        return _profiled_calculation(parameters, mode, calculator)
+    
+    try:
+        logger.info("Calculating advance rate for TBM diameter: %sm", parameters.tbm_diameter)
+        if calculator is calculator_service:
+            result = result_cache.get_or_calculate(parameters, calculator)
+        else:
+            result = calculator.calculate_advance_rate(parameters)
+        logger.info("Calculation completed: %s mm/min", result.advance_rate)
+        predicted_advance_rate.labels(parameters.soil_type.value).observe(result.advance_rate)
+        if settings.HISTORY_ENABLED:
+            history_recorder.record(parameters, result, calculator.regression.current(), "calculate", project, version)
+        
+        start = time.perf_counter()
+        body = result.model_dump_json()
+        serialization_duration.observe(time.perf_counter() - start)
+        return Response(body, media_type="application/json")
+    except Exception as e:
+        logger.error("Error calculating advance rate: %s", e)
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+
+def _profiled_calculation(parameters: TBMParameters, mode: ProfileMode,
+                          calculator: TBMAdvanceRateCalculator = calculator_service) -> Response:
+    """Uncached calculation with its stage breakdown next to the result"""
+    profiler = RequestProfiler(mode)
+    try:
+        calculator = profiler.calculator(calculator)
+        with profiler.active():
+            result = calculator.calculate_advance_rate(parameters)
+            with profiler.stage("serialization"):
+                body = result.model_dump_json()
+    except Exception as e:
+        logger.error("Error calculating advance rate: %s", e)
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+    
+    report = _profile_report(profiler, "calculate")
+    return Response(
+        f'{{"result": {body}, "profile": {json.dumps(report)}}}',
+        media_type="application/json",
+        headers={"Server-Timing": profiler.server_timing()}
+    )
+
+def _profile_report(profiler: RequestProfiler, name: str) -> Dict[str, Any]:
+    """Profiler report, also saved to PROFILE_DIR when one is configured"""
+    report = profiler.report()
+    if settings.PROFILE_DIR:
+        try:
+            report["saved_to"] = profiler.save(settings.PROFILE_DIR, name, report)
+        except OSError as e:
+            logger.warning("Could not save request profile: %s", e)
+    return report
+
+@router.post("/calculate/surrogate", response_model=SurrogateResult)
+async def calculate_advance_rate_surrogate(
+    parameters: TBMParameters,
+    exact: bool = Query(False, description="Skip the surrogate grid and calculate exactly")
+):
+    """
+    Fast approximate advance rate from the precomputed surrogate grid
+    
+    Intended for interactive what-if sliders and optimisation loops. Falls
+    back to the exact calculation when `exact=true`, when no grid is
+    loaded, or when the inputs lie outside the grid.
+    """
+    try:
+        prediction = None if exact else surrogate_service.predict(parameters, calculator_service)
+        if prediction is not None:
+            return SurrogateResult(**prediction["metrics"], source="surrogate", error_bound=prediction["error_bound"])
+        
+        result = result_cache.get_or_calculate(parameters, calculator_service)
+        return SurrogateResult(
+            advance_rate=result.advance_rate,
+            daily_advance=result.daily_advance,
+            penetration_rate=result.penetration_rate,
+            specific_energy=result.specific_energy,
+            confidence_score=result.confidence_score,
+            source="exact"
+        )
+    except Exception as e:
+        logger.error("Error calculating surrogate advance rate: %s", e)
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+
+@router.post("/sensitivity", response_model=SensitivityResult)
+async def calculate_sensitivity(
+    parameters: TBMParameters,
+    relative_step: float = Query(0.01, gt=0, le=0.5, description="Relative perturbation for derivatives"),
+    tornado_step: float = Query(0.1, gt=0, le=0.5, description="Relative variation for the tornado chart")
+):
+    """
+    Sensitivity of advance rate, specific energy and confidence score to every input
+    
+    Perturbs each numeric field and evaluates all variants in one batched
+    calculation, returning partial derivatives, elasticities and tornado
+    chart data.
+    """
+    try:
+        return analyze_sensitivity(calculator_service, parameters, relative_step, tornado_step)
+    except Exception as e:
+        logger.error("Error calculating sensitivity: %s", e)
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+
+@router.post("/optimize", response_model=OptimizationResult)
+async def optimize_operating_point(request: OptimizationRequest):
+    """
+    Recommend thrust and cutterhead speed that maximize advance rate
+    
+    Evaluates a grid of candidates in one batch, then refines the best
+    feasible one with a bounded local search. Candidates must stay within
+    the schema bounds and the machine limits, need no more than the
+    installed cutterhead power, and stay under the specific energy ceiling.
+    """
+    try:
+        return OperatingPointOptimizer(calculator_service, request).optimize()
+    except Exception as e:
+        logger.error("Error optimizing operating point: %s", e)
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
+
+@router.post("/montecarlo", response_model=MonteCarloResult)
+async def calculate_monte_carlo(
+    request: MonteCarloRequest,
+    progress: bool = Query(False, description="Stream NDJSON progress lines before the result")
+):
     """
+    Monte Carlo distributions of advance rate and daily advance
+    
+    Inputs with a distribution are sampled, everything else is held at the
+    base parameters. Returns P10/P50/P90, mean, standard deviation and a
+    histogram per output. With `progress=true` the response is NDJSON:
+    `{"progress": {"completed": n, "total": N}}` lines as chunks finish,
+    then `{"result": {...}}` (or `{"error": "..."}`).
+    """
+    if request.samples > settings.MONTE_CARLO_MAX_SAMPLES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{request.samples} samples exceed the limit of {settings.MONTE_CARLO_MAX_SAMPLES}"
+        )
+    
+    run = monte_carlo_engine.simulate(calculator_service, request)
+    logger.info("Running Monte Carlo simulation with %s samples (seed %s)", request.samples, run.seed)
+    if progress:
+        return StreamingResponse(_stream_monte_carlo(run), media_type="application/x-ndjson")
+    
     try:
-        logger.info(f"Calculating advance rate for TBM diameter: {parameters.tbm_diameter}m")
-        result = calculator_service.calculate_advance_rate(parameters)
-        logger.info(f"Calculation completed: {result.advance_rate} mm/min")
-        return result
+        return await run_in_threadpool(run.run)
     except Exception as e:
-        logger.error(f"Error calculating advance rate: {str(e)}")
+        logger.error("Error running Monte Carlo simulation: %s", e)
         raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
 
+def _stream_monte_carlo(run: MonteCarloRun) -> Iterator[str]:
+    """Run a simulation, yielding NDJSON progress lines and then the result"""
+    try:
+        for completed in run.progress():
+            yield json.dumps({"progress": {"completed": completed, "total": run.total}}) + "\n"
+        yield json.dumps({"result": run.result()}) + "\n"
+    except Exception as e:
+        logger.error("Error running Monte Carlo simulation: %s", e)
+        yield json.dumps({"error": f"Calculation error: {str(e)}"}) + "\n"
+
+@router.post("/calculate/batch", response_class=StreamingResponse)
+async def calculate_advance_rate_batch(
+    items: List[Any] = Body(...),
+    risk_detail: bool = Query(False, description="Readable risks and recommendations instead of risk codes"),
+    project: Optional[str] = Query(None, description="Use this project's published calibration"),
+    calibration_version: Optional[int] = Query(None, ge=1, description="Calibration version (default: latest)"),
+    profile: Optional[ProfileMode] = Query(None, description="Profile this request: stages or cprofile"),
+    x_profile: Optional[ProfileMode] = Header(None, description="Same as the profile query flag")
+):
+    """
+    Calculate TBM advance rates for many parameter sets in one request
+    
+    The body is a JSON array of TBMParameters objects. The response is
+    newline-delimited JSON streamed chunk by chunk, one line per input in
+    input order: `{"index": i, "result": {...}}` for valid rows and
+    `{"index": i, "errors": [...]}` for rows that fail validation. With
+    `profile=stages` (or `cprofile`) a final `{"profile": {...}}` line holds
+    the time spent per stage over all chunks.
+    
+    Risk factors are compact by default: `{"code": n, "overall_risk_level": ...}`
+    where bit i of the code is rule i of `/risk-rules`. `risk_detail=true`
+    returns the same readable risks and recommendations as `/calculate`.
+    `project` and `calibration_version` select a calibration as for
+    `/calculate`.
+    """
+    if len(items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(items)} items exceeds the limit of {settings.BATCH_MAX_ITEMS}"
+        )
+    
+    calculator, version = calibrated_calculator(project, calibration_version)
+    mode = profile or x_profile
+    profiler = RequestProfiler(mode) if mode is not None and settings.PROFILING_ENABLED else None
+    
+    logger.info("Streaming batch calculation for %s parameter sets", len(items))
+    return StreamingResponse(
+        stream_batch_results(items, profiler, risk_detail, calculator, project, version),
+        media_type="application/x-ndjson"
+    )
+
+def stream_batch_results(items: List[Any], profiler: Optional[RequestProfiler] = None, risk_detail: bool = False,
+                         calculator: TBMAdvanceRateCalculator = calculator_service, project: Optional[str] = None,
+                         calibration_version: Optional[int] = None) -> Iterator[str]:
+    """Validate and calculate a batch chunk by chunk, yielding NDJSON lines
+
+    Results are recorded in the history under ``project`` and
+    ``calibration_version``, which name the calibration of ``calculator``.
+    """
+    chunk_size = settings.BATCH_CHUNK_SIZE
+    model = calculator.regression.current()
+    if profiler:
+        calculator = profiler.calculator(calculator)
+    
+    for start in range(0, len(items), chunk_size):
+        lines = {}
+        valid_indices = []
+        valid_params = []
+        
+        # Chunks may run on different threadpool threads; cProfile is enabled per chunk
+        with profiler.active() if profiler else nullcontext():
+            with _profile_stage(profiler, "validation"):
+                for index in range(start, min(start + chunk_size, len(items))):
+                    try:
+                        valid_params.append(TBMParameters.model_validate(items[index]))
+                        valid_indices.append(index)
+                    except ValidationError as e:
+                        lines[index] = f'{{"index": {index}, "errors": {e.json(include_url=False)}}}\n'
+            
+            try:
+                results = calculator.calculate_many(valid_params, risk_detail)
+                with _profile_stage(profiler, "serialization"):
+                    serialize_start = time.perf_counter()
+                    for index, result in zip(valid_indices, results):
+                        lines[index] = f'{{"index": {index}, "result": {result.model_dump_json()}}}\n'
+                    if results:
+                        # Per-result average, comparable with single /calculate responses
+                        serialization_duration.observe((time.perf_counter() - serialize_start) / len(results))
+                for params, result in zip(valid_params, results):
+                    predicted_advance_rate.labels(params.soil_type.value).observe(result.advance_rate)
+                    if settings.HISTORY_ENABLED:
+                        history_recorder.record(params, result, model, "batch", project, calibration_version)
+            except Exception as e:
+                logger.error("Error calculating batch chunk at %s: %s", start, e)
+                errors = json.dumps([{"msg": f"Calculation error: {str(e)}"}])
+                for index in valid_indices:
+                    lines[index] = f'{{"index": {index}, "errors": {errors}}}\n'
+        
+        yield "".join(lines[index] for index in sorted(lines))
+    
+    if profiler:
+        yield json.dumps({"profile": _profile_report(profiler, "batch")}) + "\n"
+
+def _profile_stage(profiler: Optional[RequestProfiler], name: str):
+    return profiler.stage(name) if profiler else nullcontext()
+
 @router.get("/examples", response_model=List[Dict[str, Any]])
-async def get_example_scenarios():
+async def get_example_scenarios(request: Request):
     """
     Get example TBM scenarios for different tunnel types
     
@@ -39,6 +359,34 @@ async def get_example_scenarios():
     - Water tunnels
     - Mining tunnels
     """
+    return examples_response.respond(request)
+
+@router.get("/soil-types")
+async def get_soil_types(request: Request):
+    """Get available soil/rock types for TBM calculations"""
+    return soil_types_response.respond(request)
+
+@router.get("/tbm-types")
+async def get_tbm_types(request: Request):
+    """Get available TBM types for calculations"""
+    return tbm_types_response.respond(request)
+
+@router.get("/calculation-info")
+async def get_calculation_info(request: Request):
+    """Get information about calculation methods and parameters"""
+    return calculation_info_response().respond(request)
+
+@router.get("/risk-rules")
+async def get_risk_rules(request: Request):
+    """Risk rules by bit position, for decoding the risk codes of batch results"""
+    return risk_rules_response.respond(request)
+
+# ----------------------------------------------------------------------
+# Static metadata payloads, serialized and compressed once at startup
+# ----------------------------------------------------------------------
+
+def example_scenarios() -> List[Dict[str, Any]]:
+    """Pre-configured scenarios for typical tunnel types"""
     examples = [
         {
             "name": "Metro Tunnel - Soft Ground",
@@ -125,13 +473,9 @@ async def get_example_scenarios():
             }
         }
     ]
-    
-    logger.info("Returning example scenarios")
     return examples
 
-@router.get("/soil-types")
-async def get_soil_types():
-    """Get available soil/rock types for TBM calculations"""
+def soil_type_options() -> Dict[str, Any]:
     return {
         "soil_types": [
             {"value": SoilType.CLAY, "label": "Clay", "description": "Cohesive fine-grained soil"},
@@ -145,9 +489,7 @@ async def get_soil_types():
         ]
     }
 
-@router.get("/tbm-types")
-async def get_tbm_types():
-    """Get available TBM types for calculations"""
+def tbm_type_options() -> Dict[str, Any]:
     return {
         "tbm_types": [
             {"value": TBMType.EPB, "label": "EPB (Earth Pressure Balance)", "description": "Suitable for cohesive soils and mixed ground"},
@@ -157,9 +499,8 @@ async def get_tbm_types():
         ]
     }
 
-@router.get("/calculation-info")
-async def get_calculation_info():
-    """Get information about calculation methods and parameters"""
+def calculation_info(model: RegressionModel) -> Dict[str, Any]:
+    """Calculation methods, parameters and the active regression model"""
     return {
         "methods": {
             "empirical": {
@@ -189,6 +530,10 @@ async def get_calculation_info():
             "optional_for_rock": ["ucs", "rqd"],
             "optional": ["water_pressure", "chamber_pressure", "temperature"]
         },
+        "regression_model": {
+            **model.metadata,
+            "coefficients": model.coefficients()
+        },
         "output_metrics": [
             "advance_rate (mm/min)",
             "daily_advance (m/day)", 
@@ -198,3 +543,21 @@ async def get_calculation_info():
             "risk_factors"
         ]
     }
+
+_metadata_cache_control = f"public, max-age={settings.METADATA_CACHE_MAX_AGE}"
+examples_response = PrecomputedResponse.json(example_scenarios(), _metadata_cache_control)
+soil_types_response = PrecomputedResponse.json(soil_type_options(), _metadata_cache_control)
+tbm_types_response = PrecomputedResponse.json(tbm_type_options(), _metadata_cache_control)
+risk_rules_response = PrecomputedResponse.json(calculator_service.risk_rules.catalog(), _metadata_cache_control)
+# Revalidated on every use: the regression model part changes on hot reload
+_calculation_info: Tuple[Tuple, Optional[PrecomputedResponse]] = ((), None)
+
+def calculation_info_response() -> PrecomputedResponse:
+    """Calculation info for the current regression model, rebuilt only after a reload"""
+    global _calculation_info
+    model = calculator_service.regression.current()
+    fingerprint, response = _calculation_info
+    if response is None or fingerprint != model.fingerprint:
+        response = PrecomputedResponse.json(calculation_info(model), "public, no-cache")
+        _calculation_info = (model.fingerprint, response)
+    return response
@@ -0,0 +1,113 @@
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional
+import numpy as np
+import logging
+
+from app.models.schemas import CalibrationUpdate, CalibrationStatus
+from app.routers.calculator import calculator_service
+from app.services.calculator import parameters_to_columns
+from app.services.calibration import RecursiveCalibrator, CoefficientSet, calibration_store
+from app.core.config import settings
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Uninstrumented copy: fitting evaluations are not calculator stages
+calibration_base = calculator_service.with_coefficients(
+    calculator_service.soil_coefficients, calculator_service.tbm_efficiency
+)
+
+@router.get("/calibration/{project}", response_model=CalibrationStatus)
+async def get_calibration(project: str):
+    """Online estimate and published versions of a project's calibration"""
+    try:
+        calibration = await run_in_threadpool(_current_calibration, project)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if calibration is None:
+        raise HTTPException(status_code=404, detail=f"No calibration for project {project}")
+    return calibration
+
+@router.post("/calibration/{project}/observations", response_model=CalibrationStatus)
+async def add_calibration_observations(project: str, update: CalibrationUpdate):
+    """
+    Update a project's coefficients from observed advance rates
+
+    Observations are added to the project's recursive least squares
+    estimate in order, at a fixed cost per observation. The response holds
+    the RMSE of the observations before and after the update; with
+    `publish=true` the new coefficients become the project's next version,
+    which `/calculate?project=...` uses from then on.
+    """
+    try:
+        return await run_in_threadpool(_update_calibration, project, update)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Calibration error: {str(e)}")
+
+@router.post("/calibration/{project}/versions")
+async def publish_calibration(project: str) -> Dict[str, Any]:
+    """Publish the current online estimate as the project's next version"""
+    try:
+        published = await run_in_threadpool(_publish_calibration, project)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Calibration error: {str(e)}")
+    if published is None:
+        raise HTTPException(status_code=404, detail=f"No calibration for project {project}")
+    return published.as_dict()
+
+@router.get("/calibration/{project}/versions/{version}")
+async def get_calibration_version(project: str, version: int) -> Dict[str, Any]:
+    """Coefficient tables of a published calibration version"""
+    try:
+        coefficients = calibration_store.load(project, version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if coefficients is None:
+        raise HTTPException(status_code=404, detail=f"No calibration version {version} for project {project}")
+    return coefficients.as_dict()
+
+def _current_calibration(project: str) -> Optional[CalibrationStatus]:
+    state = calibration_store.state(project)
+    versions = calibration_store.versions(project)
+    if state is None and not versions:
+        return None
+
+    calibrator = RecursiveCalibrator(calibration_base, settings.CALIBRATION_FORGETTING, settings.CALIBRATION_PRIOR_WEIGHT)
+    if state is not None:
+        try:
+            calibrator.load_state(state)
+        except (ValueError, KeyError) as e:
+            logger.warning("Ignoring calibration state of project %s: %s", project, e)
+    return _status(project, calibrator)
+
+def _publish_calibration(project: str) -> Optional[CoefficientSet]:
+    if calibration_store.state(project) is None:
+        return None
+    with calibration_store.calibrator(project, calibration_base) as calibrator:
+        return calibration_store.publish(project, calibrator.coefficients({"source": "online"}))
+
+def _update_calibration(project: str, update: CalibrationUpdate) -> CalibrationStatus:
+    columns = parameters_to_columns(update.observations)
+    observed = np.array([observation.observed_advance_rate for observation in update.observations])
+    with calibration_store.calibrator(project, calibration_base) as calibrator:
+        fit = calibrator.update(columns, observed)
+        published: Optional[int] = None
+        if update.publish:
+            published = calibration_store.publish(project, calibrator.coefficients({"source": "online"})).version
+    logger.info(
+        "Calibration of project %s updated with %s observations (RMSE %s -> %s)",
+        project, len(observed), fit["rmse_before"], fit["rmse_after"]
+    )
+    return _status(project, calibrator, published_version=published, **fit)
+
+def _status(project: str, calibrator: RecursiveCalibrator, **extra: Any) -> CalibrationStatus:
+    versions = calibration_store.versions(project)
+    return CalibrationStatus(
+        project=project,
+        samples=calibrator.samples,
+        multipliers=calibrator.multipliers(),
+        versions=versions,
+        latest_version=versions[-1] if versions else None,
+        **extra
+    )
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException
+import logging
+
+from app.models.schemas import DriveRequest, DriveResult
+from app.routers.calculator import calculator_service
+from app.services.drive import DriveSimulation
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.post("/drive/simulate", response_model=DriveResult)
+async def simulate_drive(request: DriveRequest):
+    """
+    Simulate a TBM drive over a longitudinal geological profile
+    
+    Every ring is evaluated in the ground at its midpoint chainage. Returns
+    totals, a summary per alignment segment, the cumulative time-chainage
+    curve and the drive time for each requested chainage range.
+    """
+    try:
+        simulation = DriveSimulation.simulate(calculator_service, request)
+        return simulation.summary(request.profile_points, request.ranges)
+    except Exception as e:
+        logger.error("Error simulating drive: %s", e)
+        raise HTTPException(status_code=400, detail=f"Calculation error: {str(e)}")
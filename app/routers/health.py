@@ -3,6 +3,7 @@ from datetime import datetime
 import time
 from app.models.schemas import HealthCheck
 from app.core.config import settings
+from app.services.cache import result_cache
 
 router = APIRouter()
 
@@ -39,6 +40,15 @@ async def readiness_check():
         }
     }
 
+@router.get("/cache")
+async def cache_stats():
+    """Result cache hit/miss/eviction counters for this worker"""
+    
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "result_cache": result_cache.stats()
+    }
+
 @router.get("/live")
 async def liveness_check():
     """Liveness check for Kubernetes deployments"""
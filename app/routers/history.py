@@ -0,0 +1,102 @@
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Any, Optional
+from datetime import datetime, timezone
+import sqlite3
+import logging
+
+from app.models.schemas import SoilType, TBMType, HistoryGroupBy, HistoryPage, HistoryAggregate
+from app.services.history import history_recorder
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    """Unix time of a query datetime; times without an offset are UTC"""
+    if value is None:
+        return None
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+
+def _filters(start: Optional[datetime], end: Optional[datetime], soil_type: Optional[SoilType],
+             tbm_type: Optional[TBMType], model_version: Optional[str], project: Optional[str],
+             source: Optional[str]) -> Dict[str, Any]:
+    return {
+        "start": _epoch(start),
+        "end": _epoch(end),
+        "soil_type": soil_type.value if soil_type else None,
+        "tbm_type": tbm_type.value if tbm_type else None,
+        "model_version": model_version,
+        "project": project,
+        "source": source
+    }
+
+@router.get("/history", response_model=HistoryPage)
+async def list_history(
+    start: Optional[datetime] = Query(None, description="Earliest calculation time (inclusive, ISO 8601)"),
+    end: Optional[datetime] = Query(None, description="Latest calculation time (exclusive, ISO 8601)"),
+    soil_type: Optional[SoilType] = Query(None),
+    tbm_type: Optional[TBMType] = Query(None),
+    model_version: Optional[str] = Query(None),
+    project: Optional[str] = Query(None),
+    source: Optional[str] = Query(None, description="calculate or batch"),
+    limit: int = Query(100, ge=1, le=1000, description="Calculations per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page")
+):
+    """
+    Recorded calculations, newest first
+
+    Pages are keyset-paginated: follow `next_cursor` until it is absent.
+    Every page costs the same however deep it is. Calculations are
+    written a moment after they are made (`HISTORY_FLUSH_INTERVAL`).
+    """
+    position = None
+    if cursor is not None:
+        try:
+            created_at, row_id = cursor.split(":")
+            position = (float(created_at), int(row_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+
+    filters = _filters(start, end, soil_type, tbm_type, model_version, project, source)
+    try:
+        items, next_position = await run_in_threadpool(history_recorder.store.page, filters, limit, position)
+    except sqlite3.Error as e:
+        logger.error("Error reading calculation history: %s", e)
+        raise HTTPException(status_code=503, detail=f"History store unavailable: {str(e)}")
+    next_cursor = f"{next_position[0]!r}:{next_position[1]}" if next_position else None
+    return HistoryPage(items=items, next_cursor=next_cursor)
+
+@router.get("/history/aggregate", response_model=HistoryAggregate)
+async def aggregate_history(
+    group_by: List[HistoryGroupBy] = Query([], description="Group keys; none aggregates everything matched"),
+    start: Optional[datetime] = Query(None, description="Earliest calculation time (inclusive, ISO 8601)"),
+    end: Optional[datetime] = Query(None, description="Latest calculation time (exclusive, ISO 8601)"),
+    soil_type: Optional[SoilType] = Query(None),
+    tbm_type: Optional[TBMType] = Query(None),
+    model_version: Optional[str] = Query(None),
+    project: Optional[str] = Query(None),
+    source: Optional[str] = Query(None, description="calculate or batch"),
+    limit: int = Query(100, ge=1, le=10000, description="Groups per page"),
+    offset: int = Query(0, ge=0, description="next_offset of the previous page")
+):
+    """
+    Count and advance rate statistics of recorded calculations per group
+
+    `group_by` may repeat, e.g. `?group_by=day&group_by=soil_type`. Time
+    buckets (`hour`, `day`, `month`) are UTC. Whole hours are read from
+    hourly rollups kept up to date on every flush, so a query costs about
+    the same for a thousand calculations per hour as for a million.
+    """
+    filters = _filters(start, end, soil_type, tbm_type, model_version, project, source)
+    keys = list(dict.fromkeys(key.value for key in group_by))
+    try:
+        groups, next_offset = await run_in_threadpool(history_recorder.store.aggregate, filters, keys, limit, offset)
+    except sqlite3.Error as e:
+        logger.error("Error aggregating calculation history: %s", e)
+        raise HTTPException(status_code=503, detail=f"History store unavailable: {str(e)}")
+    return HistoryAggregate(groups=groups, next_offset=next_offset)
+
+@router.get("/history/stats")
+async def history_stats():
+    """Write-behind buffer counters for this worker"""
+    return history_recorder.stats()
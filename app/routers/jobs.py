@@ -0,0 +1,182 @@
+from fastapi import APIRouter, HTTPException, Body, Query, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+import asyncio
+import sqlite3
+import logging
+
+from app.models.schemas import (MonteCarloRequest, MonteCarloResult, DriveRequest, DriveResult,
+                                JobKind, JobState, JobInfo)
+from app.routers.calculator import calculator_service, monte_carlo_engine, calibrated_calculator, stream_batch_results
+from app.services.drive import DriveSimulation
+from app.services.jobs import JobStore, JobQueue, JobContext, JobQueueFull
+from app.core.database import sqlite_path
+from app.core.config import settings
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Seconds between progress lines of /jobs/{id}/events
+EVENTS_INTERVAL = 0.5
+
+def run_batch_job(payload: Dict[str, Any], context: JobContext) -> Tuple[str, str]:
+    """Batch calculation with the same NDJSON lines as /calculate/batch"""
+    items = payload["items"]
+    try:
+        calculator, _ = calibrated_calculator(payload["project"], payload["calibration_version"])
+    except HTTPException as e:
+        raise ValueError(e.detail)
+
+    chunks = []
+    for chunk in stream_batch_results(items, None, payload["risk_detail"], calculator,
+                                      payload["project"], payload["calibration_version"]):
+        chunks.append(chunk)
+        context.progress(min(len(chunks) * settings.BATCH_CHUNK_SIZE, len(items)), len(items))
+    return "".join(chunks), "application/x-ndjson"
+
+def run_monte_carlo_job(payload: Dict[str, Any], context: JobContext) -> Tuple[str, str]:
+    run = monte_carlo_engine.simulate(calculator_service, MonteCarloRequest.model_validate(payload))
+    for completed in run.progress():
+        context.progress(completed, run.total)
+    return MonteCarloResult.model_validate(run.result()).model_dump_json(), "application/json"
+
+def run_drive_job(payload: Dict[str, Any], context: JobContext) -> Tuple[str, str]:
+    request = DriveRequest.model_validate(payload)
+    simulation = DriveSimulation.simulate(calculator_service, request)
+    return DriveResult.model_validate(simulation.summary(request.profile_points, request.ranges)).model_dump_json(), \
+        "application/json"
+
+job_store = JobStore(sqlite_path(settings.DATABASE_URL))
+job_queue = JobQueue(
+    job_store,
+    {
+        JobKind.BATCH.value: run_batch_job,
+        JobKind.MONTE_CARLO.value: run_monte_carlo_job,
+        JobKind.DRIVE.value: run_drive_job
+    },
+    workers=settings.JOB_WORKERS,
+    max_queued=settings.JOB_MAX_QUEUED,
+    lease_timeout=settings.JOB_LEASE_TIMEOUT,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    poll_interval=settings.JOB_POLL_INTERVAL,
+    result_ttl=settings.JOB_RESULT_TTL
+)
+
+@router.post("/jobs/batch", response_model=JobInfo, status_code=202)
+async def submit_batch_job(
+    items: List[Any] = Body(...),
+    risk_detail: bool = Query(False, description="Readable risks and recommendations instead of risk codes"),
+    project: Optional[str] = Query(None, description="Use this project's published calibration"),
+    calibration_version: Optional[int] = Query(None, ge=1, description="Calibration version (default: latest)")
+):
+    """
+    Queue a batch calculation too large for one request
+
+    Takes the same body and flags as `/calculate/batch`, up to
+    `JOB_BATCH_MAX_ITEMS` items. The job's result is the NDJSON that
+    `/calculate/batch` would stream. Without `calibration_version` the
+    latest version at submission is used.
+    """
+    if len(items) > settings.JOB_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(items)} items exceeds the limit of {settings.JOB_BATCH_MAX_ITEMS}"
+        )
+    # Reject unknown calibrations now and pin the version a retried job uses
+    _, version = calibrated_calculator(project, calibration_version)
+    payload = {"items": items, "risk_detail": risk_detail, "project": project, "calibration_version": version}
+    return await _submit(JobKind.BATCH, payload, len(items))
+
+@router.post("/jobs/montecarlo", response_model=JobInfo, status_code=202)
+async def submit_monte_carlo_job(request: MonteCarloRequest):
+    """
+    Queue a Monte Carlo simulation
+
+    The job's result is the `/montecarlo` response. A seed is drawn on
+    submission when none is given, so a job resumed after a restart
+    reproduces the same samples.
+    """
+    if request.samples > settings.MONTE_CARLO_MAX_SAMPLES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{request.samples} samples exceed the limit of {settings.MONTE_CARLO_MAX_SAMPLES}"
+        )
+    run = monte_carlo_engine.simulate(calculator_service, request)
+    payload = {**request.model_dump(mode="json"), "seed": run.seed}
+    return await _submit(JobKind.MONTE_CARLO, payload, request.samples)
+
+@router.post("/jobs/drive", response_model=JobInfo, status_code=202)
+async def submit_drive_job(request: DriveRequest):
+    """Queue a drive simulation; the job's result is the `/drive/simulate` response"""
+    return await _submit(JobKind.DRIVE, request.model_dump(mode="json"), 1)
+
+async def _submit(kind: JobKind, payload: Dict[str, Any], total: int) -> JobInfo:
+    try:
+        job = await run_in_threadpool(job_queue.submit, kind.value, payload, total)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Job queue is full: {str(e)}")
+    except sqlite3.Error as e:
+        logger.error("Error queueing %s job: %s", kind.value, e)
+        raise HTTPException(status_code=503, detail=f"Job store unavailable: {str(e)}")
+    return JobInfo(**job)
+
+@router.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str):
+    """State and progress of a job"""
+    return JobInfo(**await _find_job(job_id))
+
+@router.get("/jobs/{job_id}/events", response_class=StreamingResponse)
+async def stream_job_events(job_id: str):
+    """
+    Stream a job's progress
+
+    NDJSON with one JobInfo line whenever the job's state or progress
+    changes, ending with the line of its final state.
+    """
+    job = await _find_job(job_id)
+    return StreamingResponse(_job_events(job_id, job), media_type="application/x-ndjson")
+
+async def _job_events(job_id: str, job: Optional[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Poll the store, yielding a line per change until the job finishes"""
+    last = None
+    while job is not None:
+        line = JobInfo(**job).model_dump_json()
+        if line != last:
+            yield line + "\n"
+            last = line
+        if job["status"] not in (JobState.QUEUED.value, JobState.RUNNING.value):
+            return
+        # The job may run in another worker process, so the store is the only source
+        await asyncio.sleep(EVENTS_INTERVAL)
+        job = await run_in_threadpool(job_store.get, job_id)
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Result of a succeeded job
+
+    NDJSON for batch jobs and JSON otherwise. Returns 409 while the job is
+    queued or running, or when it failed or was cancelled.
+    """
+    job = await _find_job(job_id)
+    stored = await run_in_threadpool(job_store.result, job_id)
+    if stored is None:
+        detail = f"Job is {job['status']}" + (f": {job['error']}" if job["error"] else "")
+        raise HTTPException(status_code=409, detail=detail)
+    content, media_type = stored
+    return Response(content=content, media_type=media_type)
+
+@router.delete("/jobs/{job_id}", response_model=JobInfo)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; finished jobs are left as they are"""
+    await _find_job(job_id)
+    job = await run_in_threadpool(job_store.cancel, job_id)
+    logger.info("Cancelled job %s", job_id)
+    return JobInfo(**job)
+
+async def _find_job(job_id: str) -> Dict[str, Any]:
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+from typing import Optional, Set
+import asyncio
+import json
+import logging
+
+from app.routers.calculator import calibrated_calculator
+from app.services.live import LiveSession
+from app.core.config import settings
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Sessions of the open connections of this worker
+active_sessions: Set[LiveSession] = set()
+
+@router.websocket("/live/ws")
+async def live_telemetry(websocket: WebSocket, project: Optional[str] = None,
+                         calibration_version: Optional[int] = None):
+    """
+    Live advance rate prediction for one machine
+
+    Each text message is a JSON object of TBMParameters fields that
+    changed; the first one must hold every required field. Each reply is
+    `{"seq": n, "changed": [...], "recomputed": [...], "result": {...}}`
+    where `result` has only the result fields whose value changed and
+    `recomputed` names the calculator stages that depend on the changed
+    fields. Invalid updates get `{"errors": [...]}` and leave the state as
+    it was. `project` and `calibration_version` select a calibration as for
+    `/calculate`.
+    """
+    if len(active_sessions) >= settings.LIVE_MAX_CONNECTIONS:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    try:
+        calculator, _ = calibrated_calculator(project, calibration_version)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail))
+        return
+
+    await websocket.accept()
+    session = LiveSession(calculator)
+    active_sessions.add(session)
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive_text(), settings.LIVE_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                await websocket.close(code=status.WS_1001_GOING_AWAY, reason="Idle timeout")
+                break
+            # A stage rerun costs microseconds: reply on the event loop, no threadpool hop
+            await websocket.send_text(_live_reply(session, message))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        active_sessions.discard(session)
+        logger.info("Live session closed after %s updates", session.updates)
+
+def _live_reply(session: LiveSession, message: str) -> str:
+    """Apply one update message and serialize the reply"""
+    try:
+        changes = json.loads(message)
+        if not isinstance(changes, dict):
+            raise ValueError("expected a JSON object of parameter values")
+        delta = session.update(changes)
+    except ValidationError as e:
+        return f'{{"errors": {e.json(include_url=False)}}}'
+    except ValueError as e:
+        return json.dumps({"errors": [{"msg": f"Invalid update: {str(e)}"}]})
+    except Exception as e:
+        logger.error("Error calculating live update: %s", e)
+        return json.dumps({"errors": [{"msg": f"Calculation error: {str(e)}"}]})
+    return json.dumps({"seq": session.updates, **delta})
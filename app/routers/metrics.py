@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import exporter, CONTENT_TYPE
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of all workers on this host"""
+    # Reads the other workers' snapshot files, so keep it off the event loop
+    body = await run_in_threadpool(exporter.exposition)
+    return Response(body, headers={"Content-Type": CONTENT_TYPE})
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import Optional, Iterator
+import io
+import json
+import logging
+
+from app.models.schemas import TelemetryContext
+from app.routers.calculator import calculator_service
+from app.services.telemetry import TelemetryReader, TelemetryPipeline
+from app.core.config import settings
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.post("/telemetry/ingest", response_class=StreamingResponse)
+async def ingest_telemetry(
+    file: UploadFile = File(..., description="CSV telemetry log"),
+    context: str = Form(..., description="JSON object with TelemetryContext fields"),
+    bin_by: str = Form("ring", description="Aggregate per 'ring' or per 'chainage' bin"),
+    bin_size: float = Form(1.0, description="Chainage bin width in meters"),
+    column_map: Optional[str] = Form(None, description="JSON object mapping log headers to fields")
+):
+    """
+    Predict advance rates from an uploaded TBM telemetry log
+
+    The log is read in chunks and streamed back as newline-delimited JSON:
+    one aggregate line per ring or chainage bin, then a final summary line.
+    """
+    try:
+        telemetry_context = TelemetryContext.model_validate_json(context)
+        mapping = json.loads(column_map) if column_map else None
+        text = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+        reader = TelemetryReader(text, column_map=mapping, chunk_size=settings.TELEMETRY_CHUNK_SIZE)
+        pipeline = TelemetryPipeline(calculator_service, telemetry_context, bin_by=bin_by, bin_size=bin_size)
+        bins = pipeline.process(reader)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json(include_url=False)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Telemetry error: {str(e)}")
+
+    logger.info("Ingesting telemetry log %s", file.filename)
+    return StreamingResponse(_stream_bins(bins, pipeline), media_type="application/x-ndjson")
+
+def _stream_bins(bins: Iterator[dict], pipeline: TelemetryPipeline) -> Iterator[str]:
+    """Serialize bin aggregates followed by the pipeline summary"""
+    try:
+        for aggregate in bins:
+            yield json.dumps(aggregate) + "\n"
+    except (ValueError, UnicodeDecodeError) as e:
+        logger.error("Error ingesting telemetry: %s", e)
+        yield json.dumps({"error": f"Telemetry error: {str(e)}"}) + "\n"
+    yield json.dumps({"summary": pipeline.summary()}) + "\n"
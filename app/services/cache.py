@@ -0,0 +1,169 @@
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Tuple, Optional, Callable
+
+from app.models.schemas import TBMParameters, AdvanceRateResult
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.shared_cache import SharedResultStore
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    """Bounded LRU + TTL cache of calculation results
+
+    Keys are the canonical tuple of TBMParameters fields. With
+    ``significant_digits`` set, numeric fields are rounded to that many
+    significant digits first, so near-identical requests share an entry.
+    Entries are dropped automatically whenever the calculator coefficient
+    tables, the regression model or ``settings.MODEL_VERSION`` change.
+
+    An optional ``shared`` store is consulted on local misses, so workers on
+    the same host reuse each other's results and start warm after a restart.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl: float = 300.0, significant_digits: int = 0,
+                 clock: Callable[[], float] = time.monotonic, shared: Optional[SharedResultStore] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.significant_digits = significant_digits
+        self.shared = shared
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple, Tuple[float, AdvanceRateResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[Tuple] = None
+        self._fingerprint_digest = b""
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def make_key(self, params: TBMParameters) -> Tuple:
+        """Canonical (optionally quantized) key for a parameter set"""
+        digits = self.significant_digits
+        key = []
+        for field in TBMParameters.model_fields:
+            value = getattr(params, field)
+            if isinstance(value, float) and digits:
+                value = float(f"{value:.{digits}g}")
+            elif hasattr(value, "value"):
+                value = value.value
+            key.append(value)
+        return tuple(key)
+
+    def get_or_calculate(self, params: TBMParameters, calculator: TBMAdvanceRateCalculator) -> AdvanceRateResult:
+        """Return the cached result for ``params`` or calculate and store it"""
+        if self.max_size <= 0:
+            return calculator.calculate_advance_rate(params)
+
+        key = self.make_key(params)
+        self._check_fingerprint(calculator)
+
+        result = self.get(key)
+        if result is not None:
+            return result
+
+        digest = self.shared_digest(key) if self.shared is not None else None
+        if digest is not None:
+            payload = self.shared.get(digest)
+            if payload is not None:
+                result = AdvanceRateResult.model_validate_json(payload)
+                self.put(key, result)
+                return result
+
+        result = calculator.calculate_advance_rate(params)
+        self.put(key, result)
+        if digest is not None:
+            self.shared.put(digest, result.model_dump_json())
+        return result
+
+    def shared_digest(self, key: Tuple) -> bytes:
+        """Content digest of a key plus the current model fingerprint"""
+        return hashlib.blake2b(repr(key).encode(), digest_size=16, key=self._fingerprint_digest).digest()
+
+    def get(self, key: Tuple) -> Optional[AdvanceRateResult]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, result = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: Tuple, result: AdvanceRateResult):
+        expires_at = self._clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        stats = {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "significant_digits": self.significant_digits,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "model_version": settings.MODEL_VERSION
+        }
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        return stats
+
+    def _check_fingerprint(self, calculator: TBMAdvanceRateCalculator):
+        """Clear the cache if the model version or coefficient tables changed"""
+        fingerprint = model_fingerprint(calculator)
+        if fingerprint != self._fingerprint:
+            with self._lock:
+                if self._fingerprint is not None:
+                    self.invalidations += 1
+                    logger.info("Model coefficients changed, clearing result cache")
+                self._entries.clear()
+                self._fingerprint = fingerprint
+                self._fingerprint_digest = hashlib.blake2b(repr(fingerprint).encode(), digest_size=32).digest()
+
+def model_fingerprint(calculator: TBMAdvanceRateCalculator) -> Tuple:
+    """Hashable snapshot of everything besides the inputs that shapes a result"""
+    # Insertion-ordered tuples keep this cheap enough to run on every lookup
+    return (
+        settings.MODEL_VERSION,
+        tuple([(soil, tuple(coeffs.values())) for soil, coeffs in calculator.soil_coefficients.items()]),
+        tuple(calculator.tbm_efficiency.items()),
+        calculator.regression.current().fingerprint
+    )
+
+result_cache = ResultCache(
+    max_size=settings.RESULT_CACHE_SIZE,
+    ttl=settings.RESULT_CACHE_TTL,
+    significant_digits=settings.RESULT_CACHE_SIGNIFICANT_DIGITS,
+    shared=SharedResultStore(
+        settings.SHARED_CACHE_PATH,
+        max_entries=settings.SHARED_CACHE_MAX_ENTRIES,
+        ttl=settings.SHARED_CACHE_TTL
+    ) if settings.SHARED_CACHE_PATH else None
+)
@@ -1,14 +1,92 @@
+import copy
 import math
 import logging
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
+import numpy as np
 from app.models.schemas import TBMParameters, AdvanceRateResult, SoilType, TBMType
+from app.models.records import ParameterRecord, ResultRecord, StagedResult
+from app.services.regression import RegressionModelStore, regression_features
+from app.services.risk import RiskRuleSet, RISK_LEVELS
 
 logger = logging.getLogger(__name__)
 
+# Category order used by the batch engine for index arrays
+SOIL_TYPES = list(SoilType)
+TBM_TYPES = list(TBMType)
+ROCK_SOIL_TYPES = np.array(['rock' in soil_type for soil_type in SOIL_TYPES])
+
+# Numeric TBMParameters fields, in schema order
+NUMERIC_FIELDS = (
+    "tbm_diameter", "cutterhead_power", "ucs", "rqd", "water_pressure",
+    "thrust_force", "cutterhead_speed", "chamber_pressure", "depth", "temperature"
+)
+
+# Defaults applied to optional batch columns (NaN marks a missing value)
+BATCH_DEFAULTS = {
+    "ucs": np.nan,
+    "rqd": np.nan,
+    "water_pressure": 0.0,
+    "chamber_pressure": 0.0,
+    "temperature": 20.0
+}
+
+# Scalar calculation stages (label -> method name), timed by /metrics and per-request profiling
+STAGE_METHODS = {
+    "empirical": "_empirical_method",
+    "theoretical": "_theoretical_method",
+    "regression": "_regression_method",
+    "risk_factors": "_assess_risk_factors"
+}
+
+# Stages whose outputs calculate_staged keeps (stage -> method), in evaluation order
+STAGED_METHODS = {
+    "empirical": "_empirical_method",
+    "theoretical": "_theoretical_method",
+    "regression": "_regression_method",
+    "method_weights": "_get_method_weights",
+    "risk_factors": "_assess_risk_factors"
+}
+
+# TBMParameters fields read by the scalar stages; a stage's output only
+# changes when one of its inputs does (the risk stage reads its rules' inputs)
+STAGE_INPUTS = {
+    "empirical": frozenset({"thrust_force", "tbm_diameter", "soil_type", "tbm_type", "depth", "water_pressure"}),
+    "theoretical": frozenset({
+        "soil_type", "ucs", "cutterhead_power", "cutterhead_speed", "tbm_diameter", "thrust_force", "chamber_pressure"
+    }),
+    "regression": frozenset({"tbm_diameter", "cutterhead_power", "thrust_force", "cutterhead_speed", "depth", "soil_type"}),
+    "method_weights": frozenset({"soil_type", "ucs", "rqd", "tbm_diameter"}),
+    # _combine_stages: derived metrics and confidence score
+    "combine": frozenset({"cutterhead_speed", "tbm_diameter", "cutterhead_power", "ucs", "rqd", "thrust_force"})
+}
+
+# Fields compared between parameter sets by recalculate
+STAGED_FIELDS = ParameterRecord.__slots__
+
+# (stage, inputs) in evaluation order; None stands for the risk rules' inputs
+STAGE_DEPENDENCIES = tuple((stage, STAGE_INPUTS.get(stage)) for stage in STAGED_METHODS)
+
+# Vectorized stages of calculate_batch, timed by per-request profiling
+BATCH_STAGE_METHODS = {
+    "prepare_columns": "_prepare_columns",
+    "empirical": "_empirical_method_batch",
+    "theoretical": "_theoretical_method_batch",
+    "regression": "_regression_method_batch",
+    "method_weights": "_get_method_weights_batch",
+    "confidence": "_calculate_confidence_score_batch",
+    "risk_factors": "_assess_risk_factors_batch"
+}
+
+CALCULATION_METHOD = "Hybrid (Empirical + Theoretical + Regression)"
+
 class TBMAdvanceRateCalculator:
     """Advanced TBM advance rate calculator using multiple engineering models"""
     
-    def __init__(self):
+    def __init__(self, regression_model_path: Optional[str] = None):
+        # Regression model, hot-reloaded from its trained artifact when a path is given
+        self.regression = RegressionModelStore(regression_model_path)
+        
         # Soil/rock coefficients for different calculation methods
         self.soil_coefficients = {
             SoilType.CLAY: {"k1": 0.8, "k2": 1.2, "resistance": 0.6},
@@ -28,12 +106,47 @@ class TBMAdvanceRateCalculator:
             TBMType.OPEN: 0.90,
             TBMType.MIXSHIELD: 0.82
         }
-    
+        
+        # Operational risk rules, evaluated as bitmask codes
+        self.risk_rules = RiskRuleSet()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickled state without per-instance method wrappers (e.g. metrics timing)
+
+        Copies sent to worker processes run the plain class methods.
+        """
+        cls = type(self)
+        return {name: value for name, value in self.__dict__.items() if not hasattr(cls, name)}
+
+    def with_coefficients(self, soil_coefficients: Dict[SoilType, Dict[str, float]],
+                          tbm_efficiency: Dict[TBMType, float]) -> "TBMAdvanceRateCalculator":
+        """Copy using other coefficient tables (e.g. a project calibration)
+
+        The regression model store and risk rules are shared with this
+        calculator; metrics wrappers are not carried over.
+        """
+        calibrated = copy.copy(self)
+        calibrated.soil_coefficients = soil_coefficients
+        calibrated.tbm_efficiency = tbm_efficiency
+        return calibrated
+
     def calculate_advance_rate(self, params: TBMParameters) -> AdvanceRateResult:
         """Calculate TBM advance rate using multiple methods"""
         
-        logger.info(f"Calculating advance rate for TBM diameter: {params.tbm_diameter}m")
+        logger.info("Calculating advance rate for TBM diameter: %sm", params.tbm_diameter)
+        
+        result = result_from_record(self.calculate_record(params, risk_factors=True))
         
+        logger.info("Calculated advance rate: %s mm/min", result.advance_rate)
+        return result
+    
+    def calculate_record(self, params: Union[ParameterRecord, TBMParameters],
+                         risk_factors: bool = False) -> ResultRecord:
+        """Fast path for trusted callers: no validation, logging or result model
+        
+        Accepts a ParameterRecord (or an already validated TBMParameters) and
+        returns unrounded metrics; risk factors are only assessed on request.
+        """
         # Use hybrid approach combining multiple methods
         rates = {
             "empirical": self._empirical_method(params),
@@ -44,28 +157,110 @@ class TBMAdvanceRateCalculator:
         # Weight the methods based on soil type and data availability
         weights = self._get_method_weights(params)
         
+        return self._combine_stages(params, rates, weights, self._assess_risk_factors(params) if risk_factors else None)
+    
+    def calculate_staged(self, params: Union[ParameterRecord, TBMParameters],
+                         risk_factors: bool = False) -> StagedResult:
+        """``calculate_record`` keeping every stage's output for ``recalculate``"""
+        return self.recalculate(None, params, risk_factors=risk_factors)
+    
+    def recalculate(self, previous: Optional[StagedResult], params: Union[ParameterRecord, TBMParameters],
+                    changed: Optional[Iterable[str]] = None, risk_factors: bool = False) -> StagedResult:
+        """Result for ``params`` rerunning only the stages a change from ``previous`` affects
+        
+        ``previous`` must come from this calculator (None calculates every
+        stage). ``changed`` names the fields that differ from
+        ``previous.params``; by default every field is compared. A stage
+        reruns when one of its STAGE_INPUTS changed, and the regression
+        stage also after a model reload, so the record always equals
+        ``calculate_record(params, risk_factors)``.
+        """
+        fingerprint = self.regression.current().fingerprint
+        if previous is None:
+            stages: Dict[str, Any] = {}
+            changed = frozenset(STAGED_FIELDS)
+            stale = stages_reading(changed, self.risk_rules.inputs, risk_factors)
+        else:
+            stages = previous.stages
+            if changed is None:
+                changed = [name for name in STAGED_FIELDS if getattr(params, name) != getattr(previous.params, name)]
+            changed = frozenset(changed)
+            stale = stages_reading(changed, self.risk_rules.inputs, risk_factors)
+            if risk_factors and "risk_factors" not in stages and "risk_factors" not in stale:
+                stale += ("risk_factors",)
+            if fingerprint != previous.regression_fingerprint and "regression" not in stale:
+                stale += ("regression",)
+            if stale or (not risk_factors and "risk_factors" in stages):
+                stages = dict(stages)
+                if not risk_factors:
+                    # Unrequested risk factors are not kept up to date, so not kept at all
+                    stages.pop("risk_factors", None)
+        
+        for stage in stale:
+            stages[stage] = getattr(self, STAGED_METHODS[stage])(params)
+        
+        risk = stages["risk_factors"] if risk_factors else None
+        if (previous is not None and not stale and changed.isdisjoint(STAGE_INPUTS["combine"])
+                and previous.record.risk_factors is risk):
+            record = previous.record
+        else:
+            record = self._combine_stages(
+                params,
+                {"empirical": stages["empirical"], "theoretical": stages["theoretical"], "regression": stages["regression"]},
+                stages["method_weights"],
+                risk
+            )
+        return StagedResult(params, stages, record, stale, fingerprint)
+    
+    def sweep_record(self, params: Union[ParameterRecord, TBMParameters], field: str,
+                     values: Iterable[Any], risk_factors: bool = False) -> List[ResultRecord]:
+        """Fast path results for ``params`` with one field set to each of ``values``
+        
+        Successive values only rerun the stages that read ``field``; when
+        none do, the previous record object is repeated.
+        """
+        base = params if isinstance(params, ParameterRecord) else ParameterRecord.from_parameters(params)
+        stale = stages_reading(frozenset([field]), self.risk_rules.inputs, risk_factors)
+        rerun = [(stage, getattr(self, STAGED_METHODS[stage])) for stage in stale]
+        recombine = bool(stale) or field in STAGE_INPUTS["combine"]
+        results = []
+        stages = None
+        for value in values:
+            varied = base.replace(**{field: value})
+            if stages is None:
+                staged = self.calculate_staged(varied, risk_factors)
+                stages = dict(staged.stages)
+                results.append(staged.record)
+                continue
+            for stage, method in rerun:
+                stages[stage] = method(varied)
+            if not recombine:
+                results.append(results[-1])
+                continue
+            results.append(self._combine_stages(
+                varied,
+                {"empirical": stages["empirical"], "theoretical": stages["theoretical"], "regression": stages["regression"]},
+                stages["method_weights"],
+                stages["risk_factors"] if risk_factors else None
+            ))
+        return results
+    
+    def _combine_stages(self, params: Union[ParameterRecord, TBMParameters], rates: Dict[str, float],
+                        weights: Dict[str, float], risk_factors: Optional[Dict[str, Any]] = None) -> ResultRecord:
+        """Weighted advance rate and derived metrics from the stage outputs"""
+        
         # Calculate weighted average
         advance_rate = sum(rates[method] * weights[method] for method in rates)
         
         # Calculate derived metrics
-        penetration_rate = self._calculate_penetration_rate(advance_rate, params.cutterhead_speed)
-        specific_energy = self._calculate_specific_energy(params, advance_rate)
-        daily_advance = self._calculate_daily_advance(advance_rate)
-        confidence_score = self._calculate_confidence_score(params, rates)
-        risk_factors = self._assess_risk_factors(params)
-        
-        result = AdvanceRateResult(
-            advance_rate=round(advance_rate, 2),
-            daily_advance=round(daily_advance, 2),
-            penetration_rate=round(penetration_rate, 2),
-            specific_energy=round(specific_energy, 2),
-            confidence_score=round(confidence_score, 3),
-            risk_factors=risk_factors,
-            calculation_method="Hybrid (Empirical + Theoretical + Regression)"
+        return ResultRecord(
+            advance_rate,
+            self._calculate_daily_advance(advance_rate),
+            self._calculate_penetration_rate(advance_rate, params.cutterhead_speed),
+            self._calculate_specific_energy(params, advance_rate),
+            self._calculate_confidence_score(params, rates),
+            risk_factors
         )
-        
-        logger.info(f"Calculated advance rate: {result.advance_rate} mm/min")
-        return result
     
     def _empirical_method(self, params: TBMParameters) -> float:
         """Empirical method based on field data correlations"""
@@ -122,42 +317,17 @@ class TBMAdvanceRateCalculator:
         return max(0.5, advance_rate)
     
     def _regression_method(self, params: TBMParameters) -> float:
-        """Machine learning-based regression method (simplified model)"""
-        
-        # Simplified regression model based on common TBM parameters
-        # In production, this would be replaced with a trained ML model
-        
-        # Feature engineering
-        features = {
-            'diameter': params.tbm_diameter,
-            'power_per_area': params.cutterhead_power / (math.pi * (params.tbm_diameter/2)**2),
-            'thrust_per_area': params.thrust_force / (math.pi * (params.tbm_diameter/2)**2),
-            'rotation_speed': params.cutterhead_speed,
-            'depth_factor': 1 / (1 + params.depth * 0.01),
-            'soil_hardness': self.soil_coefficients[params.soil_type]['resistance']
-        }
-        
-        # Simplified linear regression coefficients (would be learned from data)
-        coefficients = {
-            'intercept': 2.5,
-            'diameter': -0.8,
-            'power_per_area': 0.15,
-            'thrust_per_area': 0.008,
-            'rotation_speed': 1.2,
-            'depth_factor': 3.0,
-            'soil_hardness': -2.1
-        }
-        
-        # Calculate prediction
-        advance_rate = coefficients['intercept']
-        for feature, value in features.items():
-            if feature in coefficients:
-                advance_rate += coefficients[feature] * value
-        
-        # Apply bounds
-        advance_rate = max(0.5, min(advance_rate, 45.0))
-        
-        return advance_rate
+        """Linear regression method (trained artifact or built-in coefficients)"""
+        
+        features = regression_features(
+            params.tbm_diameter,
+            params.cutterhead_power,
+            params.thrust_force,
+            params.cutterhead_speed,
+            params.depth,
+            self.soil_coefficients[params.soil_type]['resistance']
+        )
+        return self.regression.current().predict_one(features)
     
     def _get_method_weights(self, params: TBMParameters) -> Dict[str, float]:
         """Determine weights for different calculation methods"""
@@ -229,44 +399,19 @@ class TBMAdvanceRateCalculator:
     
     def _assess_risk_factors(self, params: TBMParameters) -> Dict[str, Any]:
         """Assess operational risks and provide recommendations"""
-        
-        risks = {}
-        recommendations = []
-        
-        # Check for high water pressure
-        if params.water_pressure > 3:
-            risks["high_water_pressure"] = {
-                "level": "high",
-                "description": f"Water pressure of {params.water_pressure} bar may cause stability issues"
-            }
-            recommendations.append("Consider additional ground treatment or pressure relief measures")
-        
-        # Check for inadequate power
-        power_per_area = params.cutterhead_power / (math.pi * (params.tbm_diameter/2)**2)
-        if power_per_area < 150:
-            risks["low_power"] = {
-                "level": "medium",
-                "description": f"Power density of {power_per_area:.1f} kW/m² may be insufficient"
-            }
-            recommendations.append("Monitor power consumption and consider reducing advance rate if needed")
-        
-        # Check for extreme depth
-        if params.depth > 50:
-            risks["deep_tunneling"] = {
-                "level": "medium",
-                "description": f"Depth of {params.depth}m requires careful pressure management"
-            }
-            recommendations.append("Implement enhanced monitoring and ground settlement controls")
-        
-        # Check for hard rock conditions
-        if 'rock' in params.soil_type and params.ucs and params.ucs > 100:
-            risks["hard_rock"] = {
-                "level": "high",
-                "description": f"UCS of {params.ucs} MPa indicates very hard rock conditions"
-            }
-            recommendations.append("Plan for increased cutter wear and potential advance rate reductions")
-        
+        code, risks, recommendations = self.risk_rules.assess(params)
+        return {
+            "code": code,
+            "risks": risks,
+            "recommendations": recommendations,
+            "overall_risk_level": self._calculate_overall_risk_level(risks)
+        }
+    
+    def _describe_risks(self, code: int, params: TBMParameters) -> Dict[str, Any]:
+        """Readable risk factors for a risk code"""
+        risks, recommendations = self.risk_rules.describe(code, params)
         return {
+            "code": code,
             "risks": risks,
             "recommendations": recommendations,
             "overall_risk_level": self._calculate_overall_risk_level(risks)
@@ -284,4 +429,277 @@ class TBMAdvanceRateCalculator:
         elif "medium" in risk_levels:
             return "medium"
         else:
-            return "low"
\ No newline at end of file
+            return "low"
+
+    # ------------------------------------------------------------------
+    # Columnar batch engine
+    #
+    # Each *_batch method mirrors its scalar counterpart above operation by
+    # operation, so both paths produce the same floating point results.
+    # ------------------------------------------------------------------
+
+    def calculate_batch(self, columns: Dict[str, Any], risk_factors: bool = False) -> Dict[str, np.ndarray]:
+        """Calculate advance rates for whole columns of parameters at once
+
+        ``columns`` maps TBMParameters field names to equal-length arrays.
+        ``soil_type``/``tbm_type`` may hold enum members, their string values
+        or integer indices into ``SOIL_TYPES``/``TBM_TYPES``; missing ``ucs``
+        and ``rqd`` values are NaN. The returned metrics are unrounded; with
+        ``risk_factors`` they include the ``risk_code`` bitmask per row.
+        """
+        cols = self._prepare_columns(columns)
+        logger.info("Calculating advance rate batch of %s parameter sets", len(cols["soil_index"]))
+
+        rates = {
+            "empirical": self._empirical_method_batch(cols),
+            "theoretical": self._theoretical_method_batch(cols),
+            "regression": self._regression_method_batch(cols)
+        }
+        weights = self._get_method_weights_batch(cols)
+
+        advance_rate = (
+            rates["empirical"] * weights["empirical"]
+            + rates["theoretical"] * weights["theoretical"]
+            + rates["regression"] * weights["regression"]
+        )
+
+        metrics = {
+            "advance_rate": advance_rate,
+            "daily_advance": self._calculate_daily_advance(advance_rate),
+            "penetration_rate": self._calculate_penetration_rate_batch(advance_rate, cols["cutterhead_speed"]),
+            "specific_energy": self._calculate_specific_energy_batch(cols, advance_rate),
+            "confidence_score": self._calculate_confidence_score_batch(cols, rates),
+            **rates
+        }
+        if risk_factors:
+            metrics["risk_code"] = self._assess_risk_factors_batch(cols)
+        return metrics
+
+    def calculate_many(self, params_list: Sequence[TBMParameters], risk_detail: bool = True) -> List[AdvanceRateResult]:
+        """Calculate results for many validated parameter sets via the batch engine
+
+        Without ``risk_detail`` each result's risk factors are only the risk
+        code and overall level (``{"code": 5, "overall_risk_level": "high"}``);
+        the rule table to decode codes is ``risk_rules.catalog()``.
+        """
+        if not params_list:
+            return []
+
+        metrics = self.calculate_batch(parameters_to_columns(params_list), risk_factors=True)
+        columns = {
+            name: metrics[name].tolist()
+            for name in ("advance_rate", "daily_advance", "penetration_rate", "specific_energy", "confidence_score")
+        }
+        codes = metrics["risk_code"].tolist()
+        if risk_detail:
+            risk_factors = [self._describe_risks(code, params) for code, params in zip(codes, params_list)]
+        else:
+            levels = self.risk_rules.levels(metrics["risk_code"]).tolist()
+            risk_factors = [
+                {"code": code, "overall_risk_level": RISK_LEVELS[level]} for code, level in zip(codes, levels)
+            ]
+
+        return [
+            AdvanceRateResult(
+                advance_rate=round(columns["advance_rate"][i], 2),
+                daily_advance=round(columns["daily_advance"][i], 2),
+                penetration_rate=round(columns["penetration_rate"][i], 2),
+                specific_energy=round(columns["specific_energy"][i], 2),
+                confidence_score=round(columns["confidence_score"][i], 3),
+                risk_factors=risk_factors[i],
+                calculation_method=CALCULATION_METHOD
+            )
+            for i in range(len(params_list))
+        ]
+
+    def _prepare_columns(self, columns: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Convert raw columns to float arrays plus category index arrays"""
+        cols = {}
+        for field in NUMERIC_FIELDS:
+            if field in columns and columns[field] is not None:
+                values = np.array(columns[field], dtype=float)
+            elif field in BATCH_DEFAULTS:
+                values = None
+            else:
+                raise ValueError(f"Missing required column: {field}")
+            cols[field] = values
+
+        cols["soil_index"] = _category_indices(columns["soil_type"], SOIL_TYPES)
+        cols["tbm_index"] = _category_indices(columns["tbm_type"], TBM_TYPES)
+
+        size = len(cols["soil_index"])
+        for field, default in BATCH_DEFAULTS.items():
+            if cols[field] is None:
+                cols[field] = np.full(size, default)
+        for field, values in cols.items():
+            if values.shape != (size,):
+                raise ValueError(f"Column {field} must be one-dimensional with {size} values")
+
+        # Coefficient tables as index-aligned arrays
+        cols["k1"] = np.array([self.soil_coefficients[s]["k1"] for s in SOIL_TYPES])[cols["soil_index"]]
+        cols["resistance"] = np.array([self.soil_coefficients[s]["resistance"] for s in SOIL_TYPES])[cols["soil_index"]]
+        cols["tbm_eff"] = np.array([self.tbm_efficiency[t] for t in TBM_TYPES])[cols["tbm_index"]]
+        cols["is_rock"] = ROCK_SOIL_TYPES[cols["soil_index"]]
+
+        # Truthiness of optional values as used by the scalar path (None and 0 are falsy)
+        cols["has_ucs"] = ~np.isnan(cols["ucs"]) & (cols["ucs"] != 0)
+        cols["has_rqd"] = ~np.isnan(cols["rqd"]) & (cols["rqd"] != 0)
+        return cols
+
+    def _empirical_method_batch(self, cols: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized empirical method"""
+        base_rate = (cols["thrust_force"] / (math.pi * (cols["tbm_diameter"]/2)**2)) * 0.1
+        advance_rate = base_rate * cols["k1"] * cols["tbm_eff"]
+        advance_rate = advance_rate * np.maximum(0.5, 1 - (cols["depth"] - 10) * 0.01)
+        advance_rate = advance_rate * np.maximum(0.3, 1 - cols["water_pressure"] * 0.05)
+        return np.maximum(0.5, advance_rate)
+
+    def _theoretical_method_batch(self, cols: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized theoretical method"""
+        diameter = cols["tbm_diameter"]
+        power = cols["cutterhead_power"]
+        rpm = cols["cutterhead_speed"]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Rock rows with UCS
+            cutting_force = power * 1000 / rpm
+            specific_cutting_force = cols["ucs"] * 1e6 * 0.1
+            rock_rate = cutting_force / (specific_cutting_force * diameter * math.pi)
+            rock_rate = rock_rate * rpm * 60 / 1000
+
+            # Soil rows
+            penetration_resistance = cols["resistance"] * 1000
+            net_thrust = cols["thrust_force"] * 1000 - cols["chamber_pressure"] * 1e5 * math.pi * (diameter/2)**2
+            soil_rate = net_thrust / (penetration_resistance * math.pi * diameter)
+            soil_rate = np.minimum(soil_rate * 60 / 1000, 50.0)
+
+        advance_rate = np.where(
+            cols["is_rock"],
+            np.where(cols["has_ucs"], rock_rate, 5.0),
+            soil_rate
+        )
+
+        efficiency = np.minimum(1.0, power / (diameter**2 * 200))
+        return np.maximum(0.5, advance_rate * efficiency)
+
+    def _regression_method_batch(self, cols: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized regression method"""
+        features = np.column_stack(regression_features(
+            cols["tbm_diameter"],
+            cols["cutterhead_power"],
+            cols["thrust_force"],
+            cols["cutterhead_speed"],
+            cols["depth"],
+            cols["resistance"]
+        ))
+        return self.regression.current().predict(features)
+
+    def _get_method_weights_batch(self, cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Vectorized method weights"""
+        size = len(cols["soil_index"])
+        empirical = np.full(size, 0.4)
+        theoretical = np.full(size, 0.35)
+        regression = np.full(size, 0.25)
+
+        data_rich_rock = cols["is_rock"] & cols["has_ucs"] & cols["has_rqd"]
+        theoretical = np.where(data_rich_rock, theoretical + 0.1, theoretical)
+        empirical = np.where(data_rich_rock, empirical - 0.05, empirical)
+        regression = np.where(data_rich_rock, regression - 0.05, regression)
+
+        extreme_size = (cols["tbm_diameter"] > 12) | (cols["tbm_diameter"] < 3)
+        empirical = np.where(extreme_size, empirical + 0.1, empirical)
+        theoretical = np.where(extreme_size, theoretical - 0.05, theoretical)
+        regression = np.where(extreme_size, regression - 0.05, regression)
+
+        return {"empirical": empirical, "theoretical": theoretical, "regression": regression}
+
+    def _calculate_penetration_rate_batch(self, advance_rate: np.ndarray, rpm: np.ndarray) -> np.ndarray:
+        """Vectorized penetration rate in mm per revolution"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(rpm > 0, advance_rate / rpm, 0.0)
+
+    def _calculate_specific_energy_batch(self, cols: Dict[str, np.ndarray], advance_rate: np.ndarray) -> np.ndarray:
+        """Vectorized specific energy in kWh/m³"""
+        volume_rate = math.pi * (cols["tbm_diameter"]/2)**2 * (advance_rate/1000) / 60
+        with np.errstate(divide="ignore", invalid="ignore"):
+            specific_energy = cols["cutterhead_power"] / (volume_rate * 3600)
+        return np.where((advance_rate > 0) & (volume_rate > 0), specific_energy, 0.0)
+
+    def _calculate_confidence_score_batch(self, cols: Dict[str, np.ndarray], rates: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized confidence score"""
+        available_params = 8 + (~np.isnan(cols["ucs"])).astype(int) + (~np.isnan(cols["rqd"])).astype(int)
+        completeness_score = np.minimum(1.0, available_params / 10)
+
+        empirical, theoretical, regression = rates["empirical"], rates["theoretical"], rates["regression"]
+        mean_rate = (empirical + theoretical + regression) / 3
+        variance = ((empirical - mean_rate)**2 + (theoretical - mean_rate)**2 + (regression - mean_rate)**2) / 3
+        consistency_score = np.maximum(0.3, 1 - np.sqrt(variance) / mean_rate)
+
+        area = math.pi * (cols["tbm_diameter"]/2)**2
+        feasibility_score = np.ones(len(area))
+        feasibility_score = np.where(cols["thrust_force"] / area > 5000, feasibility_score * 0.9, feasibility_score)
+        feasibility_score = np.where(cols["cutterhead_power"] / area < 100, feasibility_score * 0.8, feasibility_score)
+
+        return completeness_score * 0.4 + consistency_score * 0.4 + feasibility_score * 0.2
+
+    def _assess_risk_factors_batch(self, cols: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized risk codes"""
+        return self.risk_rules.codes(cols)
+
+
+def result_from_record(record: ResultRecord) -> AdvanceRateResult:
+    """Rounded API result from a fast path result with risk factors"""
+    return AdvanceRateResult(**result_values(record))
+
+def result_values(record: ResultRecord) -> Dict[str, Any]:
+    """Field values of the rounded API result, without building the model"""
+    return {
+        "advance_rate": round(record.advance_rate, 2),
+        "daily_advance": round(record.daily_advance, 2),
+        "penetration_rate": round(record.penetration_rate, 2),
+        "specific_energy": round(record.specific_energy, 2),
+        "confidence_score": round(record.confidence_score, 3),
+        "risk_factors": record.risk_factors,
+        "calculation_method": CALCULATION_METHOD
+    }
+
+@lru_cache(maxsize=256)
+def stages_reading(changed: FrozenSet[str], risk_inputs: FrozenSet[str], risk_factors: bool) -> Tuple[str, ...]:
+    """Stages of STAGED_METHODS that read any of the ``changed`` fields, in evaluation order"""
+    return tuple(
+        stage for stage, inputs in STAGE_DEPENDENCIES
+        if (inputs is not None or risk_factors) and not changed.isdisjoint(inputs or risk_inputs)
+    )
+
+def parameters_to_columns(params_list: Sequence[Union[ParameterRecord, TBMParameters]]) -> Dict[str, Any]:
+    """Transpose parameter sets (validated models or records) into batch engine columns"""
+    columns = {
+        field: [getattr(params, field) for params in params_list]
+        for field in NUMERIC_FIELDS
+    }
+    for field in ("ucs", "rqd"):
+        columns[field] = [np.nan if value is None else value for value in columns[field]]
+    columns["soil_type"] = [params.soil_type for params in params_list]
+    columns["tbm_type"] = [params.tbm_type for params in params_list]
+    return columns
+
+
+def _category_indices(values: Any, categories: List[Any]) -> np.ndarray:
+    """Map enum members, string values or integer codes to category indices"""
+    name = categories[0].__class__.__name__
+
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+        if values.size and (values.min() < 0 or values.max() >= len(categories)):
+            raise ValueError(f"{name} index out of range")
+        return values.astype(np.intp)
+
+    lookup = {category.value: index for index, category in enumerate(categories)}
+    lookup.update({index: index for index in range(len(categories))})
+    try:
+        if isinstance(values, np.ndarray) and values.dtype.kind == "U":
+            # Resolve each distinct string once instead of once per row
+            uniques, inverse = np.unique(values, return_inverse=True)
+            return np.array([lookup[value] for value in uniques], dtype=np.intp)[inverse.reshape(-1)]
+        return np.array([lookup[value] for value in values], dtype=np.intp)
+    except KeyError as e:
+        raise ValueError(f"Unknown {name} value: {e.args[0]}")
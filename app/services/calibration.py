@@ -0,0 +1,426 @@
+import os
+import re
+import csv
+import json
+import time
+import fcntl
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, TextIO, Tuple
+import numpy as np
+
+from app.models.schemas import SoilType, TBMType
+from app.services.calculator import (TBMAdvanceRateCalculator, NUMERIC_FIELDS, BATCH_DEFAULTS, SOIL_TYPES,
+                                     TBM_TYPES)
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Calibrated coefficients in parameter vector order: k1 and resistance per
+# soil type, then efficiency per TBM type. k2 is not used by any method.
+CALIBRATED_PARAMETERS = (
+    [f"k1.{soil.value}" for soil in SOIL_TYPES]
+    + [f"resistance.{soil.value}" for soil in SOIL_TYPES]
+    + [f"tbm_efficiency.{tbm.value}" for tbm in TBM_TYPES]
+)
+RESISTANCE_OFFSET = len(SOIL_TYPES)
+EFFICIENCY_OFFSET = 2 * len(SOIL_TYPES)
+
+# Estimates are multipliers of the base tables, kept within these bounds
+MULTIPLIER_BOUNDS = (0.1, 10.0)
+
+# Relative step of the finite differences that linearize the prediction
+DIFFERENCE_STEP = 1e-6
+
+# Halvings of a Gauss-Newton step before a refit gives up on improving
+MAX_STEP_HALVINGS = 5
+
+PROJECT_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+class CoefficientSet:
+    """Soil coefficient and TBM efficiency tables of one calibration version"""
+
+    def __init__(self, soil_coefficients: Dict[SoilType, Dict[str, float]], tbm_efficiency: Dict[TBMType, float],
+                 version: int = 0, metadata: Optional[Dict[str, Any]] = None):
+        self.soil_coefficients = soil_coefficients
+        self.tbm_efficiency = tbm_efficiency
+        self.version = version
+        self.metadata = metadata or {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            **self.metadata,
+            "version": self.version,
+            "model_version": settings.MODEL_VERSION,
+            "soil_coefficients": {soil.value: coeffs for soil, coeffs in self.soil_coefficients.items()},
+            "tbm_efficiency": {tbm.value: efficiency for tbm, efficiency in self.tbm_efficiency.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CoefficientSet":
+        metadata = {
+            key: value for key, value in data.items()
+            if key not in ("version", "soil_coefficients", "tbm_efficiency")
+        }
+        return cls(
+            {SoilType(soil): dict(coeffs) for soil, coeffs in data["soil_coefficients"].items()},
+            {TBMType(tbm): float(efficiency) for tbm, efficiency in data["tbm_efficiency"].items()},
+            int(data["version"]),
+            metadata
+        )
+
+class RecursiveCalibrator:
+    """Recursive least squares estimate of one project's coefficient tables
+
+    The estimate is a vector of multipliers of the base calculator's
+    tables (1 = uncalibrated) with a ridge prior that weighs like
+    ``prior_weight`` observations agreeing with the base tables. Each
+    observation linearizes the hybrid prediction around the current
+    estimate by finite differences through the batch engine, so an update
+    costs the same however many observations came before. With
+    ``forgetting`` below 1 older observations fade out (their weight halves
+    after ln 2 / (1 - forgetting) observations), letting the estimate follow
+    ground conditions that drift along a drive; the prior does not fade.
+
+    ``refit`` solves the same problem over a whole history at once by
+    Gauss-Newton iterations on vectorized normal equations.
+    """
+
+    def __init__(self, base: TBMAdvanceRateCalculator, forgetting: float = 1.0, prior_weight: float = 20.0):
+        if not 0 < forgetting <= 1:
+            raise ValueError("forgetting must be in (0, 1]")
+        if prior_weight <= 0:
+            raise ValueError("prior_weight must be positive")
+        self.base = base
+        self.forgetting = forgetting
+        self.prior_weight = prior_weight
+        self.theta = np.ones(len(CALIBRATED_PARAMETERS))
+        self.covariance = np.eye(len(CALIBRATED_PARAMETERS)) / prior_weight
+        self.samples = 0
+
+        self._k1 = np.array([base.soil_coefficients[soil]["k1"] for soil in SOIL_TYPES])
+        self._resistance = np.array([base.soil_coefficients[soil]["resistance"] for soil in SOIL_TYPES])
+        self._efficiency = np.array([base.tbm_efficiency[tbm] for tbm in TBM_TYPES])
+
+    def update(self, columns: Dict[str, Any], observed: np.ndarray) -> Dict[str, float]:
+        """Add observations in order; returns the RMSE before and after (mm/min)
+
+        ``columns`` are batch engine columns of the observed parameter sets.
+        """
+        observed = np.asarray(observed, dtype=float)
+        cols = self.base._prepare_columns(columns)
+        prediction, jacobian, index = self._linearize(cols, self.theta)
+        residuals = observed - prediction
+        jacobian, index = np.column_stack(jacobian), np.column_stack(index)
+
+        start = self.theta.copy()
+        theta, covariance, forgetting = self.theta, self.covariance, self.forgetting
+        prior_trace = len(CALIBRATED_PARAMETERS) / self.prior_weight
+        for values, columns_used, residual in zip(jacobian, index, residuals):
+            # Residual under the linearized model at the current estimate
+            residual -= values @ (theta[columns_used] - start[columns_used])
+            projected = covariance[:, columns_used] @ values
+            gain = projected / (forgetting + values @ projected[columns_used])
+            theta += gain * residual
+            covariance -= np.outer(gain, projected)
+            # Forgetting inflates the covariance, but never beyond the prior
+            # (coefficients of ground the drive is not in would wind up)
+            if forgetting < 1 and np.trace(covariance) < prior_trace:
+                covariance /= forgetting
+        np.clip(theta, *MULTIPLIER_BOUNDS, out=theta)
+        self.samples += len(observed)
+
+        after = observed - self._linearize(cols, theta, derivatives=False)[0]
+        return {"rmse_before": _rmse(residuals), "rmse_after": _rmse(after)}
+
+    def refit(self, columns: Dict[str, Any], observed: np.ndarray, iterations: int = 10,
+              tolerance: float = 1e-4) -> Dict[str, float]:
+        """Replace the estimate by a batch fit to ``observed`` (oldest first)
+
+        Gauss-Newton on the recency-weighted squared error plus the ridge
+        prior toward the base coefficients. Steps are halved until the
+        objective decreases, since the methods' caps and floors put kinks in
+        it; iteration stops when no multiplier moves by more than
+        ``tolerance`` or the objective no longer improves.
+        """
+        observed = np.asarray(observed, dtype=float)
+        cols = self.base._prepare_columns(columns)
+        cols["method_weights"] = self.base._get_method_weights_batch(cols)
+        size = len(CALIBRATED_PARAMETERS)
+        count = len(observed)
+
+        # Recency weights matching the recursive update's forgetting
+        weights = self.forgetting ** np.arange(count - 1, -1, -1.0) if self.forgetting < 1 else np.ones(count)
+
+        def objective(residuals: np.ndarray, theta: np.ndarray) -> float:
+            return float(weights @ residuals**2 + self.prior_weight * np.sum((theta - 1)**2))
+
+        theta = np.ones(size)
+        residuals = observed - self._linearize(cols, theta, derivatives=False)[0]
+        before = _rmse(residuals)
+        current = objective(residuals, theta)
+        for _ in range(iterations):
+            _, jacobian, index = self._linearize(cols, theta)
+
+            # Normal equations of the three coefficients each row depends on
+            normal = np.zeros((size, size))
+            gradient = -self.prior_weight * (theta - 1)
+            weighted = [weights * column for column in jacobian]
+            for a in range(3):
+                gradient += np.bincount(index[a], weights=weighted[a] * residuals, minlength=size)
+                for b in range(a, 3):
+                    block = np.bincount(
+                        index[a] * size + index[b], weights=weighted[a] * jacobian[b], minlength=size * size
+                    ).reshape(size, size)
+                    normal += block if a == b else block + block.T
+            normal += np.eye(size) * self.prior_weight
+            step = np.linalg.solve(normal, gradient)
+
+            for _ in range(MAX_STEP_HALVINGS + 1):
+                updated = np.clip(theta + step, *MULTIPLIER_BOUNDS)
+                updated_residuals = observed - self._linearize(cols, updated, derivatives=False)[0]
+                updated_objective = objective(updated_residuals, updated)
+                if updated_objective < current:
+                    break
+                step /= 2
+            else:
+                break
+
+            change = np.max(np.abs(updated - theta))
+            improvement = current - updated_objective
+            theta, residuals, current = updated, updated_residuals, updated_objective
+            if change < tolerance or improvement <= tolerance * current:
+                break
+
+        self.theta = theta
+        self.covariance = np.linalg.inv(normal)
+        self.samples = count
+        return {"rmse_before": before, "rmse_after": _rmse(residuals)}
+
+    def coefficients(self, metadata: Optional[Dict[str, Any]] = None) -> CoefficientSet:
+        """Coefficient tables of the current estimate"""
+        k1 = self._k1 * self.theta[:RESISTANCE_OFFSET]
+        resistance = self._resistance * self.theta[RESISTANCE_OFFSET:EFFICIENCY_OFFSET]
+        efficiency = self._efficiency * self.theta[EFFICIENCY_OFFSET:]
+        soil_coefficients = {
+            soil: {**self.base.soil_coefficients[soil], "k1": float(k1[i]), "resistance": float(resistance[i])}
+            for i, soil in enumerate(SOIL_TYPES)
+        }
+        tbm_efficiency = {tbm: float(efficiency[i]) for i, tbm in enumerate(TBM_TYPES)}
+        return CoefficientSet(soil_coefficients, tbm_efficiency, metadata={
+            **(metadata or {}), "samples": self.samples, "multipliers": self.multipliers()
+        })
+
+    def multipliers(self) -> Dict[str, float]:
+        return {name: round(float(value), 6) for name, value in zip(CALIBRATED_PARAMETERS, self.theta)}
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "model_version": settings.MODEL_VERSION,
+            "samples": self.samples,
+            "forgetting": self.forgetting,
+            "prior_weight": self.prior_weight,
+            "parameters": CALIBRATED_PARAMETERS,
+            "theta": self.theta.tolist(),
+            "covariance": self.covariance.tolist()
+        }
+
+    def load_state(self, state: Dict[str, Any]):
+        """Continue from a saved state of the same model version and parameter layout"""
+        if state.get("model_version") != settings.MODEL_VERSION or state.get("parameters") != CALIBRATED_PARAMETERS:
+            raise ValueError("Calibration state is for another model version or parameter layout")
+        self.samples = int(state["samples"])
+        self.theta = np.array(state["theta"], dtype=float)
+        self.covariance = np.array(state["covariance"], dtype=float)
+
+    def _linearize(self, cols: Dict[str, np.ndarray], theta: np.ndarray, derivatives: bool = True
+                   ) -> Tuple[np.ndarray, Optional[List[np.ndarray]], Optional[List[np.ndarray]]]:
+        """Prediction at ``theta`` and its derivatives by the three multipliers each row uses
+
+        The derivatives and the multiplier indices are returned as three
+        columns each: k1, resistance and TBM efficiency.
+        """
+        soil, tbm = cols["soil_index"], cols["tbm_index"]
+        index = [soil, RESISTANCE_OFFSET + soil, EFFICIENCY_OFFSET + tbm]
+        multipliers = [theta[column] for column in index]
+        k1 = self._k1[soil] * multipliers[0]
+        resistance = self._resistance[soil] * multipliers[1]
+        efficiency = self._efficiency[tbm] * multipliers[2]
+        # Coefficients do not change the method weights; refit computes them once
+        weights = cols.get("method_weights") or self.base._get_method_weights_batch(cols)
+
+        def empirical(k1, efficiency):
+            return weights["empirical"] * self.base._empirical_method_batch({**cols, "k1": k1, "tbm_eff": efficiency})
+
+        def resistance_based(resistance):
+            varied = {**cols, "resistance": resistance}
+            return (weights["theoretical"] * self.base._theoretical_method_batch(varied)
+                    + weights["regression"] * self.base._regression_method_batch(varied))
+
+        base_empirical = empirical(k1, efficiency)
+        base_resistance = resistance_based(resistance)
+        prediction = base_empirical + base_resistance
+        if not derivatives:
+            return prediction, None, None
+
+        step = 1 + DIFFERENCE_STEP
+        jacobian = [
+            (empirical(k1 * step, efficiency) - base_empirical) / (DIFFERENCE_STEP * multipliers[0]),
+            (resistance_based(resistance * step) - base_resistance) / (DIFFERENCE_STEP * multipliers[1]),
+            (empirical(k1, efficiency * step) - base_empirical) / (DIFFERENCE_STEP * multipliers[2])
+        ]
+        return prediction, jacobian, index
+
+class CalibrationStore:
+    """Published coefficient sets and online calibration state per project
+
+    ``<directory>/<project>/v<N>.json`` are immutable published versions
+    and ``state.json`` the running RLS estimate. Versions are cached once
+    read; which one is latest is rechecked at most every
+    ``check_interval`` seconds, so every worker serves a new version
+    shortly after it is published.
+    """
+
+    def __init__(self, directory: str, check_interval: float = settings.CALIBRATION_RELOAD_INTERVAL):
+        self.directory = Path(directory)
+        self.check_interval = check_interval
+        self._sets: Dict[Tuple[str, int], CoefficientSet] = {}
+        self._latest: Dict[str, Tuple[float, Optional[int]]] = {}
+
+    def versions(self, project: str) -> List[int]:
+        try:
+            names = os.listdir(self._project_dir(project))
+        except FileNotFoundError:
+            return []
+        return sorted(int(name[1:-5]) for name in names if re.fullmatch(r"v\d+\.json", name))
+
+    def latest_version(self, project: str) -> Optional[int]:
+        now = time.monotonic()
+        checked = self._latest.get(project)
+        if checked is None or checked[0] <= now:
+            versions = self.versions(project)
+            checked = (now + self.check_interval, versions[-1] if versions else None)
+            self._latest[project] = checked
+        return checked[1]
+
+    def load(self, project: str, version: Optional[int] = None) -> Optional[CoefficientSet]:
+        """A published version (the latest by default), None if there is none"""
+        if version is None:
+            version = self.latest_version(project)
+            if version is None:
+                return None
+        key = (project, version)
+        coefficients = self._sets.get(key)
+        if coefficients is None:
+            path = self._project_dir(project) / f"v{version}.json"
+            try:
+                coefficients = CoefficientSet.from_dict(json.loads(path.read_text()))
+            except FileNotFoundError:
+                return None
+            self._sets[key] = coefficients
+        return coefficients
+
+    def publish(self, project: str, coefficients: CoefficientSet) -> CoefficientSet:
+        """Save ``coefficients`` as the project's next version"""
+        directory = self._project_dir(project)
+        directory.mkdir(parents=True, exist_ok=True)
+        version = (self.versions(project) or [0])[-1] + 1
+        while True:
+            try:
+                # Exclusive create: concurrent publishers get distinct versions
+                descriptor = os.open(directory / f"v{version}.json", os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+                break
+            except FileExistsError:
+                version += 1
+        published = CoefficientSet(coefficients.soil_coefficients, coefficients.tbm_efficiency, version, {
+            **coefficients.metadata, "published_at": time.time()
+        })
+        with os.fdopen(descriptor, "w") as stream:
+            json.dump(published.as_dict(), stream, indent=2)
+        self._sets[(project, version)] = published
+        self._latest[project] = (time.monotonic() + self.check_interval, version)
+        logger.info("Published calibration version %s for project %s", version, project)
+        return published
+
+    def state(self, project: str) -> Optional[Dict[str, Any]]:
+        """Saved online calibration state, None if the project has none"""
+        try:
+            return json.loads((self._project_dir(project) / "state.json").read_text())
+        except FileNotFoundError:
+            return None
+
+    @contextmanager
+    def calibrator(self, project: str, base: TBMAdvanceRateCalculator,
+                   forgetting: float = settings.CALIBRATION_FORGETTING,
+                   prior_weight: float = settings.CALIBRATION_PRIOR_WEIGHT) -> Iterator[RecursiveCalibrator]:
+        """The project's online calibrator, locked across workers and saved on exit"""
+        directory = self._project_dir(project)
+        directory.mkdir(parents=True, exist_ok=True)
+        state_path = directory / "state.json"
+        with open(directory / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            calibrator = RecursiveCalibrator(base, forgetting, prior_weight)
+            try:
+                calibrator.load_state(json.loads(state_path.read_text()))
+            except FileNotFoundError:
+                pass
+            except (ValueError, KeyError) as e:
+                logger.warning("Discarding calibration state of project %s: %s", project, e)
+            yield calibrator
+            temporary = state_path.with_name("state.json.tmp")
+            temporary.write_text(json.dumps(calibrator.state()))
+            os.replace(temporary, state_path)
+
+    def _project_dir(self, project: str) -> Path:
+        if not PROJECT_NAME.match(project):
+            raise ValueError(f"Invalid project name {project!r}: use letters, digits, '.', '_' or '-'")
+        return self.directory / project
+
+def read_observations(stream: TextIO) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Batch engine columns and observed advance rates from a CSV of drive records
+
+    Needs every required TBMParameters field, ``soil_type``, ``tbm_type``
+    and the observed ``advance_rate`` (mm/min); optional fields may be
+    absent or empty. Rows with unparsable values are skipped.
+    """
+    reader = csv.reader(stream)
+    header = [name.strip() for name in next(reader, [])]
+    required = [field for field in NUMERIC_FIELDS if field not in BATCH_DEFAULTS]
+    missing = set(required + ["soil_type", "tbm_type", "advance_rate"]) - set(header)
+    if missing:
+        raise ValueError(f"Drive records are missing columns: {', '.join(sorted(missing))}")
+
+    numeric = [field for field in NUMERIC_FIELDS if field in header] + ["advance_rate"]
+    positions = [header.index(field) for field in numeric]
+    defaults = [BATCH_DEFAULTS.get(field) for field in numeric]
+    soil_position, tbm_position = header.index("soil_type"), header.index("tbm_type")
+    soil_lookup = {soil.value: index for index, soil in enumerate(SOIL_TYPES)}
+    tbm_lookup = {tbm.value: index for index, tbm in enumerate(TBM_TYPES)}
+
+    rows, soils, tbms = [], [], []
+    for row in reader:
+        try:
+            values = [
+                float(row[position]) if row[position].strip() or default is None else default
+                for position, default in zip(positions, defaults)
+            ]
+            soil, tbm = soil_lookup[row[soil_position].strip()], tbm_lookup[row[tbm_position].strip()]
+        except (ValueError, KeyError, IndexError):
+            continue
+        rows.append(values)
+        soils.append(soil)
+        tbms.append(tbm)
+    if not rows:
+        raise ValueError("No usable drive records")
+
+    data = np.array(rows)
+    columns: Dict[str, Any] = {field: data[:, i] for i, field in enumerate(numeric[:-1])}
+    columns["soil_type"] = np.array(soils, dtype=np.intp)
+    columns["tbm_type"] = np.array(tbms, dtype=np.intp)
+    return columns, data[:, -1]
+
+def _rmse(residuals: np.ndarray) -> float:
+    return round(float(np.sqrt(np.mean(residuals**2))), 4) if len(residuals) else 0.0
+
+calibration_store = CalibrationStore(settings.CALIBRATION_DIR)
@@ -0,0 +1,124 @@
+import logging
+from typing import Dict, Any, List
+import numpy as np
+
+from app.models.schemas import DriveRequest, AlignmentSegment
+from app.services.calculator import TBMAdvanceRateCalculator, SOIL_TYPES, TBM_TYPES
+
+logger = logging.getLogger(__name__)
+
+class DriveSimulation:
+    """Ring-by-ring drive through an alignment with a cumulative time-chainage curve
+
+    ``boundaries`` holds the n + 1 ring boundary chainages and ``cumulative``
+    the prefix sums of ring times in minutes at those boundaries, so the
+    time to reach any chainage is a binary search plus one interpolation.
+    """
+
+    def __init__(self, boundaries: np.ndarray, advance_rates: np.ndarray, ring_minutes: np.ndarray,
+                 segment_index: np.ndarray, segments: List[AlignmentSegment], working_hours: float):
+        self.boundaries = boundaries
+        self.advance_rates = advance_rates
+        self.ring_minutes = ring_minutes
+        self.segment_index = segment_index
+        self.segments = segments
+        self.working_hours = working_hours
+        self.cumulative = np.concatenate(([0.0], np.cumsum(ring_minutes)))
+
+    @classmethod
+    def simulate(cls, calculator: TBMAdvanceRateCalculator, request: DriveRequest) -> "DriveSimulation":
+        """Evaluate every ring of the alignment in one batch"""
+        segments = request.segments
+        start, end = segments[0].start_chainage, segments[-1].end_chainage
+        boundaries = np.append(np.arange(start, end, request.ring_length), end)
+        # Drop a sliver ring left over by floating point steps
+        if len(boundaries) > 2 and boundaries[-1] - boundaries[-2] < 1e-9:
+            boundaries = np.delete(boundaries, -2)
+
+        # Each ring is bored in the ground at its midpoint
+        midpoints = (boundaries[:-1] + boundaries[1:]) / 2
+        segment_starts = np.array([segment.start_chainage for segment in segments])
+        segment_index = np.searchsorted(segment_starts, midpoints, side="right") - 1
+
+        columns: Dict[str, Any] = {
+            field: np.full(len(midpoints), value)
+            for field, value in request.machine.model_dump(exclude={"tbm_type"}).items()
+        }
+        for field in ("ucs", "rqd", "depth", "water_pressure"):
+            values = np.array([getattr(segment, field) for segment in segments], dtype=float)
+            columns[field] = values[segment_index]
+        soil_indices = np.array([SOIL_TYPES.index(segment.soil_type) for segment in segments])
+        columns["soil_type"] = soil_indices[segment_index]
+        columns["tbm_type"] = np.full(len(midpoints), TBM_TYPES.index(request.machine.tbm_type))
+
+        advance_rates = calculator.calculate_batch(columns)["advance_rate"]
+        ring_minutes = np.diff(boundaries) * 1000 / advance_rates + request.ring_build_time
+
+        logger.info("Simulated drive of %.0f m in %s rings", end - start, len(midpoints))
+        return cls(boundaries, advance_rates, ring_minutes, segment_index, segments, request.working_hours)
+
+    @property
+    def length(self) -> float:
+        return float(self.boundaries[-1] - self.boundaries[0])
+
+    def minutes_at(self, chainage: Any) -> Any:
+        """Cumulative operating minutes to reach ``chainage`` (scalar or array), O(log n) each"""
+        return np.interp(chainage, self.boundaries, self.cumulative)
+
+    def hours_between(self, start: float, end: float) -> float:
+        """Operating hours to drive from ``start`` to ``end`` (clamped to the alignment)"""
+        return float(self.minutes_at(end) - self.minutes_at(start)) / 60
+
+    def profile(self, points: int) -> List[Dict[str, float]]:
+        """Evenly spaced points on the time-chainage curve"""
+        chainages = np.linspace(self.boundaries[0], self.boundaries[-1], points)
+        hours = self.minutes_at(chainages) / 60
+        return [
+            {"chainage": round(c, 2), "hours": round(h, 2), "days": round(h / self.working_hours, 2)}
+            for c, h in zip(chainages.tolist(), hours.tolist())
+        ]
+
+    def segment_summaries(self) -> List[Dict[str, Any]]:
+        """Ring counts, average advance rate and hours per segment"""
+        count = len(self.segments)
+        ring_lengths = np.diff(self.boundaries)
+        rings = np.bincount(self.segment_index, minlength=count)
+        hours = np.bincount(self.segment_index, weights=self.ring_minutes, minlength=count) / 60
+        length = np.bincount(self.segment_index, weights=ring_lengths, minlength=count)
+        boring = np.bincount(self.segment_index, weights=ring_lengths * 1000 / self.advance_rates, minlength=count)
+
+        summaries = []
+        for i, segment in enumerate(self.segments):
+            summaries.append({
+                "start_chainage": segment.start_chainage,
+                "end_chainage": segment.end_chainage,
+                "soil_type": segment.soil_type,
+                "rings": int(rings[i]),
+                "advance_rate": round(float(length[i] * 1000 / boring[i]), 2) if rings[i] else 0.0,
+                "hours": round(float(hours[i]), 2)
+            })
+        return summaries
+
+    def summary(self, profile_points: int = 200, ranges: List[Any] = ()) -> Dict[str, Any]:
+        """Whole-drive result in the shape of DriveResult"""
+        total_hours = float(self.cumulative[-1]) / 60
+        boring_minutes = float(np.sum(np.diff(self.boundaries) * 1000 / self.advance_rates))
+        range_times = []
+        for chainage_range in ranges:
+            hours = self.hours_between(chainage_range.start, chainage_range.end)
+            range_times.append({
+                "start": chainage_range.start,
+                "end": chainage_range.end,
+                "hours": round(hours, 2),
+                "days": round(hours / self.working_hours, 2)
+            })
+        return {
+            "length": round(self.length, 2),
+            "rings": len(self.ring_minutes),
+            "total_hours": round(total_hours, 2),
+            "total_days": round(total_hours / self.working_hours, 2),
+            "advance_rate": round(self.length * 1000 / boring_minutes, 2),
+            "segments": self.segment_summaries(),
+            "profile": self.profile(profile_points),
+            "ranges": range_times
+        }
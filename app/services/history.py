@@ -0,0 +1,383 @@
+import json
+import math
+import time
+import sqlite3
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+from app.models.schemas import TBMParameters, AdvanceRateResult
+from app.services.regression import RegressionModel
+from app.core.database import connect, sqlite_path
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calculations (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    soil_type TEXT NOT NULL,
+    tbm_type TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    project TEXT,
+    calibration_version INTEGER,
+    source TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    advance_rate REAL NOT NULL,
+    daily_advance REAL NOT NULL,
+    penetration_rate REAL NOT NULL,
+    specific_energy REAL NOT NULL,
+    confidence_score REAL NOT NULL,
+    risk_level TEXT
+);
+CREATE INDEX IF NOT EXISTS calculations_created ON calculations (created_at);
+CREATE INDEX IF NOT EXISTS calculations_soil_created ON calculations (soil_type, created_at);
+CREATE INDEX IF NOT EXISTS calculations_tbm_created ON calculations (tbm_type, created_at);
+CREATE INDEX IF NOT EXISTS calculations_model_created ON calculations (model_version, created_at);
+CREATE TABLE IF NOT EXISTS calculation_rollups (
+    bucket INTEGER NOT NULL,
+    soil_type TEXT NOT NULL,
+    tbm_type TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    project TEXT NOT NULL,
+    source TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    advance_rate_sum REAL NOT NULL,
+    advance_rate_min REAL NOT NULL,
+    advance_rate_max REAL NOT NULL,
+    daily_advance_sum REAL NOT NULL,
+    confidence_sum REAL NOT NULL,
+    PRIMARY KEY (bucket, soil_type, tbm_type, model_version, project, source)
+) WITHOUT ROWID;
+"""
+
+INSERT = (
+    "INSERT INTO calculations (created_at, soil_type, tbm_type, model_version, project, calibration_version, "
+    "source, parameters, advance_rate, daily_advance, penetration_rate, specific_energy, confidence_score, "
+    "risk_level) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+UPSERT_ROLLUP = (
+    "INSERT INTO calculation_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT DO UPDATE SET count = count + excluded.count, "
+    "advance_rate_sum = advance_rate_sum + excluded.advance_rate_sum, "
+    "advance_rate_min = MIN(advance_rate_min, excluded.advance_rate_min), "
+    "advance_rate_max = MAX(advance_rate_max, excluded.advance_rate_max), "
+    "daily_advance_sum = daily_advance_sum + excluded.daily_advance_sum, "
+    "confidence_sum = confidence_sum + excluded.confidence_sum"
+)
+
+# Seconds per rollup bucket
+ROLLUP_SECONDS = 3600
+
+# Columns that can be filtered on with equality
+FILTER_COLUMNS = ("soil_type", "tbm_type", "model_version", "project", "source")
+
+# Aggregation keys and their SQL over a time column; time buckets are UTC
+GROUP_EXPRESSIONS = {
+    "soil_type": "soil_type",
+    "tbm_type": "tbm_type",
+    "model_version": "model_version",
+    "project": "NULLIF(project, '')",
+    "source": "source",
+    "hour": "CAST({time} / 3600 AS INTEGER) * 3600",
+    "day": "CAST({time} / 86400 AS INTEGER) * 86400",
+    "month": "strftime('%Y-%m', {time}, 'unixepoch')"
+}
+
+def model_version(model: RegressionModel) -> str:
+    """MODEL_VERSION, plus the training time of a trained regression model"""
+    trained_at = model.metadata.get("trained_at")
+    return f"{settings.MODEL_VERSION}+{trained_at}" if trained_at else settings.MODEL_VERSION
+
+class HistoryStore:
+    """Calculation history table in the SQLite file of DATABASE_URL
+
+    Rows are only appended. Every filter column has an index led by it
+    and followed by ``created_at``, so filtered time ranges are index range
+    scans. Pages are keyset-paginated on ``(created_at, id)``, newest first,
+    so fetching any page costs the same however deep it is.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+    def insert_many(self, rows: Sequence[tuple]):
+        """Append rows (in INSERT column order) and update their hourly rollups in one transaction"""
+        rollups: Dict[tuple, list] = {}
+        for row in rows:
+            key = (int(row[0] // ROLLUP_SECONDS) * ROLLUP_SECONDS, row[1], row[2], row[3], row[4] or "", row[6])
+            rate = row[8]
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollups[key] = [1, rate, rate, rate, row[9], row[12]]
+            else:
+                rollup[0] += 1
+                rollup[1] += rate
+                rollup[2] = min(rollup[2], rate)
+                rollup[3] = max(rollup[3], rate)
+                rollup[4] += row[9]
+                rollup[5] += row[12]
+        with self._transaction() as connection:
+            connection.executemany(INSERT, rows)
+            connection.executemany(UPSERT_ROLLUP, [key + tuple(values) for key, values in rollups.items()])
+
+    def page(self, filters: Dict[str, Any], limit: int = 100,
+             cursor: Optional[Tuple[float, int]] = None) -> Tuple[List[Dict[str, Any]], Optional[Tuple[float, int]]]:
+        """Newest rows matching ``filters``, and the cursor of the next page (None on the last)"""
+        where, values = self._where(filters)
+        if cursor is not None:
+            where.append("(created_at, id) < (?, ?)")
+            values.extend(cursor)
+        rows = self._connection().execute(
+            f"SELECT * FROM calculations {self._clause(where)} ORDER BY created_at DESC, id DESC LIMIT ?",
+            (*values, limit + 1)
+        ).fetchall()
+
+        entries = [dict(row) for row in rows[:limit]]
+        for entry in entries:
+            entry["parameters"] = json.loads(entry["parameters"])
+        next_cursor = (entries[-1]["created_at"], entries[-1]["id"]) if len(rows) > limit else None
+        return entries, next_cursor
+
+    def aggregate(self, filters: Dict[str, Any], group_by: Sequence[str], limit: int = 100,
+                  offset: int = 0) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Count and advance rate statistics per group, and the offset of the next page
+
+        Whole hours of the range are read from the hourly rollups and only
+        the partial hours at its ends from the calculations themselves, so
+        the cost grows with the number of hours rather than of rows.
+        """
+        start, end = filters.get("start"), filters.get("end")
+        first = None if start is None else math.ceil(start / ROLLUP_SECONDS) * ROLLUP_SECONDS
+        last = None if end is None else math.floor(end / ROLLUP_SECONDS) * ROLLUP_SECONDS
+        if first is not None and last is not None and first >= last:
+            # No whole hour in the range
+            edges = [(start, end)]
+            use_rollups = False
+        else:
+            edges = [(start, first)] if start is not None and start < first else []
+            if end is not None and last < end:
+                edges.append((last, end))
+            use_rollups = True
+
+        parts, values = [], []
+        if use_rollups:
+            where, part_values = self._where({**filters, "start": first, "end": last}, "bucket")
+            parts.append(
+                f"SELECT {self._group_columns(group_by, 'bucket')}count AS n, advance_rate_sum AS s, "
+                "advance_rate_min AS lo, advance_rate_max AS hi, daily_advance_sum AS d, confidence_sum AS c "
+                f"FROM calculation_rollups {self._clause(where)}"
+            )
+            values.extend(part_values)
+        for edge_start, edge_end in edges:
+            where, part_values = self._where({**filters, "start": edge_start, "end": edge_end})
+            parts.append(
+                f"SELECT {self._group_columns(group_by, 'created_at')}1 AS n, advance_rate AS s, "
+                "advance_rate AS lo, advance_rate AS hi, daily_advance AS d, confidence_score AS c "
+                f"FROM calculations {self._clause(where)}"
+            )
+            values.extend(part_values)
+
+        aliases = ", ".join(f"g{i}" for i in range(len(group_by)))
+        grouping = f"GROUP BY {aliases} ORDER BY {aliases}" if group_by else ""
+        rows = self._connection().execute(
+            f"SELECT {aliases + ', ' if group_by else ''}SUM(n), SUM(s), MIN(lo), MAX(hi), SUM(d), SUM(c) "
+            f"FROM ({' UNION ALL '.join(parts)}) {grouping} LIMIT ? OFFSET ?",
+            (*values, limit + 1, offset)
+        ).fetchall()
+
+        groups = []
+        for row in rows[:limit]:
+            key = {}
+            for i, name in enumerate(group_by):
+                value = row[i]
+                if name in ("hour", "day") and value is not None:
+                    value = datetime.fromtimestamp(value, timezone.utc).isoformat()
+                key[name] = value
+            count, total, low, high, daily, confidence = tuple(row)[len(group_by):]
+            if not count:
+                continue
+            groups.append({
+                "key": key,
+                "count": count,
+                "advance_rate_mean": round(total / count, 3),
+                "advance_rate_min": round(low, 3),
+                "advance_rate_max": round(high, 3),
+                "daily_advance_mean": round(daily / count, 3),
+                "confidence_mean": round(confidence / count, 3)
+            })
+        return groups, offset + limit if len(rows) > limit else None
+
+    @staticmethod
+    def _group_columns(group_by: Sequence[str], time_column: str) -> str:
+        return "".join(f"{GROUP_EXPRESSIONS[name].format(time=time_column)} AS g{i}, " for i, name in enumerate(group_by))
+
+    def _where(self, filters: Dict[str, Any], time_column: str = "created_at") -> Tuple[List[str], List[Any]]:
+        where, values = [], []
+        if filters.get("start") is not None:
+            where.append(f"{time_column} >= ?")
+            values.append(filters["start"])
+        if filters.get("end") is not None:
+            where.append(f"{time_column} < ?")
+            values.append(filters["end"])
+        for column in FILTER_COLUMNS:
+            if filters.get(column) is not None:
+                where.append(f"{column} = ?")
+                values.append(filters[column])
+        return where, values
+
+    @staticmethod
+    def _clause(where: List[str]) -> str:
+        return f"WHERE {' AND '.join(where)}" if where else ""
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, opened lazily"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = connect(self.path, self.busy_timeout)
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+class HistoryRecorder:
+    """Write-behind buffer in front of a HistoryStore
+
+    ``record`` only appends the request's objects to an in-memory deque,
+    so calculations never wait for the database. A background thread
+    turns buffered calculations into rows and inserts them in one
+    transaction per ``flush_size`` rows, every ``flush_interval`` seconds
+    or as soon as that many are waiting. When the buffer is full (the
+    database is unavailable or slower than the request rate) the oldest
+    calculations are dropped and counted. Rows still buffered when the
+    process is killed are lost; ``stop`` flushes them on a clean shutdown.
+    """
+
+    def __init__(self, store: HistoryStore, buffer_size: int = 100000, flush_size: int = 5000,
+                 flush_interval: float = 1.0):
+        self.store = store
+        self.buffer_size = buffer_size
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._buffer: deque = deque(maxlen=buffer_size)
+        # Held to append or requeue, so the drop counts are exact
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_flush_seconds = 0.0
+
+    def record(self, params: TBMParameters, result: AdvanceRateResult, model: RegressionModel,
+               source: str = "calculate", project: Optional[str] = None, calibration_version: Optional[int] = None):
+        """Buffer one calculation; never waits for the database"""
+        with self._lock:
+            if len(self._buffer) >= self.buffer_size:
+                self.dropped += 1
+            self._buffer.append((time.time(), params, result, model, source, project, calibration_version))
+            self.recorded += 1
+        if len(self._buffer) >= self.flush_size:
+            self._wake.set()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._flush_periodically, name="history-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write what is still buffered"""
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        while self._buffer and self.flush():
+            pass
+
+    def flush(self) -> int:
+        """Insert up to ``flush_size`` buffered calculations; returns how many were written"""
+        batch = []
+        while self._buffer and len(batch) < self.flush_size:
+            batch.append(self._buffer.popleft())
+        if not batch:
+            return 0
+
+        start = time.perf_counter()
+        versions: Dict[int, str] = {}
+        rows = []
+        for created_at, params, result, model, source, project, calibration_version in batch:
+            version = versions.get(id(model))
+            if version is None:
+                version = versions[id(model)] = model_version(model)
+            rows.append((
+                created_at, params.soil_type.value, params.tbm_type.value, version, project, calibration_version,
+                source, params.model_dump_json(), result.advance_rate, result.daily_advance,
+                result.penetration_rate, result.specific_energy, result.confidence_score,
+                result.risk_factors.get("overall_risk_level")
+            ))
+        try:
+            self.store.insert_many(rows)
+        except sqlite3.Error as e:
+            # Put the batch back in front for the next attempt. Calculations
+            # recorded meanwhile are newer, so overflow drops the batch's oldest
+            with self._lock:
+                self.errors += 1
+                overflow = max(0, len(self._buffer) + len(batch) - self.buffer_size)
+                self.dropped += overflow
+                self._buffer.extendleft(reversed(batch[overflow:]))
+            logger.warning("Could not write %s history rows: %s", len(rows), e)
+            return 0
+        self.written += len(rows)
+        self.last_flush_seconds = time.perf_counter() - start
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": len(self._buffer),
+            "buffer_size": self.buffer_size,
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "last_flush_seconds": round(self.last_flush_seconds, 4)
+        }
+
+    def _flush_periodically(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            dropped = self.dropped
+            while self.flush() == self.flush_size and not self._stop.is_set():
+                pass
+            if self.dropped > dropped:
+                logger.warning("History buffer full, %s calculations dropped so far", self.dropped)
+
+history_recorder = HistoryRecorder(
+    HistoryStore(sqlite_path(settings.DATABASE_URL)),
+    buffer_size=settings.HISTORY_BUFFER_SIZE,
+    flush_size=settings.HISTORY_FLUSH_SIZE,
+    flush_interval=settings.HISTORY_FLUSH_INTERVAL
+)
@@ -0,0 +1,330 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterator, Optional, Tuple
+
+from app.core.database import connect
+from app.models.schemas import JobState
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    heartbeat_at REAL,
+    result TEXT,
+    media_type TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+"""
+
+# Columns returned by JobStore.get (the payload and result can be large)
+INFO_COLUMNS = "id, kind, status, completed, total, attempts, error, created_at, started_at, finished_at"
+
+# Least seconds between progress writes of a running job
+PROGRESS_INTERVAL = 0.25
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = (state.value for state in JobState)
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while JOB_MAX_QUEUED jobs wait"""
+
+class JobCancelled(Exception):
+    """Raised inside a runner when its job was cancelled or its worker is stopping"""
+
+class JobStore:
+    """Job state and results in a SQLite file shared by every worker process
+
+    Jobs move from queued to running to succeeded, failed or cancelled. A
+    worker claims a job by writing its id and a heartbeat, and keeps the
+    heartbeat fresh while the job runs. A running job whose heartbeat is
+    older than the lease belongs to a worker that died and is claimed
+    again, so neither queued nor interrupted jobs are lost on restart.
+    Claims and state changes are single ``BEGIN IMMEDIATE`` transactions,
+    which serializes them across processes.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+    def submit(self, kind: str, payload: Dict[str, Any], total: int, max_queued: int) -> Dict[str, Any]:
+        """Queue a job; raises JobQueueFull when ``max_queued`` jobs already wait"""
+        job_id = uuid.uuid4().hex
+        encoded = json.dumps(payload)
+        with self._transaction() as connection:
+            queued = connection.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+            if queued >= max_queued:
+                raise JobQueueFull(f"{queued} jobs are already queued")
+            connection.execute(
+                "INSERT INTO jobs (id, kind, status, payload, total, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, encoded, total, time.time())
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(f"SELECT {INFO_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def result(self, job_id: str) -> Optional[Tuple[str, str]]:
+        """(result, media type) of a succeeded job"""
+        row = self._connection().execute(
+            "SELECT result, media_type FROM jobs WHERE id = ? AND status = ?", (job_id, SUCCEEDED)
+        ).fetchone()
+        return (row["result"], row["media_type"]) if row else None
+
+    def claim(self, worker: str, lease_timeout: float, max_attempts: int) -> Optional[Dict[str, Any]]:
+        """Take the oldest queued job, or a running one whose lease expired
+
+        Expired jobs that already had ``max_attempts`` attempts fail
+        instead, so a job that kills its worker cannot loop forever.
+        """
+        now = time.time()
+        expired = now - lease_timeout
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, finished_at = ?, "
+                "error = 'Worker stopped responding on every attempt' "
+                "WHERE status = ? AND heartbeat_at < ? AND attempts >= ?",
+                (FAILED, now, RUNNING, expired, max_attempts)
+            )
+            row = connection.execute(
+                "SELECT id, kind, payload, attempts FROM jobs "
+                "WHERE status = ? OR (status = ? AND heartbeat_at < ?) ORDER BY created_at LIMIT 1",
+                (QUEUED, RUNNING, expired)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE jobs SET status = ?, worker = ?, heartbeat_at = ?, attempts = attempts + 1, "
+                "started_at = ? WHERE id = ?",
+                (RUNNING, worker, now, now, row["id"])
+            )
+        if row["attempts"]:
+            logger.warning("Job %s resumed after %s interrupted attempts", row["id"], row["attempts"])
+        return {"id": row["id"], "kind": row["kind"], "payload": json.loads(row["payload"])}
+
+    def heartbeat(self, worker: str):
+        """Renew the lease of every job this worker runs"""
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE worker = ? AND status = ?", (time.time(), worker, RUNNING)
+            )
+
+    def progress(self, job_id: str, worker: str, completed: int, total: int) -> bool:
+        """Record progress; False when the job is no longer running on this worker"""
+        with self._transaction() as connection:
+            return connection.execute(
+                "UPDATE jobs SET completed = ?, total = ?, heartbeat_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (completed, total, time.time(), job_id, worker, RUNNING)
+            ).rowcount == 1
+
+    def finish(self, job_id: str, worker: str, result: str, media_type: str) -> bool:
+        with self._transaction() as connection:
+            return connection.execute(
+                "UPDATE jobs SET status = ?, completed = total, result = ?, media_type = ?, finished_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (SUCCEEDED, result, media_type, time.time(), job_id, worker, RUNNING)
+            ).rowcount == 1
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        with self._transaction() as connection:
+            return connection.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (FAILED, error, time.time(), job_id, worker, RUNNING)
+            ).rowcount == 1
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job (a running one stops at its next progress report)"""
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+                (CANCELLED, time.time(), job_id, QUEUED, RUNNING)
+            )
+        return self.get(job_id)
+
+    def release(self, worker: str) -> int:
+        """Requeue this worker's running jobs on shutdown without counting the attempt"""
+        with self._transaction() as connection:
+            return connection.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, heartbeat_at = NULL, completed = 0, "
+                "attempts = attempts - 1 WHERE worker = ? AND status = ?",
+                (QUEUED, worker, RUNNING)
+            ).rowcount
+
+    def purge(self, finished_before: float) -> int:
+        """Delete jobs that finished before the given time"""
+        with self._transaction() as connection:
+            return connection.execute("DELETE FROM jobs WHERE finished_at < ?", (finished_before,)).rowcount
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, opened lazily"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = connect(self.path, self.busy_timeout)
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+class JobContext:
+    """Handed to a runner to report progress of its job"""
+
+    def __init__(self, queue: "JobQueue", job_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self._reported = 0.0
+
+    def progress(self, completed: int, total: int):
+        """Record progress (throttled); raises JobCancelled when the job should stop"""
+        if self.queue.stopping:
+            raise JobCancelled("worker is stopping")
+        now = time.perf_counter()
+        if completed < total and now - self._reported < PROGRESS_INTERVAL:
+            return
+        self._reported = now
+        if not self.queue.store.progress(self.job_id, self.queue.worker, completed, total):
+            raise JobCancelled("job was cancelled")
+
+# A runner executes one job: (payload, context) -> (result text, media type)
+JobRunner = Callable[[Dict[str, Any], JobContext], Tuple[str, str]]
+
+class JobQueue:
+    """Bounded pool of worker threads running the jobs of a JobStore
+
+    A dispatcher thread claims jobs while a worker thread is free, renews
+    the leases of running jobs and deletes expired results. Every process
+    runs its own pool against the shared store. Submitting wakes the local
+    dispatcher, and other processes pick jobs up within ``poll_interval``.
+    """
+
+    def __init__(self, store: JobStore, runners: Dict[str, JobRunner], workers: int = 2, max_queued: int = 1000,
+                 lease_timeout: float = 60.0, max_attempts: int = 3, poll_interval: float = 1.0,
+                 result_ttl: float = 604800.0):
+        self.store = store
+        self.runners = runners
+        self.workers = workers
+        self.max_queued = max_queued
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.result_ttl = result_ttl
+        self.worker = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.stopping = False
+        self._running = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self):
+        if self._dispatcher is not None:
+            return
+        self.stopping = False
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+        self._dispatcher = threading.Thread(target=self._dispatch, name="job-dispatcher", daemon=True)
+        self._dispatcher.start()
+        logger.info("Started job queue with %s workers", self.workers)
+
+    def stop(self):
+        """Stop claiming jobs and requeue the running ones for the next start"""
+        if self._dispatcher is None:
+            return
+        self.stopping = True
+        self._wake.set()
+        self._dispatcher.join()
+        self._dispatcher = None
+        # Runners stop at their next progress report
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        try:
+            released = self.store.release(self.worker)
+        except sqlite3.Error as e:
+            logger.error("Could not requeue running jobs: %s", e)
+            return
+        if released:
+            logger.info("Requeued %s running jobs", released)
+
+    def submit(self, kind: str, payload: Dict[str, Any], total: int) -> Dict[str, Any]:
+        """Queue a job and return its info; raises JobQueueFull"""
+        job = self.store.submit(kind, payload, total, self.max_queued)
+        self._wake.set()
+        logger.info("Queued %s job %s", kind, job["id"])
+        return job
+
+    def _dispatch(self):
+        last_heartbeat = last_purge = 0.0
+        while not self.stopping:
+            try:
+                now = time.monotonic()
+                if now - last_heartbeat >= self.lease_timeout / 3:
+                    self.store.heartbeat(self.worker)
+                    last_heartbeat = now
+                if now - last_purge >= 3600:
+                    self.store.purge(time.time() - self.result_ttl)
+                    last_purge = now
+                while self._running < self.workers and not self.stopping:
+                    job = self.store.claim(self.worker, self.lease_timeout, self.max_attempts)
+                    if job is None:
+                        break
+                    with self._lock:
+                        self._running += 1
+                    self._executor.submit(self._run, job)
+            except sqlite3.Error as e:
+                logger.error("Job queue database error: %s", e)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _run(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        started = time.perf_counter()
+        try:
+            runner = self.runners.get(job["kind"])
+            if runner is None:
+                raise ValueError(f"Unknown job kind {job['kind']}")
+            result, media_type = runner(job["payload"], JobContext(self, job_id))
+            if self.store.finish(job_id, self.worker, result, media_type):
+                logger.info("Job %s finished in %.2fs", job_id, time.perf_counter() - started)
+        except JobCancelled as e:
+            logger.info("Job %s stopped: %s", job_id, e)
+        except Exception as e:
+            logger.error("Job %s failed: %s", job_id, e)
+            try:
+                self.store.fail(job_id, self.worker, f"Calculation error: {str(e)}")
+            except sqlite3.Error as db_error:
+                logger.error("Could not record failure of job %s: %s", job_id, db_error)
+        finally:
+            with self._lock:
+                self._running -= 1
+            # A worker thread is free again
+            self._wake.set()
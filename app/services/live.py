@@ -0,0 +1,48 @@
+from typing import Dict, Any, Optional
+
+from app.models.schemas import TBMParameters
+from app.models.records import StagedResult
+from app.services.calculator import TBMAdvanceRateCalculator, result_values
+
+class LiveSession:
+    """Prediction state of one machine streaming parameter updates
+
+    Holds the last parameters and the calculator's staged result for them.
+    An update validates the merged parameters and has the calculator
+    rerun only the stages that read a changed field (``recalculate``), so
+    the result equals a full calculation.
+    """
+
+    def __init__(self, calculator: TBMAdvanceRateCalculator):
+        self.calculator = calculator
+        self.updates = 0
+        self.values: Dict[str, Any] = {}
+        self.params: Optional[TBMParameters] = None
+        self.result: Dict[str, Any] = {}
+        self._staged: Optional[StagedResult] = None
+
+    def update(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply changed parameter values and return what changed in the result
+
+        Raises pydantic.ValidationError, leaving the session unchanged, when
+        the merged parameters are invalid (the first update must give every
+        required field). Returns the changed fields, the stages that were
+        rerun and the result fields whose value changed.
+        """
+        values = {**self.values, **changes}
+        params = TBMParameters.model_validate(values)
+        if self.params is None:
+            changed = set(TBMParameters.model_fields)
+        else:
+            changed = {
+                name for name in changes.keys() & TBMParameters.model_fields.keys()
+                if getattr(params, name) != getattr(self.params, name)
+            }
+
+        staged = self.calculator.recalculate(self._staged, params, changed, risk_factors=True)
+        result = self.result if self._staged and staged.record is self._staged.record else result_values(staged.record)
+        delta = {name: value for name, value in result.items() if self.result.get(name) != value}
+
+        self.values, self.params, self.result, self._staged = values, params, result, staged
+        self.updates += 1
+        return {"changed": sorted(changed), "recomputed": list(staged.recomputed), "result": delta}
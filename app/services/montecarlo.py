@@ -0,0 +1,157 @@
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import numpy as np
+
+from app.models.schemas import MonteCarloRequest, DistributionKind, field_bounds
+from app.services.calculator import TBMAdvanceRateCalculator, NUMERIC_FIELDS, SOIL_TYPES, TBM_TYPES
+
+logger = logging.getLogger(__name__)
+
+MONTE_CARLO_OUTPUTS = ("advance_rate", "daily_advance")
+
+class MonteCarloEngine:
+    """Runs Monte Carlo simulations in fixed-size chunks on a process pool
+
+    Every chunk gets its own child of one ``SeedSequence``, and chunk sizes
+    do not depend on the number of workers, so a given seed reproduces the
+    same samples whether the chunks run in-process or in parallel.
+    """
+
+    def __init__(self, workers: int = 0, chunk_size: int = 50000):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def executor(self) -> Optional[ProcessPoolExecutor]:
+        """Shared worker pool, started on first use; None when running in-process"""
+        if self.workers <= 1:
+            return None
+        if self._executor is None:
+            # Spawned workers avoid forking a process that already runs server threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info("Started Monte Carlo pool with %s workers", self.workers)
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def simulate(self, calculator: TBMAdvanceRateCalculator, request: MonteCarloRequest) -> "MonteCarloRun":
+        return MonteCarloRun(self, calculator, request)
+
+class MonteCarloRun:
+    """One simulation; iterate ``progress()`` to run it, then read ``result()``"""
+
+    def __init__(self, engine: MonteCarloEngine, calculator: TBMAdvanceRateCalculator, request: MonteCarloRequest):
+        self.engine = engine
+        self.calculator = calculator
+        self.request = request
+        self.seed = request.seed if request.seed is not None else int(np.random.SeedSequence().entropy % 2**63)
+        self.total = request.samples
+        self.completed = 0
+        self._chunks: List[Optional[np.ndarray]] = []
+
+        params = request.parameters
+        self._base = {field: getattr(params, field) for field in NUMERIC_FIELDS}
+        self._categories = (SOIL_TYPES.index(params.soil_type), TBM_TYPES.index(params.tbm_type))
+        bounds = field_bounds()
+        self._distributions = {
+            field: (request.distributions[field].model_dump(), bounds[field])
+            for field in NUMERIC_FIELDS if field in request.distributions
+        }
+
+    def progress(self) -> Iterator[int]:
+        """Evaluate all chunks, yielding the number of completed samples after each"""
+        sizes = [min(self.engine.chunk_size, self.total - start) for start in range(0, self.total, self.engine.chunk_size)]
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        self._chunks = [None] * len(sizes)
+        tasks = [
+            (self.calculator, self._base, self._categories, self._distributions, seeds[i], sizes[i])
+            for i in range(len(sizes))
+        ]
+
+        executor = self.engine.executor() if len(sizes) > 1 else None
+        if executor is None:
+            for i, task in enumerate(tasks):
+                self._chunks[i] = _simulate_chunk(*task)
+                self.completed += sizes[i]
+                yield self.completed
+            return
+
+        futures = {executor.submit(_simulate_chunk, *task): i for i, task in enumerate(tasks)}
+        try:
+            for future in as_completed(futures):
+                i = futures[future]
+                self._chunks[i] = future.result()
+                self.completed += sizes[i]
+                yield self.completed
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def run(self) -> Dict[str, Any]:
+        """Run to completion and return the result"""
+        for _ in self.progress():
+            pass
+        return self.result()
+
+    def result(self) -> Dict[str, Any]:
+        """Quantiles and histograms of every output over all samples"""
+        if self.completed < self.total:
+            raise RuntimeError("Monte Carlo run has not completed")
+        samples = np.concatenate(self._chunks, axis=1)
+
+        outputs = {}
+        for k, name in enumerate(MONTE_CARLO_OUTPUTS):
+            values = samples[k]
+            p10, p50, p90 = np.percentile(values, [10, 50, 90])
+            counts, edges = np.histogram(values, bins=self.request.bins)
+            outputs[name] = {
+                "mean": round(float(values.mean()), 3),
+                "std": round(float(values.std()), 3),
+                "p10": round(float(p10), 3),
+                "p50": round(float(p50), 3),
+                "p90": round(float(p90), 3),
+                "histogram_edges": np.round(edges, 3).tolist(),
+                "histogram_counts": counts.tolist()
+            }
+
+        logger.info("Monte Carlo run of %s samples completed (seed %s)", self.total, self.seed)
+        return {"samples": self.total, "seed": self.seed, "outputs": outputs}
+
+def sample_distribution(rng: np.random.Generator, spec: Dict[str, Any], size: int) -> np.ndarray:
+    """Draw ``size`` values from a dumped InputDistribution"""
+    kind = spec["kind"]
+    if kind == DistributionKind.NORMAL:
+        return rng.normal(spec["mean"], spec["std"], size)
+    if kind == DistributionKind.LOGNORMAL:
+        # Convert the mean/std of the variable itself to those of its logarithm
+        sigma2 = np.log1p((spec["std"] / spec["mean"]) ** 2)
+        return rng.lognormal(np.log(spec["mean"]) - sigma2 / 2, np.sqrt(sigma2), size)
+    if kind == DistributionKind.UNIFORM:
+        return rng.uniform(spec["low"], spec["high"], size)
+    return rng.triangular(spec["low"], spec["mode"], spec["high"], size)
+
+def _simulate_chunk(calculator: TBMAdvanceRateCalculator, base: Dict[str, Optional[float]],
+                    categories: Tuple[int, int], distributions: Dict[str, Tuple[Dict[str, Any], Tuple[float, float]]],
+                    seed: np.random.SeedSequence, size: int) -> np.ndarray:
+    """Sample one chunk and evaluate it; returns a (len(MONTE_CARLO_OUTPUTS), size) array"""
+    rng = np.random.default_rng(seed)
+    columns: Dict[str, Any] = {
+        field: np.full(size, np.nan if value is None else value, dtype=float)
+        for field, value in base.items()
+    }
+    for field, (spec, (lower, upper)) in distributions.items():
+        # Samples outside the schema bounds are clamped to them
+        columns[field] = np.clip(sample_distribution(rng, spec, size), lower, upper)
+    columns["soil_type"] = np.full(size, categories[0])
+    columns["tbm_type"] = np.full(size, categories[1])
+
+    metrics = calculator.calculate_batch(columns)
+    return np.stack([metrics[name] for name in MONTE_CARLO_OUTPUTS])
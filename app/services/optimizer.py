@@ -0,0 +1,150 @@
+import math
+import logging
+from typing import Dict, Any, Tuple
+import numpy as np
+
+from app.models.schemas import OptimizationRequest, field_bounds
+from app.services.calculator import TBMAdvanceRateCalculator, parameters_to_columns
+
+logger = logging.getLogger(__name__)
+
+# Local search stops once the step is below this fraction of the axis range
+MIN_STEP = 1e-4
+MAX_ITERATIONS = 60
+
+# Unit compass and diagonal moves in (thrust, speed)
+MOVES = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy], dtype=float)
+
+class OperatingPointOptimizer:
+    """Maximizes advance rate over thrust and cutterhead speed under machine limits
+
+    Candidates are feasible when the estimated cutterhead power demand is
+    within the installed ``cutterhead_power`` and the specific energy is
+    under the requested ceiling. Power demand uses the usual rolling torque
+    estimate T = coefficient × thrust × diameter / 3 and P = T × 2πn / 60.
+    Among equally fast points the one needing the least power wins.
+    """
+
+    def __init__(self, calculator: TBMAdvanceRateCalculator, request: OptimizationRequest):
+        self.calculator = calculator
+        self.request = request
+        params = request.parameters
+        bounds = field_bounds()
+
+        thrust_low, thrust_high = bounds["thrust_force"]
+        speed_low, speed_high = bounds["cutterhead_speed"]
+        self.lower = np.array([thrust_low, speed_low])
+        self.upper = np.array([
+            min(thrust_high, request.max_thrust_force or thrust_high),
+            min(speed_high, request.max_cutterhead_speed or speed_high)
+        ])
+        self._columns = parameters_to_columns([params])
+        self.evaluations = 0
+
+    def evaluate(self, thrust: np.ndarray, speed: np.ndarray) -> Dict[str, np.ndarray]:
+        """Calculator metrics, power demand and feasibility for candidate arrays"""
+        size = len(thrust)
+        columns = {name: values * size for name, values in self._columns.items()}
+        columns["thrust_force"] = thrust
+        columns["cutterhead_speed"] = speed
+        metrics = self.calculator.calculate_batch(columns)
+        self.evaluations += size
+
+        params = self.request.parameters
+        torque = self.request.torque_coefficient * thrust * params.tbm_diameter / 3  # kN·m
+        required_power = torque * 2 * math.pi * speed / 60  # kW
+
+        feasible = required_power <= params.cutterhead_power
+        if self.request.max_specific_energy is not None:
+            feasible &= metrics["specific_energy"] <= self.request.max_specific_energy
+        feasible &= (thrust <= self.upper[0]) & (speed <= self.upper[1])
+
+        return {
+            "thrust_force": thrust,
+            "cutterhead_speed": speed,
+            "advance_rate": metrics["advance_rate"],
+            "specific_energy": metrics["specific_energy"],
+            "confidence_score": metrics["confidence_score"],
+            "required_power": required_power,
+            "feasible": feasible
+        }
+
+    def optimize(self) -> Dict[str, Any]:
+        """Grid search, then bounded pattern search around the best feasible candidate"""
+        points = self.request.grid_points
+        thrust_axis = np.linspace(self.lower[0], self.upper[0], points)
+        speed_axis = np.linspace(self.lower[1], self.upper[1], points)
+        thrust_grid, speed_grid = np.meshgrid(thrust_axis, speed_axis, indexing="ij")
+        surface = self.evaluate(thrust_grid.ravel(), speed_grid.ravel())
+
+        best = _best_candidate(surface)
+        if best is None:
+            raise ValueError("No operating point satisfies the power and specific energy limits")
+        position = np.array([thrust_grid.ravel()[best], speed_grid.ravel()[best]])
+        score = (surface["advance_rate"][best], surface["required_power"][best])
+        position, score = self._pattern_search(position, score, (self.upper - self.lower) / (points - 1))
+
+        optimum = _operating_point(self.evaluate(position[:1], position[1:]), 0)
+        params = self.request.parameters
+        current = _operating_point(
+            self.evaluate(np.array([params.thrust_force]), np.array([params.cutterhead_speed])), 0
+        )
+
+        logger.info(
+            "Optimized operating point: %s kN at %s RPM (%s evaluations)",
+            optimum["thrust_force"], optimum["cutterhead_speed"], self.evaluations
+        )
+        return {
+            "optimum": optimum,
+            "current": current,
+            "surface": {
+                "thrust_force": np.round(thrust_axis, 2).tolist(),
+                "cutterhead_speed": np.round(speed_axis, 3).tolist(),
+                "advance_rate": np.round(surface["advance_rate"].reshape(points, points), 2).tolist(),
+                "feasible": surface["feasible"].reshape(points, points).tolist()
+            },
+            "evaluations": self.evaluations
+        }
+
+    def _pattern_search(self, position: np.ndarray, score: Tuple[float, float],
+                        step: np.ndarray) -> Tuple[np.ndarray, Tuple[float, float]]:
+        """Compass search with all eight moves evaluated per iteration in one batch"""
+        scale = self.upper - self.lower
+        for _ in range(MAX_ITERATIONS):
+            if np.all(step < MIN_STEP * scale):
+                break
+            candidates = np.clip(position + MOVES * step, self.lower, self.upper)
+            metrics = self.evaluate(candidates[:, 0], candidates[:, 1])
+            best = _best_candidate(metrics)
+            if best is not None and _improves(metrics["advance_rate"][best], metrics["required_power"][best], score):
+                position = candidates[best]
+                score = (metrics["advance_rate"][best], metrics["required_power"][best])
+            else:
+                step = step / 2
+        return position, score
+
+def _best_candidate(metrics: Dict[str, np.ndarray]):
+    """Index of the fastest feasible candidate (least power on ties), or None"""
+    feasible = np.flatnonzero(metrics["feasible"])
+    if not len(feasible):
+        return None
+    # lexsort sorts by the last key first
+    order = np.lexsort((metrics["required_power"][feasible], -metrics["advance_rate"][feasible]))
+    return feasible[order[0]]
+
+def _improves(advance_rate: float, required_power: float, score: Tuple[float, float]) -> bool:
+    best_rate, best_power = score
+    if advance_rate > best_rate + 1e-9:
+        return True
+    return abs(advance_rate - best_rate) <= 1e-9 and required_power < best_power - 1e-9
+
+def _operating_point(metrics: Dict[str, np.ndarray], index: int) -> Dict[str, Any]:
+    return {
+        "thrust_force": round(float(metrics["thrust_force"][index]), 1),
+        "cutterhead_speed": round(float(metrics["cutterhead_speed"][index]), 3),
+        "advance_rate": round(float(metrics["advance_rate"][index]), 2),
+        "specific_energy": round(float(metrics["specific_energy"][index]), 2),
+        "required_power": round(float(metrics["required_power"][index]), 1),
+        "confidence_score": round(float(metrics["confidence_score"][index]), 3),
+        "feasible": bool(metrics["feasible"][index])
+    }
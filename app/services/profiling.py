@@ -0,0 +1,149 @@
+import copy
+import json
+import uuid
+import pstats
+import cProfile
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, Any, Iterator, List, Optional
+
+from app.models.schemas import ProfileMode
+from app.services.calculator import TBMAdvanceRateCalculator, STAGE_METHODS, BATCH_STAGE_METHODS
+from app.core.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Functions listed in a cProfile report, by cumulative time
+CPROFILE_TOP_FUNCTIONS = 25
+
+class StageTimer:
+    """Call count and total wall-clock time of one stage"""
+
+    __slots__ = ("calls", "seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+
+    def observe(self, seconds: float):
+        self.calls += 1
+        self.seconds += seconds
+
+class RequestProfiler:
+    """Hot-path breakdown of a single request
+
+    ``calculator`` returns a copy of a calculator whose stage methods
+    report their wall-clock time here; ``stage`` times any other block
+    (validation, serialization). Work inside ``active`` counts towards the
+    total and, in cprofile mode, runs under cProfile. Nothing is installed
+    on the shared calculator, so unprofiled requests pay nothing.
+    """
+
+    def __init__(self, mode: ProfileMode = ProfileMode.STAGES):
+        self.mode = ProfileMode(mode)
+        self.stages: Dict[str, StageTimer] = {}
+        self.total = 0.0
+        self._profile = cProfile.Profile() if self.mode == ProfileMode.CPROFILE else None
+
+    def calculator(self, calculator: TBMAdvanceRateCalculator) -> TBMAdvanceRateCalculator:
+        """Copy of ``calculator`` with every scalar and batch stage timed"""
+        # copy.copy goes through __getstate__, dropping any metrics wrappers
+        profiled = copy.copy(calculator)
+        for methods in (STAGE_METHODS, BATCH_STAGE_METHODS):
+            for stage, method_name in methods.items():
+                setattr(profiled, method_name, timed(getattr(profiled, method_name), self._timer(stage)))
+        return profiled
+
+    @contextmanager
+    def active(self) -> Iterator[None]:
+        start = perf_counter()
+        if self._profile is not None:
+            self._profile.enable()
+        try:
+            yield
+        finally:
+            if self._profile is not None:
+                self._profile.disable()
+            self.total += perf_counter() - start
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._timer(name).observe(perf_counter() - start)
+
+    def report(self) -> Dict[str, Any]:
+        """Stages that ran, by time spent, with the untimed remainder as ``other``"""
+        stages = sorted(
+            ((name, timer) for name, timer in self.stages.items() if timer.calls),
+            key=lambda item: item[1].seconds, reverse=True
+        )
+        other = max(self.total - sum(timer.seconds for _, timer in stages), 0.0)
+        report = {
+            "mode": self.mode.value,
+            "total_ms": _milliseconds(self.total),
+            "stages": [
+                {
+                    "stage": name,
+                    "calls": timer.calls,
+                    "total_ms": _milliseconds(timer.seconds),
+                    "share": round(timer.seconds / self.total, 4) if self.total else 0.0
+                }
+                for name, timer in stages
+            ] + [{
+                "stage": "other",
+                "calls": 1,
+                "total_ms": _milliseconds(other),
+                "share": round(other / self.total, 4) if self.total else 0.0
+            }]
+        }
+        if self._profile is not None:
+            report["cprofile"] = self._top_functions()
+        return report
+
+    def server_timing(self) -> str:
+        """Server-Timing header value (durations in milliseconds)"""
+        entries = [
+            f"{name};dur={_milliseconds(timer.seconds)}" for name, timer in self.stages.items() if timer.calls
+        ]
+        return ", ".join(entries + [f"total;dur={_milliseconds(self.total)}"])
+
+    def save(self, directory: str, name: str, report: Optional[Dict[str, Any]] = None) -> str:
+        """Write the report (and the raw .prof stats in cprofile mode) to ``directory``"""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        stem = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{name}-{uuid.uuid4().hex[:8]}"
+        report_path = path / f"{stem}.json"
+        report_path.write_text(json.dumps(report or self.report(), indent=2))
+        if self._profile is not None:
+            # Loadable with pstats or snakeviz
+            self._profile.dump_stats(str(path / f"{stem}.prof"))
+        logger.info("Saved request profile to %s", report_path)
+        return str(report_path)
+
+    def _timer(self, stage: str) -> StageTimer:
+        timer = self.stages.get(stage)
+        if timer is None:
+            timer = self.stages[stage] = StageTimer()
+        return timer
+
+    def _top_functions(self) -> List[Dict[str, Any]]:
+        stats = pstats.Stats(self._profile).stats
+        rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:CPROFILE_TOP_FUNCTIONS]
+        return [
+            {
+                "function": f"{Path(filename).name}:{line}({function})",
+                "calls": calls,
+                "own_ms": _milliseconds(own),
+                "cumulative_ms": _milliseconds(cumulative)
+            }
+            for (filename, line, function), (_, calls, own, cumulative, _) in rows
+        ]
+
+def _milliseconds(seconds: float) -> float:
+    return round(seconds * 1000, 4)
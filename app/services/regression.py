@@ -0,0 +1,187 @@
+import os
+import csv
+import json
+import math
+import operator
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Sequence, Tuple, TextIO
+import numpy as np
+
+from app.models.schemas import SoilType
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Feature order of the regression model's weight vector
+REGRESSION_FEATURES = (
+    "diameter", "power_per_area", "thrust_per_area", "rotation_speed", "depth_factor", "soil_hardness"
+)
+
+# Simplified linear regression coefficients used until a trained model is available
+DEFAULT_INTERCEPT = 2.5
+DEFAULT_WEIGHTS = (-0.8, 0.15, 0.008, 1.2, 3.0, -2.1)
+
+# Clamp applied to regression predictions (mm/min)
+REGRESSION_BOUNDS = (0.5, 45.0)
+
+# Columns read from historical drive records
+RECORD_FIELDS = ("tbm_diameter", "cutterhead_power", "thrust_force", "cutterhead_speed", "depth")
+
+def regression_features(diameter: Any, power: Any, thrust: Any, speed: Any, depth: Any, resistance: Any) -> list:
+    """Regression features in REGRESSION_FEATURES order, for scalars or arrays"""
+    area = math.pi * (diameter/2)**2
+    return [diameter, power / area, thrust / area, speed, 1 / (1 + depth * 0.01), resistance]
+
+class RegressionModel:
+    """Linear advance rate model evaluated as one dot product per feature row"""
+
+    def __init__(self, intercept: float, weights: Sequence[float], metadata: Optional[Dict[str, Any]] = None):
+        self.intercept = float(intercept)
+        self.weights = np.asarray(weights, dtype=float)
+        self.metadata = metadata or {}
+        self._weights_tuple = tuple(self.weights.tolist())
+        # Hashable identity for cache and surrogate fingerprints
+        self.fingerprint = (self.intercept,) + self._weights_tuple
+
+    @classmethod
+    def default(cls) -> "RegressionModel":
+        return cls(DEFAULT_INTERCEPT, DEFAULT_WEIGHTS, {"source": "default"})
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Clamped predictions for an (n, len(REGRESSION_FEATURES)) feature matrix"""
+        # Summed term by term from the intercept, in predict_one's order, so
+        # batch and scalar predictions round identically (a matmul does not)
+        advance_rate = np.full(len(features), self.intercept)
+        for weight, column in zip(self._weights_tuple, features.T):
+            advance_rate += weight * column
+        return np.clip(advance_rate, *REGRESSION_BOUNDS)
+
+    def predict_one(self, features: Sequence[float]) -> float:
+        """Clamped prediction for a single feature vector"""
+        # Plain Python dot product: for six values NumPy call overhead dominates
+        advance_rate = sum(map(operator.mul, self._weights_tuple, features), self.intercept)
+        return max(REGRESSION_BOUNDS[0], min(advance_rate, REGRESSION_BOUNDS[1]))
+
+    def coefficients(self) -> Dict[str, float]:
+        return {"intercept": self.intercept, **dict(zip(REGRESSION_FEATURES, self.weights.tolist()))}
+
+    def save(self, path: str):
+        """Write the model as a JSON artifact, replacing any previous one atomically"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        artifact = {
+            **self.metadata,
+            "model_version": settings.MODEL_VERSION,
+            "features": list(REGRESSION_FEATURES),
+            "intercept": self.intercept,
+            "weights": self.weights.tolist()
+        }
+        temporary = path.with_name(path.name + ".tmp")
+        temporary.write_text(json.dumps(artifact, indent=2))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RegressionModel":
+        """Read an artifact, rejecting one trained for another model version"""
+        artifact = json.loads(Path(path).read_text())
+        if artifact.get("model_version") != settings.MODEL_VERSION:
+            raise ValueError(
+                f"Regression model {path} is for model version {artifact.get('model_version')}, "
+                f"expected {settings.MODEL_VERSION}"
+            )
+        if artifact.get("features") != list(REGRESSION_FEATURES):
+            raise ValueError(f"Regression model {path} has an incompatible feature list")
+        metadata = {
+            key: value for key, value in artifact.items()
+            if key not in ("features", "intercept", "weights")
+        }
+        return cls(artifact["intercept"], artifact["weights"], {**metadata, "source": str(path)})
+
+class RegressionModelStore:
+    """Current regression model, reloaded when its artifact file changes
+
+    The file's modification time is checked at most every
+    ``check_interval`` seconds. An artifact that fails to load is logged and
+    the previous model stays in use; without a path the default model is
+    used throughout.
+    """
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = settings.REGRESSION_RELOAD_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._model = RegressionModel.default()
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+
+    def current(self) -> RegressionModel:
+        if self.path:
+            now = time.monotonic()
+            if now >= self._next_check:
+                self._next_check = now + self.check_interval
+                self._reload_if_changed()
+        return self._model
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        try:
+            self._model = RegressionModel.load(self.path)
+            logger.info("Loaded regression model from %s", self.path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Could not load regression model %s: %s", self.path, e)
+
+def fit_ridge(features: np.ndarray, targets: np.ndarray, alpha: float = 1.0) -> RegressionModel:
+    """Ridge least squares on standardized features with an unpenalized intercept"""
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    standardized = (features - mean) / scale
+    target_mean = targets.mean()
+
+    gram = standardized.T @ standardized + alpha * np.eye(features.shape[1])
+    weights = np.linalg.solve(gram, standardized.T @ (targets - target_mean)) / scale
+    intercept = target_mean - mean @ weights
+    return RegressionModel(intercept, weights, {"alpha": alpha, "samples": int(len(targets))})
+
+def evaluate_fit(model: RegressionModel, features: np.ndarray, targets: np.ndarray) -> Dict[str, float]:
+    """RMSE and R² of clamped predictions"""
+    residuals = targets - model.predict(features)
+    total = np.sum((targets - targets.mean())**2)
+    return {
+        "rmse": round(float(np.sqrt(np.mean(residuals**2))), 4),
+        "r2": round(float(1 - np.sum(residuals**2) / total), 4) if total else 0.0
+    }
+
+def read_drive_records(stream: TextIO, soil_coefficients: Dict[SoilType, Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Feature matrix and observed advance rates from a CSV of historical drive records
+
+    Required columns are RECORD_FIELDS, ``soil_type`` and ``advance_rate``
+    (mm/min); rows with missing or unparsable values are skipped.
+    """
+    reader = csv.DictReader(stream)
+    missing = set(RECORD_FIELDS + ("soil_type", "advance_rate")) - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"Drive records are missing columns: {', '.join(sorted(missing))}")
+
+    rows = []
+    for row in reader:
+        try:
+            values = [float(row[field]) for field in RECORD_FIELDS]
+            resistance = soil_coefficients[SoilType(row["soil_type"].strip())]["resistance"]
+            rows.append(values + [resistance, float(row["advance_rate"])])
+        except (ValueError, KeyError, TypeError):
+            continue
+    if not rows:
+        raise ValueError("No usable drive records")
+
+    data = np.array(rows)
+    diameter, power, thrust, speed, depth, resistance, advance_rate = data.T
+    features = np.column_stack(regression_features(diameter, power, thrust, speed, depth, resistance))
+    return features, advance_rate
@@ -0,0 +1,168 @@
+import math
+import operator
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+import numpy as np
+
+# Overall risk levels, lowest first; level codes are indices into this tuple
+RISK_LEVELS = ("low", "medium", "high")
+
+def power_density(v: Any) -> Any:
+    """Cutterhead power per face area in kW/m²"""
+    return v.cutterhead_power / (math.pi * (v.tbm_diameter/2)**2)
+
+# Quantities derived from several fields that rules may test. Written with
+# plain arithmetic so they evaluate on TBMParameters/ParameterRecord
+# attributes and on batch column arrays alike; module-level functions keep
+# calculators picklable for worker processes.
+DERIVED_QUANTITIES: Dict[str, Callable[[Any], Any]] = {
+    "power_density": power_density
+}
+
+# Fields each derived quantity reads
+DERIVED_INPUTS: Dict[str, Tuple[str, ...]] = {
+    "power_density": ("cutterhead_power", "tbm_diameter")
+}
+
+COMPARISONS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+class RiskRule:
+    """One operational risk: ``field comparison threshold`` at a given level
+
+    ``field`` is a TBMParameters field or a DERIVED_QUANTITIES name. The
+    description template is formatted with the tested ``value`` and only
+    rendered when a client asks for readable risk factors. Missing values
+    (None or NaN) never trigger a rule; ``rock_only`` rules apply to rock
+    soil types only.
+    """
+
+    __slots__ = ("name", "field", "comparison", "threshold", "level", "description", "recommendation", "rock_only")
+
+    def __init__(self, name: str, field: str, comparison: str, threshold: float, level: str,
+                 description: str, recommendation: str, rock_only: bool = False):
+        if comparison not in COMPARISONS:
+            raise ValueError(f"Unknown comparison {comparison!r}, expected one of {', '.join(COMPARISONS)}")
+        if level not in RISK_LEVELS:
+            raise ValueError(f"Unknown risk level {level!r}, expected one of {', '.join(RISK_LEVELS)}")
+        self.name = name
+        self.field = field
+        self.comparison = comparison
+        self.threshold = threshold
+        self.level = level
+        self.description = description
+        self.recommendation = recommendation
+        self.rock_only = rock_only
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+# Bit i of a risk code is RISK_RULES[i]: only ever append, so stored codes keep their meaning
+RISK_RULES = (
+    RiskRule(
+        "high_water_pressure", "water_pressure", ">", 3, "high",
+        "Water pressure of {value} bar may cause stability issues",
+        "Consider additional ground treatment or pressure relief measures"
+    ),
+    RiskRule(
+        "low_power", "power_density", "<", 150, "medium",
+        "Power density of {value:.1f} kW/m² may be insufficient",
+        "Monitor power consumption and consider reducing advance rate if needed"
+    ),
+    RiskRule(
+        "deep_tunneling", "depth", ">", 50, "medium",
+        "Depth of {value}m requires careful pressure management",
+        "Implement enhanced monitoring and ground settlement controls"
+    ),
+    RiskRule(
+        "hard_rock", "ucs", ">", 100, "high",
+        "UCS of {value} MPa indicates very hard rock conditions",
+        "Plan for increased cutter wear and potential advance rate reductions",
+        rock_only=True
+    )
+)
+
+class RiskRuleSet:
+    """Risk rules compiled to bitmask evaluation
+
+    ``code`` checks one parameter set and ``codes`` whole batch columns,
+    both returning an integer with bit i set when rule i fires. ``levels``
+    turns codes into RISK_LEVELS indices with two bitwise ANDs, and
+    ``describe`` renders the readable risks of a code on demand (``assess``
+    does both for one parameter set).
+    """
+
+    def __init__(self, rules: Sequence[RiskRule] = RISK_RULES):
+        if len(rules) > 63:
+            raise ValueError("Risk codes hold at most 63 rules")
+        self.rules = tuple(rules)
+        self._checks = [
+            (1 << bit, rule.field, DERIVED_QUANTITIES.get(rule.field), COMPARISONS[rule.comparison],
+             rule.threshold, rule.rock_only, rule)
+            for bit, rule in enumerate(self.rules)
+        ]
+        # Parameter fields the rules read, so unchanged inputs can skip reassessment
+        self.inputs = frozenset(
+            field
+            for rule in self.rules
+            for field in DERIVED_INPUTS.get(rule.field, (rule.field,)) + (("soil_type",) if rule.rock_only else ())
+        )
+        # Bits of the rules at each level, highest level first
+        self._level_masks = [
+            (RISK_LEVELS.index(level), sum(1 << bit for bit, rule in enumerate(self.rules) if rule.level == level))
+            for level in reversed(RISK_LEVELS[1:])
+        ]
+
+    def code(self, params: Any) -> int:
+        """Risk code of one TBMParameters or ParameterRecord"""
+        return self.assess(params)[0]
+
+    def assess(self, params: Any) -> Tuple[int, Dict[str, Dict[str, str]], List[str]]:
+        """Risk code, readable risks and recommendations of one parameter set in a single pass"""
+        code = 0
+        risks = {}
+        recommendations = []
+        for bit, field, derive, compare, threshold, rock_only, rule in self._checks:
+            if rock_only and 'rock' not in params.soil_type:
+                continue
+            value = derive(params) if derive else getattr(params, field)
+            if value is not None and compare(value, threshold):
+                code |= bit
+                risks[rule.name] = {"level": rule.level, "description": rule.description.format(value=value)}
+                recommendations.append(rule.recommendation)
+        return code, risks, recommendations
+
+    def codes(self, cols: Dict[str, np.ndarray]) -> np.ndarray:
+        """Risk codes of prepared batch columns (NaN marks a missing value)"""
+        view = SimpleNamespace(**cols)
+        codes = np.zeros(len(cols["soil_index"]), dtype=np.int64)
+        for bit, field, derive, compare, threshold, rock_only, _ in self._checks:
+            mask = compare(derive(view) if derive else cols[field], threshold)
+            if rock_only:
+                mask &= cols["is_rock"]
+            codes[mask] |= bit
+        return codes
+
+    def levels(self, codes: np.ndarray) -> np.ndarray:
+        """RISK_LEVELS index per code"""
+        levels = np.zeros(len(codes), dtype=np.int64)
+        for level, mask in reversed(self._level_masks):
+            levels[(codes & mask) != 0] = level
+        return levels
+
+    def describe(self, code: int, params: Any) -> Tuple[Dict[str, Dict[str, str]], List[str]]:
+        """Readable risks and recommendations of the rules set in ``code``"""
+        risks = {}
+        recommendations = []
+        for bit, field, derive, _, _, _, rule in self._checks:
+            if code & bit:
+                value = derive(params) if derive else getattr(params, field)
+                risks[rule.name] = {"level": rule.level, "description": rule.description.format(value=value)}
+                recommendations.append(rule.recommendation)
+        return risks, recommendations
+
+    def catalog(self) -> Dict[str, Any]:
+        """Rule table for decoding risk codes on the client"""
+        return {
+            "levels": list(RISK_LEVELS),
+            "rules": [{"bit": bit, **rule.as_dict()} for bit, rule in enumerate(self.rules)]
+        }
@@ -0,0 +1,91 @@
+import logging
+from typing import Dict, Any, List, Tuple
+import numpy as np
+
+from app.models.schemas import TBMParameters, field_bounds
+from app.services.calculator import TBMAdvanceRateCalculator, NUMERIC_FIELDS, parameters_to_columns
+
+logger = logging.getLogger(__name__)
+
+SENSITIVITY_OUTPUTS = ("advance_rate", "specific_energy", "confidence_score")
+
+def analyze_sensitivity(calculator: TBMAdvanceRateCalculator, params: TBMParameters,
+                        relative_step: float = 0.01, tornado_step: float = 0.1) -> Dict[str, Any]:
+    """Partial derivatives, elasticities and tornado data for every numeric input
+
+    All perturbed parameter sets are stacked into one batch and evaluated
+    with a single ``calculate_batch`` call. Derivatives are central
+    differences at ``relative_step`` (one-sided at a schema bound);
+    elasticities are (dy/y) / (dx/x). Fields at zero are stepped by a
+    fraction of their schema range and have zero elasticity. The tornado
+    chart varies each input by ``tornado_step`` either way.
+    """
+    bounds = field_bounds()
+    fields = [field for field in NUMERIC_FIELDS if getattr(params, field) is not None]
+
+    # Row 0 is the base case, then (low, high) pairs per field for derivatives and for the tornado
+    rows: List[Tuple[str, float]] = [("", 0.0)]
+    steps = {}
+    for field in fields:
+        value = getattr(params, field)
+        derivative_pair = _perturb(value, relative_step, bounds[field])
+        tornado_pair = _perturb(value, tornado_step, bounds[field])
+        steps[field] = derivative_pair + tornado_pair
+        rows.extend((field, x) for x in steps[field])
+
+    columns = {name: values * len(rows) for name, values in parameters_to_columns([params]).items()}
+    for field in fields:
+        columns[field] = np.array(columns[field], dtype=float)
+    for i, (field, value) in enumerate(rows[1:], start=1):
+        columns[field][i] = value
+    metrics = calculator.calculate_batch(columns)
+
+    base = {name: float(metrics[name][0]) for name in SENSITIVITY_OUTPUTS}
+    sensitivities = []
+    tornado = []
+    for k, field in enumerate(fields):
+        value = getattr(params, field)
+        low, high, tornado_low, tornado_high = steps[field]
+        i = 1 + 4 * k
+
+        derivatives = {}
+        elasticities = {}
+        for name in SENSITIVITY_OUTPUTS:
+            derivative = (metrics[name][i + 1] - metrics[name][i]) / (high - low) if high != low else 0.0
+            derivatives[name] = round(float(derivative), 6)
+            elasticities[name] = round(float(derivative * value / base[name]), 4) if base[name] else 0.0
+
+        sensitivities.append({
+            "field": field,
+            "value": value,
+            "derivatives": derivatives,
+            "elasticities": elasticities
+        })
+
+        low_rate = float(metrics["advance_rate"][i + 2])
+        high_rate = float(metrics["advance_rate"][i + 3])
+        tornado.append({
+            "field": field,
+            "low_value": tornado_low,
+            "high_value": tornado_high,
+            "low_advance_rate": round(low_rate, 2),
+            "high_advance_rate": round(high_rate, 2),
+            "swing": round(abs(high_rate - low_rate), 2)
+        })
+
+    sensitivities.sort(key=lambda s: abs(s["elasticities"]["advance_rate"]), reverse=True)
+    tornado.sort(key=lambda bar: bar["swing"], reverse=True)
+
+    logger.info("Sensitivity analysis evaluated %s parameter sets in one batch", len(rows))
+    return {
+        "base": {name: round(value, 3 if name == "confidence_score" else 2) for name, value in base.items()},
+        "sensitivities": sensitivities,
+        "tornado": tornado,
+        "evaluations": len(rows)
+    }
+
+def _perturb(value: float, fraction: float, bounds: Tuple[float, float]) -> Tuple[float, float]:
+    """Low/high values around ``value``, kept inside the schema bounds"""
+    lower, upper = bounds
+    step = abs(value) * fraction if value else (upper - lower) * fraction
+    return max(lower, value - step), min(upper, value + step)
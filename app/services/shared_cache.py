@@ -0,0 +1,121 @@
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    digest BLOB NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+)
+"""
+
+class SharedResultStore:
+    """Result store shared by every worker process on the host
+
+    Backed by a SQLite file in WAL mode, so readers never block each other
+    and entries survive worker restarts. Keys are content digests of the
+    parameters plus the model fingerprint. Size is bounded by keeping the
+    newest ``max_entries`` rows (insertion order); recency is tracked by
+    each worker's in-process cache in front of this store.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000, ttl: float = 86400.0,
+                 evict_every: int = 256, busy_timeout_ms: int = 50):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evict_every = evict_every
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._puts = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection().execute(SCHEMA)
+
+    def get(self, digest: bytes) -> Optional[str]:
+        """Return the stored JSON payload for a digest, if present and fresh"""
+        try:
+            row = self._connection().execute(
+                "SELECT payload, created_at FROM results WHERE digest = ?", (digest,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._record_error("read", e)
+            return None
+
+        if row is None or row[1] + self.ttl <= time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, digest: bytes, payload: str):
+        """Store a JSON payload, evicting the oldest rows now and then"""
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO results (digest, payload, created_at) VALUES (?, ?, ?)",
+                    (digest, payload, time.time())
+                )
+            self._puts += 1
+            if self._puts % self.evict_every == 0:
+                self.evict()
+        except sqlite3.Error as e:
+            self._record_error("write", e)
+
+    def evict(self):
+        """Trim the store to the newest ``max_entries`` rows"""
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "DELETE FROM results WHERE id <= (SELECT MAX(id) FROM results) - ?",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM results")
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries = self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors
+        }
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, opened lazily"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(str(self.path), timeout=self.busy_timeout_ms / 1000)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _record_error(self, operation: str, error: Exception):
+        # The store is an optimization; failures fall back to calculating
+        self.errors += 1
+        logger.warning("Shared result store %s failed: %s", operation, error)
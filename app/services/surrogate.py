@@ -0,0 +1,259 @@
+import json
+import math
+import bisect
+import hashlib
+import logging
+import itertools
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+from app.models.schemas import TBMParameters, field_bounds
+from app.services.calculator import TBMAdvanceRateCalculator, SOIL_TYPES, TBM_TYPES, ROCK_SOIL_TYPES
+from app.services.cache import model_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Interpolation axes and interpolated metrics, in storage order
+AXES = ("tbm_diameter", "thrust_force", "cutterhead_power", "cutterhead_speed", "depth")
+OUTPUTS = ("advance_rate", "daily_advance", "penetration_rate", "specific_energy", "confidence_score")
+OUTPUT_DECIMALS = (2, 2, 2, 2, 3)
+
+# Inputs held fixed while building a grid; queries must match them exactly
+DEFAULT_CONTEXT = {
+    "water_pressure": 0.0,
+    "chamber_pressure": 0.0,
+    "ucs": 50.0,  # rock types only
+    "rqd": 75.0   # rock types only
+}
+
+class SurrogateGrid:
+    """Dense precomputed grid answering queries by multilinear interpolation
+
+    One grid of ``len(AXES)`` dimensions is stored per (SoilType, TBMType)
+    pair. Every other input is fixed to ``context``; queries that differ in
+    those inputs or fall outside the axis ranges are not covered and must
+    be computed exactly. ``error_bounds`` holds the largest absolute error
+    per output measured on random probes during the build.
+
+    Axes are log-spaced and the grid stores log(metric), so interpolation is
+    multilinear in log-log space: the power laws in the calculator (thrust
+    per area, power per RPM, ...) are then reproduced almost exactly and the
+    remaining error comes from the clamps and method weighting.
+    """
+
+    def __init__(self, values: np.ndarray, axes: Dict[str, List[float]], context: Dict[str, float],
+                 error_bounds: np.ndarray, fingerprint: str):
+        self.values = values
+        self.axes = {name: np.asarray(points, dtype=float) for name, points in axes.items()}
+        self.axis_points = [self.axes[name] for name in AXES]
+        self._log_axes = [np.log(points) for points in self.axis_points]
+        self._log_axis_lists = [points.tolist() for points in self._log_axes]
+        # Plain ndarray view: indexing a np.memmap is markedly slower, paging stays lazy
+        self._array = np.asarray(values)
+        self.context = context
+        self.error_bounds = np.asarray(error_bounds, dtype=float)
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, calculator: TBMAdvanceRateCalculator, points: int = 8,
+              ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+              context: Optional[Dict[str, float]] = None, probes: int = 1000, seed: int = 0) -> "SurrogateGrid":
+        """Evaluate the calculator over the full grid for every soil/TBM pair"""
+        bounds = field_bounds()
+        bounds.update(ranges or {})
+        context = {**DEFAULT_CONTEXT, **(context or {})}
+        axes = {name: np.geomspace(*bounds[name], points).tolist() for name in AXES}
+
+        mesh = np.meshgrid(*[np.asarray(axes[name]) for name in AXES], indexing="ij")
+        grid_columns = {name: mesh[k].ravel() for k, name in enumerate(AXES)}
+        shape = (len(SOIL_TYPES), len(TBM_TYPES)) + mesh[0].shape + (len(OUTPUTS),)
+        values = np.empty(shape, dtype=np.float32)
+
+        for soil_index, tbm_index in itertools.product(range(len(SOIL_TYPES)), range(len(TBM_TYPES))):
+            metrics = calculator.calculate_batch(
+                _pair_columns(grid_columns, soil_index, tbm_index, context)
+            )
+            values[soil_index, tbm_index] = np.log(np.stack(
+                [metrics[name] for name in OUTPUTS], axis=-1
+            )).reshape(shape[2:])
+
+        grid = cls(values, axes, context, np.zeros(shape[:2] + (len(OUTPUTS),)), fingerprint_digest(calculator))
+        grid.error_bounds = grid._measure_errors(calculator, probes, seed)
+        logger.info("Built surrogate grid with %s points", values.size // len(OUTPUTS))
+        return grid
+
+    def save(self, path: str):
+        """Write the grid as .npy plus a .json metadata sidecar"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(path, self.values)
+        path.with_suffix(".json").write_text(json.dumps({
+            "axes": {name: points.tolist() for name, points in self.axes.items()},
+            "outputs": list(OUTPUTS),
+            "context": self.context,
+            "error_bounds": self.error_bounds.tolist(),
+            "fingerprint": self.fingerprint
+        }))
+
+    @classmethod
+    def load(cls, path: str) -> "SurrogateGrid":
+        """Memory-map a saved grid; pages are only read when queried"""
+        path = Path(path)
+        meta = json.loads(path.with_suffix(".json").read_text())
+        if meta["outputs"] != list(OUTPUTS) or list(meta["axes"]) != list(AXES):
+            raise ValueError(f"Surrogate grid {path} has an incompatible layout")
+        values = np.load(path, mmap_mode="r")
+        return cls(values, meta["axes"], meta["context"], meta["error_bounds"], meta["fingerprint"])
+
+    def covers(self, params: TBMParameters) -> bool:
+        """Whether a parameter set lies inside the grid and matches its context"""
+        if params.water_pressure != self.context["water_pressure"]:
+            return False
+        if params.chamber_pressure != self.context["chamber_pressure"]:
+            return False
+        if 'rock' in params.soil_type:
+            if params.ucs != self.context["ucs"] or params.rqd != self.context["rqd"]:
+                return False
+        elif params.ucs is not None or params.rqd is not None:
+            return False
+
+        for name, points in zip(AXES, self.axis_points):
+            value = getattr(params, name)
+            if value < points[0] or value > points[-1]:
+                return False
+        return True
+
+    def predict(self, params: TBMParameters) -> Optional[Dict[str, Any]]:
+        """Interpolated metrics with error bounds, or None if not covered"""
+        if not self.covers(params):
+            return None
+
+        soil_index = SOIL_TYPES.index(params.soil_type)
+        tbm_index = TBM_TYPES.index(params.tbm_type)
+
+        # Slice the 2**len(AXES) surrounding corners and weight them in one dot product
+        index = [soil_index, tbm_index]
+        fractions = []
+        for name, log_points in zip(AXES, self._log_axis_lists):
+            lower, fraction = _locate(log_points, math.log(getattr(params, name)))
+            index.append(slice(lower, lower + 2))
+            fractions.append(fraction)
+
+        # Corner weights in C order of the block (first axis most significant)
+        weights = [1.0]
+        for fraction in reversed(fractions):
+            weights = [w * (1 - fraction) for w in weights] + [w * fraction for w in weights]
+
+        block = self._array[tuple(index)].reshape(len(weights), len(OUTPUTS))
+        metrics = np.exp(np.dot(weights, block)).tolist()
+
+        errors = self.error_bounds[soil_index, tbm_index].tolist()
+        return {
+            "metrics": {name: round(metrics[k], OUTPUT_DECIMALS[k]) for k, name in enumerate(OUTPUTS)},
+            "error_bound": {name: round(errors[k], 4) for k, name in enumerate(OUTPUTS)}
+        }
+
+    def interpolate(self, soil_index: np.ndarray, tbm_index: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """Vectorized interpolation of an (n, len(AXES)) array of in-range points"""
+        lower, fractions = [], []
+        for k, axis in enumerate(self._log_axes):
+            log_values = np.log(points[:, k])
+            i = np.clip(np.searchsorted(axis, log_values, side="right") - 1, 0, len(axis) - 2)
+            lower.append(i)
+            fractions.append((log_values - axis[i]) / (axis[i + 1] - axis[i]))
+
+        result = np.zeros((len(points), len(OUTPUTS)))
+        for corner in itertools.product((0, 1), repeat=len(AXES)):
+            weight = np.ones(len(points))
+            index = [soil_index, tbm_index]
+            for k, bit in enumerate(corner):
+                weight = weight * (fractions[k] if bit else 1 - fractions[k])
+                index.append(lower[k] + bit)
+            result += weight[:, None] * self._array[tuple(index)]
+        return np.exp(result)
+
+    def _measure_errors(self, calculator: TBMAdvanceRateCalculator, probes: int, seed: int) -> np.ndarray:
+        """Largest absolute interpolation error per pair and output on random probes"""
+        rng = np.random.default_rng(seed)
+        errors = np.zeros((len(SOIL_TYPES), len(TBM_TYPES), len(OUTPUTS)))
+        if probes <= 0:
+            return errors
+
+        points = np.column_stack([rng.uniform(axis[0], axis[-1], probes) for axis in self.axis_points])
+        probe_columns = {name: points[:, k] for k, name in enumerate(AXES)}
+
+        for soil_index, tbm_index in itertools.product(range(len(SOIL_TYPES)), range(len(TBM_TYPES))):
+            metrics = calculator.calculate_batch(_pair_columns(probe_columns, soil_index, tbm_index, self.context))
+            exact = np.stack([metrics[name] for name in OUTPUTS], axis=-1)
+            approx = self.interpolate(
+                np.full(probes, soil_index), np.full(probes, tbm_index), points
+            )
+            errors[soil_index, tbm_index] = np.abs(approx - exact).max(axis=0)
+        return errors
+
+class SurrogateService:
+    """Holds the optional surrogate grid and loads it on first use"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._grid: Optional[SurrogateGrid] = None
+        self._loaded = False
+        self._checked_fingerprint = None
+        self._fingerprint_matches = False
+
+    def grid(self) -> Optional[SurrogateGrid]:
+        if not self._loaded:
+            self.load()
+        return self._grid
+
+    def load(self):
+        """Open the grid file if present (memory-mapped, so this is cheap)"""
+        self._loaded = True
+        if not self.path or not Path(self.path).exists():
+            logger.info("No surrogate grid found, surrogate mode disabled")
+            return
+        try:
+            self._grid = SurrogateGrid.load(self.path)
+            logger.info("Loaded surrogate grid from %s", self.path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Could not load surrogate grid %s: %s", self.path, e)
+
+    def predict(self, params: TBMParameters, calculator: TBMAdvanceRateCalculator) -> Optional[Dict[str, Any]]:
+        """Surrogate prediction, or None when the grid is missing, stale or not covering"""
+        grid = self.grid()
+        if grid is None:
+            return None
+        fingerprint = model_fingerprint(calculator)
+        if fingerprint != self._checked_fingerprint:
+            self._checked_fingerprint = fingerprint
+            self._fingerprint_matches = grid.fingerprint == fingerprint_digest(calculator)
+            if not self._fingerprint_matches:
+                logger.warning("Surrogate grid was built for different model coefficients, ignoring it")
+        if not self._fingerprint_matches:
+            return None
+        return grid.predict(params)
+
+def fingerprint_digest(calculator: TBMAdvanceRateCalculator) -> str:
+    """Stable hex digest of the model version and coefficient tables"""
+    return hashlib.sha256(repr(model_fingerprint(calculator)).encode()).hexdigest()
+
+def _locate(points: List[float], value: float) -> Tuple[int, float]:
+    """Index of the grid cell containing ``value`` and the position within it"""
+    lower = min(max(bisect.bisect_right(points, value) - 1, 0), len(points) - 2)
+    return lower, (value - points[lower]) / (points[lower + 1] - points[lower])
+
+def _pair_columns(columns: Dict[str, np.ndarray], soil_index: int, tbm_index: int,
+                  context: Dict[str, float]) -> Dict[str, Any]:
+    """Batch columns for one soil/TBM pair with the fixed context applied"""
+    size = len(columns[AXES[0]])
+    is_rock = bool(ROCK_SOIL_TYPES[soil_index])
+    return {
+        **columns,
+        "soil_type": np.full(size, soil_index),
+        "tbm_type": np.full(size, tbm_index),
+        "water_pressure": np.full(size, context["water_pressure"]),
+        "chamber_pressure": np.full(size, context["chamber_pressure"]),
+        "ucs": np.full(size, context["ucs"] if is_rock else np.nan),
+        "rqd": np.full(size, context["rqd"] if is_rock else np.nan)
+    }
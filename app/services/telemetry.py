@@ -0,0 +1,228 @@
+import csv
+import itertools
+import logging
+from typing import Dict, Any, Iterator, List, Optional, TextIO
+import numpy as np
+
+from app.models.schemas import TelemetryContext, field_bounds
+from app.services.calculator import TBMAdvanceRateCalculator, NUMERIC_FIELDS, SOIL_TYPES, TBM_TYPES
+
+logger = logging.getLogger(__name__)
+
+# Common PLC export headers (lower case) mapped onto telemetry fields
+DEFAULT_COLUMN_MAP = {
+    "thrust": "thrust_force",
+    "thrust_force": "thrust_force",
+    "thrust_kn": "thrust_force",
+    "rpm": "cutterhead_speed",
+    "cutterhead_speed": "cutterhead_speed",
+    "cutterhead_rpm": "cutterhead_speed",
+    "power": "cutterhead_power",
+    "power_kw": "cutterhead_power",
+    "cutterhead_power": "cutterhead_power",
+    "chamber_pressure": "chamber_pressure",
+    "earth_pressure": "chamber_pressure",
+    "water_pressure": "water_pressure",
+    "ring": "ring",
+    "ring_number": "ring",
+    "chainage": "chainage",
+    "chainage_m": "chainage"
+}
+
+# Fields a log row may supply: operational TBMParameters fields plus position
+TELEMETRY_FIELDS = ("thrust_force", "cutterhead_speed", "cutterhead_power", "chamber_pressure", "water_pressure", "ring", "chainage")
+
+BIN_MODES = ("ring", "chainage")
+
+# Metrics averaged per bin, with the decimals used for AdvanceRateResult
+BIN_METRICS = {
+    "advance_rate": 2,
+    "daily_advance": 2,
+    "penetration_rate": 2,
+    "specific_energy": 2,
+    "confidence_score": 3,
+    "thrust_force": 1,
+    "cutterhead_speed": 2
+}
+
+class TelemetryReader:
+    """Reads a CSV telemetry log in fixed-size chunks of float columns"""
+
+    def __init__(self, stream: TextIO, column_map: Optional[Dict[str, str]] = None, chunk_size: int = 10000):
+        self.chunk_size = chunk_size
+        self._reader = csv.reader(stream)
+
+        mapping = dict(DEFAULT_COLUMN_MAP)
+        mapping.update({k.strip().lower(): v for k, v in (column_map or {}).items()})
+        unknown = set(mapping.values()) - set(TELEMETRY_FIELDS)
+        if unknown:
+            raise ValueError(f"Column map targets unknown fields: {', '.join(sorted(unknown))}")
+
+        try:
+            header = next(self._reader)
+        except StopIteration:
+            raise ValueError("Telemetry log is empty")
+
+        # First matching header column wins for each field
+        self.positions: Dict[str, int] = {}
+        for position, name in enumerate(header):
+            field = mapping.get(name.strip().lower())
+            if field and field not in self.positions:
+                self.positions[field] = position
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.positions)
+
+    def __iter__(self) -> Iterator[Dict[str, np.ndarray]]:
+        while True:
+            rows = list(itertools.islice(self._reader, self.chunk_size))
+            if not rows:
+                return
+            yield {field: _parse_column(rows, position) for field, position in self.positions.items()}
+
+class TelemetryPipeline:
+    """Turns chunked telemetry into per-ring or per-chainage-bin predictions
+
+    Bins are closed when the bin key changes, so only the bin currently being
+    filled is held in memory. Logs are expected to be ordered by time, which
+    keeps rings and chainage contiguous.
+    """
+
+    def __init__(self, calculator: TBMAdvanceRateCalculator, context: TelemetryContext,
+                 bin_by: str = "ring", bin_size: float = 1.0):
+        if bin_by not in BIN_MODES:
+            raise ValueError(f"bin_by must be one of: {', '.join(BIN_MODES)}")
+        if bin_size <= 0:
+            raise ValueError("bin_size must be positive")
+
+        self.calculator = calculator
+        self.context = context
+        self.bin_by = bin_by
+        self.bin_size = bin_size
+        self.bounds = field_bounds()
+        self.stats = {"rows": 0, "used": 0, "skipped": 0, "bins": 0}
+
+    def process(self, reader: TelemetryReader) -> Iterator[Dict[str, Any]]:
+        """Validate the log columns, then lazily yield one aggregate per bin"""
+        missing = [
+            field for field in NUMERIC_FIELDS
+            if field not in reader.positions and getattr(self.context, field) is None
+            and field not in ("ucs", "rqd")
+        ]
+        if missing:
+            raise ValueError(f"Fields missing from both log columns and context: {', '.join(missing)}")
+        if self.bin_by not in reader.positions:
+            raise ValueError(f"Telemetry log has no {self.bin_by} column")
+
+        return self._aggregate(reader)
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+    def _aggregate(self, reader: TelemetryReader) -> Iterator[Dict[str, Any]]:
+        open_bin = None
+
+        for chunk in reader:
+            for run in self._chunk_runs(chunk):
+                if open_bin is not None and open_bin["key"] == run["key"]:
+                    _merge_runs(open_bin, run)
+                    continue
+                if open_bin is not None:
+                    yield self._emit(open_bin)
+                open_bin = run
+
+        if open_bin is not None:
+            yield self._emit(open_bin)
+
+        logger.info("Processed telemetry log: %s", self.stats)
+
+    def _chunk_runs(self, chunk: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """Predict a chunk and reduce it to runs of consecutive equal bin keys"""
+        size = len(next(iter(chunk.values())))
+        self.stats["rows"] += size
+
+        columns = {}
+        for field in NUMERIC_FIELDS:
+            if field in chunk:
+                columns[field] = chunk[field]
+            else:
+                value = getattr(self.context, field)
+                columns[field] = np.full(size, np.nan if value is None else float(value))
+
+        if self.bin_by == "ring":
+            keys = chunk["ring"]
+        else:
+            keys = np.floor(chunk["chainage"] / self.bin_size) * self.bin_size
+
+        # Drop idle or corrupt samples (e.g. cutterhead stopped during ring build)
+        valid = np.isfinite(keys)
+        for field in chunk:
+            if field in self.bounds:
+                low, high = self.bounds[field]
+                valid &= (chunk[field] >= low) & (chunk[field] <= high)
+
+        count = int(valid.sum())
+        self.stats["used"] += count
+        self.stats["skipped"] += size - count
+        if not count:
+            return []
+
+        columns = {field: values[valid] for field, values in columns.items()}
+        columns["soil_type"] = np.full(count, SOIL_TYPES.index(self.context.soil_type))
+        columns["tbm_type"] = np.full(count, TBM_TYPES.index(self.context.tbm_type))
+        metrics = self.calculator.calculate_batch(columns)
+        metrics["thrust_force"] = columns["thrust_force"]
+        metrics["cutterhead_speed"] = columns["cutterhead_speed"]
+
+        keys = keys[valid]
+        starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+        counts = np.diff(np.append(starts, count))
+        sums = {metric: np.add.reduceat(metrics[metric], starts) for metric in BIN_METRICS}
+        minimum = np.minimum.reduceat(metrics["advance_rate"], starts)
+        maximum = np.maximum.reduceat(metrics["advance_rate"], starts)
+
+        return [
+            {
+                "key": float(keys[start]),
+                "samples": int(counts[i]),
+                "sums": {metric: float(values[i]) for metric, values in sums.items()},
+                "advance_rate_min": float(minimum[i]),
+                "advance_rate_max": float(maximum[i])
+            }
+            for i, start in enumerate(starts)
+        ]
+
+    def _emit(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        self.stats["bins"] += 1
+        samples = run["samples"]
+        key = int(run["key"]) if self.bin_by == "ring" else round(run["key"], 6)
+
+        aggregate = {self.bin_by: key, "samples": samples}
+        for metric, decimals in BIN_METRICS.items():
+            aggregate[f"{metric}_mean"] = round(run["sums"][metric] / samples, decimals)
+        aggregate["advance_rate_min"] = round(run["advance_rate_min"], 2)
+        aggregate["advance_rate_max"] = round(run["advance_rate_max"], 2)
+        return aggregate
+
+def _merge_runs(target: Dict[str, Any], run: Dict[str, Any]):
+    """Fold a run into the open bin with the same key"""
+    target["samples"] += run["samples"]
+    for metric, value in run["sums"].items():
+        target["sums"][metric] += value
+    target["advance_rate_min"] = min(target["advance_rate_min"], run["advance_rate_min"])
+    target["advance_rate_max"] = max(target["advance_rate_max"], run["advance_rate_max"])
+
+def _parse_column(rows: List[List[str]], position: int) -> np.ndarray:
+    """Parse one CSV column to floats, using NaN for blank or malformed cells"""
+    values = [row[position] if position < len(row) else "" for row in rows]
+    try:
+        return np.array(values, dtype=float)
+    except ValueError:
+        return np.array([_parse_float(value) for value in values])
+
+def _parse_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return float("nan")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Calculator micro-benchmark suite for TBM Advance Rate Calculator
+
+Times pydantic validation, calculate_advance_rate, the record fast path,
+each calculation method, the risk assessment and JSON serialization for
+every example scenario served by /examples. Reports ns/op and the peak
+memory allocated by one call, writes the numbers as a JSON baseline and
+compares a run against a saved baseline.
+
+Examples:
+    python benchmarks/calculator.py --save benchmarks/baselines/calculator.json
+    python benchmarks/calculator.py --compare benchmarks/baselines/calculator.json --threshold 10
+"""
+
+import argparse
+import json
+import logging
+import platform
+import re
+import statistics
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Add the app directory to Python path
+app_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(app_dir))
+
+import numpy as np
+import pydantic
+
+from app.core.config import settings
+from app.models.records import ParameterRecord
+from app.models.schemas import TBMParameters
+from app.routers.calculator import example_scenarios
+from app.services.calculator import TBMAdvanceRateCalculator
+
+def build_cases(calculator: TBMAdvanceRateCalculator, values: Dict[str, Any]) -> Dict[str, Callable[[], Any]]:
+    """Benchmarked operations for one parameter set"""
+    params = TBMParameters(**values)
+    record = ParameterRecord.from_parameters(params)
+    result = calculator.calculate_advance_rate(params)
+    return {
+        "validation": lambda: TBMParameters(**values),
+        "calculate_advance_rate": lambda: calculator.calculate_advance_rate(params),
+        "calculate_record": lambda: calculator.calculate_record(record, risk_factors=True),
+        "_empirical_method": lambda: calculator._empirical_method(params),
+        "_theoretical_method": lambda: calculator._theoretical_method(params),
+        "_regression_method": lambda: calculator._regression_method(params),
+        "_assess_risk_factors": lambda: calculator._assess_risk_factors(params),
+        "serialization": lambda: result.model_dump_json()
+    }
+
+def scenario_key(name: str) -> str:
+    """'Metro Tunnel - Soft Ground' -> 'metro-tunnel-soft-ground'"""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+def measure(operation: Callable[[], Any], min_time: float, repeat: int) -> Dict[str, float]:
+    """ns/op (best and median of ``repeat`` runs) and peak bytes allocated by one call"""
+    timer = timeit.Timer(operation)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    runs = [elapsed / number * 1e9 for elapsed in timer.repeat(repeat, number)]
+
+    tracemalloc.start()
+    operation()
+    tracemalloc.reset_peak()
+    current = tracemalloc.get_traced_memory()[0]
+    operation()
+    peak = tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+
+    return {
+        "ns_per_op": round(min(runs), 1),
+        "median_ns_per_op": round(statistics.median(runs), 1),
+        "peak_bytes": peak,
+        "loops": number
+    }
+
+def run_suite(pattern: str, min_time: float, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Measure every case of every example scenario matching ``pattern``"""
+    calculator = TBMAdvanceRateCalculator()
+    selector = re.compile(pattern)
+    results = {}
+    for scenario in example_scenarios():
+        cases = build_cases(calculator, scenario["parameters"])
+        for case, operation in cases.items():
+            key = f"{scenario_key(scenario['name'])}/{case}"
+            if selector.search(key):
+                results[key] = measure(operation, min_time, repeat)
+    return results
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pydantic": pydantic.VERSION,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "model_version": settings.MODEL_VERSION,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Print the change per case and return the cases slower than ``threshold`` percent"""
+    regressions = []
+    print(f"📊 Compared with baseline (regression threshold {threshold:.0f}%)")
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            print(f"   {key:<60} {current['ns_per_op']:>10.0f} ns   (new)")
+            continue
+        change = (current["ns_per_op"] - previous["ns_per_op"]) / previous["ns_per_op"] * 100
+        flag = "⚠️ " if change > threshold else "  "
+        print(f"{flag} {key:<60} {previous['ns_per_op']:>10.0f} -> {current['ns_per_op']:>10.0f} ns  {change:+6.1f}%")
+        if change > threshold:
+            regressions.append(key)
+    for key in baseline.keys() - results.keys():
+        print(f"   {key:<60} (not measured)")
+    return regressions
+
+def main(argv=None):
+    """Run the suite, optionally saving a baseline or comparing with one"""
+    parser = argparse.ArgumentParser(description="Benchmark the calculator per operation and scenario")
+    parser.add_argument("--filter", default="", help="Regular expression selecting scenario/case keys")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per case (best is compared)")
+    parser.add_argument("--save", help="Write the results as a JSON baseline to this path")
+    parser.add_argument("--compare", help="Compare with a JSON baseline written by --save")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Slowdown in percent flagged as a regression")
+    args = parser.parse_args(argv)
+
+    # Measure computation, not log formatting
+    logging.disable(logging.INFO)
+    results = run_suite(args.filter, args.min_time, args.repeat)
+    if not results:
+        print(f"❌ No benchmark matches {args.filter!r}")
+        return 1
+
+    print(f"⏱️  Per-operation time (best of {args.repeat} runs) and peak allocation per call")
+    for key, result in results.items():
+        print(f"   {key:<60} {result['ns_per_op']:>10.0f} ns/op {result['peak_bytes']:>9} B")
+
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"environment": environment(), "results": results}, indent=2))
+        print(f"💾 Baseline written to {path}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if baseline.get("environment", {}).get("platform") != platform.platform():
+            print("⚠️  Baseline was recorded on a different platform, timings may not be comparable")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) above {args.threshold:.0f}%")
+            return 1
+        print("✅ No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Fast path benchmark for TBM Advance Rate Calculator
+
+Compares the per-call cost of the validated path (TBMParameters in,
+AdvanceRateResult out) with the record fast path (ParameterRecord in,
+ResultRecord out) for the same parameter set.
+
+Example:
+    python benchmarks/fast_path.py --number 20000
+"""
+
+import argparse
+import logging
+import sys
+import timeit
+from pathlib import Path
+
+# Add the app directory to Python path
+app_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(app_dir))
+
+from app.models.schemas import TBMParameters
+from app.models.records import ParameterRecord
+from app.services.calculator import TBMAdvanceRateCalculator
+
+PARAMETERS = {
+    "tbm_diameter": 6.2,
+    "tbm_type": "epb",
+    "cutterhead_power": 2000,
+    "soil_type": "clay",
+    "thrust_force": 15000,
+    "cutterhead_speed": 2.5,
+    "depth": 15,
+    "water_pressure": 1.5,
+    "chamber_pressure": 1.2,
+    "temperature": 18
+}
+
+def per_call(statement, number, repeat):
+    """Best per-call time in microseconds"""
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1e6
+
+def main(argv=None):
+    """Time both paths and print the overhead saved"""
+    parser = argparse.ArgumentParser(description="Benchmark the calculator fast path")
+    parser.add_argument("--number", type=int, default=20000, help="Calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs (best is reported)")
+    args = parser.parse_args(argv)
+
+    # Measure computation, not log formatting
+    logging.disable(logging.INFO)
+    calculator = TBMAdvanceRateCalculator()
+    params = TBMParameters(**PARAMETERS)
+    record = ParameterRecord(**PARAMETERS)
+
+    timings = {
+        "TBMParameters(**values)": per_call(lambda: TBMParameters(**PARAMETERS), args.number, args.repeat),
+        "calculate_advance_rate(params)": per_call(lambda: calculator.calculate_advance_rate(params), args.number, args.repeat),
+        "ParameterRecord(**values)": per_call(lambda: ParameterRecord(**PARAMETERS), args.number, args.repeat),
+        "calculate_record(record)": per_call(lambda: calculator.calculate_record(record), args.number, args.repeat),
+        "calculate_record(record, risk_factors=True)": per_call(
+            lambda: calculator.calculate_record(record, risk_factors=True), args.number, args.repeat
+        )
+    }
+
+    validated = timings["TBMParameters(**values)"] + timings["calculate_advance_rate(params)"]
+    fast = timings["ParameterRecord(**values)"] + timings["calculate_record(record)"]
+
+    print("⏱️  Per-call time (best of {} runs of {} calls)".format(args.repeat, args.number))
+    for name, value in timings.items():
+        print(f"   {name:<45} {value:8.2f} µs")
+    print(f"📊 Validated path: {validated:.2f} µs, fast path: {fast:.2f} µs")
+    print(f"✅ Saved {validated - fast:.2f} µs per call ({validated / fast:.1f}x faster)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
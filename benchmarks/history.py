@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Calculation history benchmark for TBM Advance Rate Calculator
+
+Fills a scratch history database with synthetic calculations spread over
+the last --days days, then reports the cost of HistoryRecorder.record on
+the request path, the flush throughput, and the latency of paged and
+aggregate queries over the whole table.
+
+Examples:
+    python benchmarks/history.py --rows 1000000
+    python benchmarks/history.py --rows 5000000 --database /tmp/history.db
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+
+# Add the app directory to Python path
+app_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(app_dir))
+
+from app.models.schemas import TBMParameters, SoilType, TBMType
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.history import HistoryStore, HistoryRecorder
+
+PARAMETERS = {
+    "tbm_diameter": 6.2,
+    "tbm_type": "epb",
+    "cutterhead_power": 2000,
+    "soil_type": "clay",
+    "thrust_force": 15000,
+    "cutterhead_speed": 2.5,
+    "depth": 15,
+    "water_pressure": 1.5
+}
+
+def synthetic_rows(count: int, days: float, rng: random.Random):
+    """Rows in insertion (time) order, in HistoryStore INSERT column order"""
+    now = time.time()
+    step = days * 86400 / count
+    soils = [soil.value for soil in SoilType]
+    tbms = [tbm.value for tbm in TBMType]
+    parameters = TBMParameters(**PARAMETERS).model_dump_json()
+    for i in range(count):
+        rate = rng.uniform(5, 60)
+        yield (
+            now - days * 86400 + i * step, rng.choice(soils), rng.choice(tbms), rng.choice(("1.0", "1.0+retrained")),
+            None, None, "calculate", parameters, rate, rate * 1.2, rate / 2.5, rng.uniform(5, 40),
+            rng.uniform(0.5, 1), "low"
+        )
+
+def timed(function, repeat: int = 5) -> float:
+    """Best wall-clock milliseconds of ``repeat`` calls"""
+    return min(timeit.repeat(function, number=1, repeat=repeat)) * 1000
+
+def main(argv=None):
+    """Fill a scratch history table and time writes and queries"""
+    parser = argparse.ArgumentParser(description="Benchmark the calculation history store")
+    parser.add_argument("--rows", type=int, default=1000000, help="Synthetic calculations to insert")
+    parser.add_argument("--days", type=float, default=90, help="Days the calculations are spread over")
+    parser.add_argument("--batch", type=int, default=5000, help="Rows per insert transaction")
+    parser.add_argument("--database", help="SQLite file to use (default: a temporary one)")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    path = args.database or os.path.join(tempfile.mkdtemp(prefix="tbm-history-"), "history.db")
+    store = HistoryStore(path)
+    rng = random.Random(0)
+
+    print(f"📝 Inserting {args.rows:,} rows into {path} in transactions of {args.batch}")
+    start = time.perf_counter()
+    batch = []
+    for row in synthetic_rows(args.rows, args.days, rng):
+        batch.append(row)
+        if len(batch) == args.batch:
+            store.insert_many(batch)
+            batch = []
+    if batch:
+        store.insert_many(batch)
+    elapsed = time.perf_counter() - start
+    print(f"   {args.rows / elapsed:,.0f} rows/s with all four indexes")
+
+    # Request path and flush thread cost with real calculation results
+    calculator = TBMAdvanceRateCalculator()
+    params = TBMParameters(**PARAMETERS)
+    result = calculator.calculate_advance_rate(params)
+    model = calculator.regression.current()
+    recorder = HistoryRecorder(store, buffer_size=args.batch * 3, flush_size=args.batch)
+    record_us = min(timeit.repeat(lambda: recorder.record(params, result, model), number=args.batch, repeat=3)) \
+        / args.batch * 1e6
+    start = time.perf_counter()
+    flushed = 0
+    while recorder.flush():
+        flushed = recorder.written
+    flush_rate = flushed / (time.perf_counter() - start)
+    print(f"⏱️  record(): {record_us:.2f} µs per calculation on the request path")
+    print(f"   flush: {flush_rate:,.0f} calculations/s (row building, JSON and insert)")
+
+    now = time.time()
+    middle = now - args.days * 86400 / 2
+    _, cursor = store.page({}, limit=100)
+    deep = (middle, args.rows // 2)
+    queries = [
+        ("newest page of 100", lambda: store.page({}, limit=100)),
+        ("next page (cursor)", lambda: store.page({}, limit=100, cursor=cursor)),
+        ("page at mid-table", lambda: store.page({}, limit=100, cursor=deep)),
+        ("clay page, one week", lambda: store.page({"soil_type": "clay", "start": now - 7 * 86400}, limit=100)),
+        ("count by soil type, one day", lambda: store.aggregate({"start": now - 86400}, ["soil_type"])),
+        ("daily stats, one week", lambda: store.aggregate({"start": now - 7 * 86400}, ["day"])),
+        ("daily stats, clay, 30 days", lambda: store.aggregate({"soil_type": "clay", "start": now - 30 * 86400}, ["day"])),
+        ("by soil and TBM, whole table", lambda: store.aggregate({}, ["soil_type", "tbm_type"], limit=1000)),
+    ]
+    print(f"🔎 Query latency over {args.rows:,} rows (best of 5)")
+    for name, query in queries:
+        print(f"   {name:<30} {timed(query):>9.2f} ms")
+    print("✅ Done")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
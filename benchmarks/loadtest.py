@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Load test for TBM Advance Rate Calculator
+
+Drives the FastAPI app in-process over ASGI (no network or server in the
+way) or, with --url, a running uvicorn. A fixed number of concurrent
+clients send a weighted mix of requests for the given duration; the
+report covers throughput, p50/p95/p99 latency and error rate overall and
+per request type, and can be saved as JSON to compare runs.
+
+By default every client sends its next request as soon as the previous
+one returns (closed loop), which measures service time and peak
+throughput. With --rate the clients share a fixed arrival rate and
+latency is taken from each request's scheduled start, so time spent
+queued behind a slow request counts towards p99 (open loop).
+
+Requires httpx (pip install -r requirements-dev.txt).
+
+Examples:
+    python benchmarks/loadtest.py --concurrency 32 --duration 20
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000 --mix calculate=8,examples=1,health=1
+    python benchmarks/loadtest.py --rate 500 --output results/loadtest-500rps.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import sys
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add the app directory to Python path
+app_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(app_dir))
+
+import httpx
+import numpy as np
+
+from app.models.schemas import field_bounds
+from app.routers.calculator import example_scenarios
+
+EXAMPLE_PARAMETERS = [scenario["parameters"] for scenario in example_scenarios()]
+BOUNDS = field_bounds()
+
+# Request type -> (method, path); bodies come from request_body
+REQUEST_TYPES = {
+    "calculate": ("POST", "/api/v1/calculate"),
+    "calculate-uncached": ("POST", "/api/v1/calculate"),
+    "examples": ("GET", "/api/v1/examples"),
+    "soil-types": ("GET", "/api/v1/soil-types"),
+    "tbm-types": ("GET", "/api/v1/tbm-types"),
+    "calculation-info": ("GET", "/api/v1/calculation-info"),
+    "health": ("GET", "/api/v1/health")
+}
+
+DEFAULT_MIX = "calculate=6,calculate-uncached=2,examples=1,soil-types=1"
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """``"calculate=8,examples=1"`` as request type -> weight"""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in REQUEST_TYPES:
+            raise ValueError(f"Unknown request type {name!r}, expected one of {', '.join(REQUEST_TYPES)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def request_body(request_type: str, rng: random.Random) -> Optional[Dict[str, Any]]:
+    """JSON body: an /examples scenario, perturbed per request for uncached calculations"""
+    if request_type == "calculate":
+        return rng.choice(EXAMPLE_PARAMETERS)
+    if request_type == "calculate-uncached":
+        body = dict(rng.choice(EXAMPLE_PARAMETERS))
+        for name in ("thrust_force", "depth"):
+            low, high = BOUNDS[name]
+            body[name] = round(min(max(body[name] * rng.uniform(0.8, 1.2), low), high), 3)
+        return body
+    return None
+
+async def client_loop(client: httpx.AsyncClient, mix: Dict[str, float], deadline: float, seed: int,
+                      samples: List[Tuple[str, float, Optional[int]]], interval: Optional[float] = None):
+    """Send requests until ``deadline``, recording (type, seconds, status)
+
+    Requests go back to back, or every ``interval`` seconds with latency
+    measured from the scheduled send time when an interval is given.
+    """
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    # Spread the clients' schedules over one interval
+    scheduled = time.perf_counter() + (rng.uniform(0, interval) if interval else 0.0)
+    while scheduled < deadline:
+        request_type = rng.choices(names, weights)[0]
+        method, path = REQUEST_TYPES[request_type]
+        body = request_body(request_type, rng)
+        if interval:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            start = scheduled
+            scheduled += interval
+        else:
+            start = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = None
+        samples.append((request_type, time.perf_counter() - start, status))
+        if not interval:
+            scheduled = time.perf_counter()
+
+async def run_load(url: Optional[str], concurrency: int, duration: float, warmup: float,
+                   mix: Dict[str, float], seed: int,
+                   rate: Optional[float] = None) -> Tuple[List[Tuple[str, float, Optional[int]]], float]:
+    """Run the clients and return the samples recorded after warm-up and the measured wall time"""
+    interval = concurrency / rate if rate else None
+    async with AsyncExitStack() as stack:
+        if url:
+            client = httpx.AsyncClient(
+                base_url=url, timeout=30, limits=httpx.Limits(max_connections=concurrency)
+            )
+        else:
+            from app.main import app
+            # ASGITransport does not send lifespan events; run startup/shutdown here
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=30)
+        await stack.enter_async_context(client)
+
+        if warmup > 0:
+            await asyncio.gather(*(
+                client_loop(client, mix, time.perf_counter() + warmup, seed + i, [], interval) for i in range(concurrency)
+            ))
+
+        samples: List[Tuple[str, float, Optional[int]]] = []
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(client, mix, start + duration, seed + i, samples, interval) for i in range(concurrency)
+        ))
+        return samples, time.perf_counter() - start
+
+def summarize(samples: List[Tuple[str, float, Optional[int]]], elapsed: float) -> Dict[str, Any]:
+    """Throughput, latency percentiles (ms) and error rate of a set of samples"""
+    if not samples:
+        return {"requests": 0, "errors": 0, "error_rate": 0.0, "throughput_rps": 0.0}
+    latencies = np.array([seconds for _, seconds, _ in samples]) * 1000
+    statuses = Counter("error" if status is None else str(status) for _, _, status in samples)
+    errors = sum(count for status, count in statuses.items() if status == "error" or int(status) >= 400)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4),
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "mean_ms": round(float(latencies.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(latencies.max()), 3),
+        "status_codes": dict(sorted(statuses.items()))
+    }
+
+def main(argv=None):
+    """Run the load test and print (and optionally save) the report"""
+    parser = argparse.ArgumentParser(description="Load test the API in-process or against a running server")
+    parser.add_argument("--url", help="Base URL of a running server (default: drive the app in-process)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before the run")
+    parser.add_argument("--rate", type=float, help="Total requests per second, open loop (default: as fast as possible)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Request type weights (types: {', '.join(REQUEST_TYPES)})")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the request sequence")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    if not args.url:
+        # In-process the app logs to this terminal; keep only problems
+        logging.disable(logging.INFO)
+
+    target = args.url or "in-process ASGI"
+    pace = f"{args.rate:.0f} req/s" if args.rate else "closed loop"
+    print(f"🚇 Load testing {target}: {args.concurrency} clients, {pace}, for {args.duration:.0f}s ({args.mix})")
+    samples, elapsed = asyncio.run(run_load(args.url, args.concurrency, args.duration, args.warmup, mix, args.seed, args.rate))
+
+    by_type = {
+        name: summarize([sample for sample in samples if sample[0] == name], elapsed) for name in mix
+    }
+    report = {
+        "config": {
+            "target": target, "concurrency": args.concurrency, "duration": args.duration,
+            "warmup": args.warmup, "rate": args.rate, "mix": mix, "seed": args.seed
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.utcnow().isoformat()
+        },
+        "summary": summarize(samples, elapsed),
+        "by_type": by_type
+    }
+
+    print(f"{'':<20} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for name, stats in [("total", report["summary"])] + list(by_type.items()):
+        if stats["requests"]:
+            print(
+                f"{name:<20} {stats['throughput_rps']:>9.1f} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                f"{stats['p99_ms']:>9.2f} {stats['error_rate']:>8.2%}"
+            )
+
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        print(f"💾 Report written to {path}")
+    return 1 if report["summary"]["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Metrics overhead benchmark for TBM Advance Rate Calculator
+
+Measures the cost of recording one histogram observation, of a timed
+calculator stage (wrapper plus observation) and of a whole fast-path
+calculation with and without stage instrumentation.
+
+Example:
+    python benchmarks/metrics_overhead.py --number 200000
+"""
+
+import argparse
+import logging
+import sys
+import timeit
+from pathlib import Path
+
+# Add the app directory to Python path
+app_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(app_dir))
+
+from app.core.metrics import MetricsRegistry, STAGE_BUCKETS, instrument_methods
+from app.models.records import ParameterRecord
+from app.services.calculator import TBMAdvanceRateCalculator, STAGE_METHODS
+
+PARAMETERS = {
+    "tbm_diameter": 6.2,
+    "tbm_type": "epb",
+    "cutterhead_power": 2000,
+    "soil_type": "clay",
+    "thrust_force": 15000,
+    "cutterhead_speed": 2.5,
+    "depth": 15,
+    "water_pressure": 1.5,
+    "chamber_pressure": 1.2,
+    "temperature": 18
+}
+
+def per_call(statement, number, repeat):
+    """Best per-call time in nanoseconds"""
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1e9
+
+def main(argv=None):
+    """Time metric recording and print the per-observation overhead"""
+    parser = argparse.ArgumentParser(description="Benchmark metrics recording overhead")
+    parser.add_argument("--number", type=int, default=200000, help="Calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs (best is reported)")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    histogram = MetricsRegistry().histogram("benchmark_seconds", "Benchmark", ("stage",), STAGE_BUCKETS)
+    series = histogram.labels("empirical")
+    record = ParameterRecord(**PARAMETERS)
+
+    plain = TBMAdvanceRateCalculator()
+    instrumented = TBMAdvanceRateCalculator()
+    instrument_methods(instrumented, STAGE_METHODS, histogram)
+
+    baseline = per_call(lambda: None, args.number, args.repeat)
+    observe = per_call(lambda: series.observe(3e-5), args.number, args.repeat) - baseline
+    stage_plain = per_call(lambda: plain._empirical_method(record), args.number, args.repeat)
+    stage_timed = per_call(lambda: instrumented._empirical_method(record), args.number, args.repeat)
+    calls = max(args.number // 10, 1)
+    record_plain = per_call(lambda: plain.calculate_record(record, risk_factors=True), calls, args.repeat)
+    record_timed = per_call(lambda: instrumented.calculate_record(record, risk_factors=True), calls, args.repeat)
+
+    print("⏱️  Per-call time (best of {} runs)".format(args.repeat))
+    print(f"   {'histogram observe':<45} {observe:8.0f} ns")
+    print(f"   {'timed stage overhead (wrapper + observe)':<45} {stage_timed - stage_plain:8.0f} ns")
+    print(f"   {'calculate_record, uninstrumented':<45} {record_plain:8.0f} ns")
+    print(f"   {'calculate_record, {} stages timed'.format(len(STAGE_METHODS)):<45} {record_timed:8.0f} ns")
+    per_observation = (record_timed - record_plain) / len(STAGE_METHODS)
+    print(f"📊 Overhead per timed stage: {per_observation:.0f} ns")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+One-parameter sweep benchmark for TBM Advance Rate Calculator
+
+Sweeps each numeric field of every /examples scenario over its schema
+range and compares a full calculate_record per value with sweep_record,
+which reruns only the stages that read the swept field. Checks that
+both give identical results.
+
+Examples:
+    python benchmarks/sweep.py --points 500
+    python benchmarks/sweep.py --risk-factors --repeat 10
+"""
+
+import argparse
+import logging
+import sys
+import timeit
+from pathlib import Path
+
+# Add the app directory to Python path
+app_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(app_dir))
+
+import numpy as np
+
+from app.models.records import ParameterRecord
+from app.models.schemas import field_bounds
+from app.routers.calculator import example_scenarios
+from app.services.calculator import TBMAdvanceRateCalculator, NUMERIC_FIELDS, stages_reading
+
+def sweep_values(field: str, points: int):
+    low, high = field_bounds()[field]
+    return np.linspace(low, high, points).tolist()
+
+def main(argv=None):
+    """Time full and partial recomputation over one-parameter sweeps"""
+    parser = argparse.ArgumentParser(description="Benchmark one-parameter sweeps")
+    parser.add_argument("--points", type=int, default=200, help="Values per sweep")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs (best is reported)")
+    parser.add_argument("--risk-factors", action="store_true", help="Assess risk factors for every value")
+    args = parser.parse_args(argv)
+
+    # Measure computation, not log formatting
+    logging.disable(logging.INFO)
+    calculator = TBMAdvanceRateCalculator()
+    risk = args.risk_factors
+    totals = {}
+
+    print(f"⏱️  µs per value, {args.points}-point sweeps (best of {args.repeat} runs)")
+    print(f"   {'field':<18} {'full':>8} {'partial':>8} {'speed-up':>9}  rerun stages")
+    for field in NUMERIC_FIELDS:
+        full_time = partial_time = 0.0
+        for scenario in example_scenarios():
+            base = ParameterRecord(**scenario["parameters"])
+            values = sweep_values(field, args.points)
+
+            def full():
+                return [calculator.calculate_record(base.replace(**{field: value}), risk) for value in values]
+
+            def partial():
+                return calculator.sweep_record(base, field, values, risk)
+
+            if [repr(record) for record in full()] != [repr(record) for record in partial()]:
+                print(f"❌ {scenario['name']}: partial {field} sweep differs from full recomputation", file=sys.stderr)
+                return 1
+            # Alternate the runs so machine noise affects both alike
+            runs = [(timeit.timeit(full, number=1), timeit.timeit(partial, number=1)) for _ in range(args.repeat)]
+            full_time += min(full_run for full_run, _ in runs)
+            partial_time += min(partial_run for _, partial_run in runs)
+
+        count = args.points * len(example_scenarios())
+        stages = stages_reading(frozenset([field]), calculator.risk_rules.inputs, risk)
+        totals[field] = (full_time, partial_time)
+        print(f"   {field:<18} {full_time / count * 1e6:>8.2f} {partial_time / count * 1e6:>8.2f} "
+              f"{full_time / partial_time:>8.2f}x  {', '.join(stages) or '-'}")
+
+    full_total = sum(full for full, _ in totals.values())
+    partial_total = sum(partial for _, partial in totals.values())
+    print(f"✅ Identical results; overall {full_total / partial_total:.2f}x faster")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
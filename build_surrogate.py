@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Surrogate grid builder for TBM Advance Rate Calculator
+
+Evaluates the calculator over a dense grid of diameter, thrust, power,
+RPM and depth for every soil/TBM type pair and saves it as a .npy file
+(plus .json metadata) that the API memory-maps at startup.
+
+Example:
+    python build_surrogate.py --points 10 --range thrust_force=2000:45000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to Python path
+app_dir = Path(__file__).parent
+sys.path.insert(0, str(app_dir))
+
+from app.core.config import settings
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.surrogate import SurrogateGrid, AXES, OUTPUTS, DEFAULT_CONTEXT
+
+def parse_range(text):
+    name, _, bounds = text.partition("=")
+    if name not in AXES:
+        raise argparse.ArgumentTypeError(f"unknown axis {name!r}, expected one of {', '.join(AXES)}")
+    try:
+        low, high = (float(v) for v in bounds.split(":"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected FIELD=LOW:HIGH")
+    return name, (low, high)
+
+def main(argv=None):
+    """Build and save the surrogate grid"""
+    parser = argparse.ArgumentParser(description="Build the surrogate interpolation grid")
+    parser.add_argument("--output", "-o", default=settings.SURROGATE_GRID_PATH, help="Output .npy path")
+    parser.add_argument("--points", type=int, default=8, help="Grid points per axis")
+    parser.add_argument("--range", type=parse_range, action="append", default=[], metavar="FIELD=LOW:HIGH",
+                        help="Axis range (defaults to the schema bounds); repeatable")
+    parser.add_argument("--probes", type=int, default=1000, help="Random probes per pair for the error bound")
+    for name, value in DEFAULT_CONTEXT.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=value,
+                            help=f"Fixed {name} for the grid (default {value})")
+    args = parser.parse_args(argv)
+
+    context = {name: getattr(args, name) for name in DEFAULT_CONTEXT}
+    started = time.perf_counter()
+    grid = SurrogateGrid.build(
+        TBMAdvanceRateCalculator(settings.REGRESSION_MODEL_PATH), points=args.points, ranges=dict(args.range),
+        context=context, probes=args.probes
+    )
+    grid.save(args.output)
+
+    worst = grid.error_bounds.max(axis=(0, 1))
+    print(f"✅ Saved {args.output} ({grid.values.nbytes / 1e6:.1f} MB) in {time.perf_counter() - started:.1f}s")
+    for name, error in zip(OUTPUTS, worst):
+        print(f"   max |error| {name}: {error:.4f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Coefficient calibration for TBM Advance Rate Calculator
+
+Refits a project's soil coefficients (k1, resistance) and TBM efficiencies
+to a whole history of observed advance rates and publishes them as the
+project's next calibration version. The online estimate that
+/api/v1/calibration/{project}/observations keeps updating continues from
+the refit.
+
+The CSV needs every required TBMParameters field, soil_type, tbm_type and
+the observed advance_rate (mm/min), oldest ring first.
+
+Examples:
+    python calibrate.py line-3 rings.csv
+    python calibrate.py line-3 rings.csv --forgetting 0.999 --dry-run
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to Python path
+app_dir = Path(__file__).parent
+sys.path.insert(0, str(app_dir))
+
+from app.core.config import settings
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.calibration import CalibrationStore, RecursiveCalibrator, read_observations
+
+def main(argv=None):
+    """Refit and publish a project's coefficients"""
+    parser = argparse.ArgumentParser(description="Calibrate coefficients to observed advance rates")
+    parser.add_argument("project", help="Project name")
+    parser.add_argument("records", help="CSV of observed rings, oldest first")
+    parser.add_argument("--directory", default=settings.CALIBRATION_DIR, help="Calibration store directory")
+    parser.add_argument("--forgetting", type=float, default=settings.CALIBRATION_FORGETTING,
+                        help="Weight decay per observation, 1 weighs all rings equally")
+    parser.add_argument("--prior-weight", type=float, default=settings.CALIBRATION_PRIOR_WEIGHT,
+                        help="Observations' worth of belief in the built-in coefficients")
+    parser.add_argument("--iterations", type=int, default=10, help="Maximum Gauss-Newton iterations")
+    parser.add_argument("--dry-run", action="store_true", help="Fit and report without publishing")
+    args = parser.parse_args(argv)
+
+    base = TBMAdvanceRateCalculator(settings.REGRESSION_MODEL_PATH)
+    try:
+        start = time.perf_counter()
+        with open(args.records, newline="") as stream:
+            columns, observed = read_observations(stream)
+        loaded = time.perf_counter()
+
+        store = CalibrationStore(args.directory)
+        if args.dry_run:
+            calibrator = RecursiveCalibrator(base, args.forgetting, args.prior_weight)
+            fit = calibrator.refit(columns, observed, args.iterations)
+        else:
+            with store.calibrator(args.project, base, args.forgetting, args.prior_weight) as calibrator:
+                fit = calibrator.refit(columns, observed, args.iterations)
+                published = store.publish(args.project, calibrator.coefficients({
+                    "source": "refit", "records": args.records, **fit
+                }))
+        fitted = time.perf_counter()
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    print(f"📐 Refit {len(observed)} observations in {fitted - loaded:.2f}s (read in {loaded - start:.2f}s)")
+    print(f"   RMSE {fit['rmse_before']} -> {fit['rmse_after']} mm/min")
+    for name, multiplier in calibrator.multipliers().items():
+        if abs(multiplier - 1) >= 1e-4:
+            print(f"   {name}: × {multiplier:.4f}")
+    if not args.dry_run:
+        print(f"✅ Published {args.project} version {published.version} to {args.directory}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
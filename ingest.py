@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Telemetry ingest for TBM Advance Rate Calculator
+
+Streams a TBM PLC telemetry log (CSV) through the calculator chunk by
+chunk and writes one NDJSON aggregate per ring or chainage bin.
+
+Example:
+    python ingest.py drive.csv --diameter 6.2 --tbm-type epb \\
+        --soil-type clay --depth 15 --bin-by chainage --bin-size 10
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add the app directory to Python path
+app_dir = Path(__file__).parent
+sys.path.insert(0, str(app_dir))
+
+from pydantic import ValidationError
+from app.core.config import settings
+from app.models.schemas import TelemetryContext, SoilType, TBMType
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.telemetry import TelemetryReader, TelemetryPipeline, BIN_MODES, TELEMETRY_FIELDS
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Predict per-ring advance rates from a TBM telemetry log")
+    parser.add_argument("log", help="CSV telemetry log ('-' for stdin)")
+    parser.add_argument("--output", "-o", help="NDJSON output file (default: stdout)")
+
+    context = parser.add_argument_group("machine and ground context")
+    context.add_argument("--diameter", type=float, required=True, help="TBM diameter in meters")
+    context.add_argument("--tbm-type", required=True, choices=[t.value for t in TBMType])
+    context.add_argument("--soil-type", required=True, choices=[s.value for s in SoilType])
+    context.add_argument("--depth", type=float, required=True, help="Depth below surface in meters")
+    context.add_argument("--ucs", type=float, help="Unconfined compressive strength in MPa")
+    context.add_argument("--rqd", type=float, help="Rock Quality Designation (%%)")
+    context.add_argument("--water-pressure", type=float, default=0, help="Water pressure in bar")
+    context.add_argument("--temperature", type=float, default=20, help="Ground temperature in Celsius")
+    context.add_argument("--power", type=float, help="Cutterhead power in kW, if not logged")
+    context.add_argument("--chamber-pressure", type=float, default=0, help="Chamber pressure in bar, if not logged")
+
+    pipeline = parser.add_argument_group("pipeline")
+    pipeline.add_argument("--bin-by", choices=BIN_MODES, default="ring")
+    pipeline.add_argument("--bin-size", type=float, default=1.0, help="Chainage bin width in meters")
+    pipeline.add_argument("--chunk-size", type=int, default=10000, help="Rows read per chunk")
+    pipeline.add_argument(
+        "--column", action="append", default=[], metavar="HEADER=FIELD",
+        help=f"Map a log header onto a field ({', '.join(TELEMETRY_FIELDS)}); repeatable"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run the telemetry ingest pipeline"""
+    args = parse_args(argv)
+
+    try:
+        column_map = dict(item.split("=", 1) for item in args.column)
+    except ValueError:
+        print("❌ --column expects HEADER=FIELD", file=sys.stderr)
+        return 2
+
+    try:
+        context = TelemetryContext(
+            tbm_diameter=args.diameter,
+            tbm_type=args.tbm_type,
+            soil_type=args.soil_type,
+            depth=args.depth,
+            ucs=args.ucs,
+            rqd=args.rqd,
+            water_pressure=args.water_pressure,
+            temperature=args.temperature,
+            cutterhead_power=args.power,
+            chamber_pressure=args.chamber_pressure
+        )
+    except ValidationError as e:
+        print(f"❌ Invalid context: {e}", file=sys.stderr)
+        return 2
+
+    source = sys.stdin if args.log == "-" else open(args.log, newline="", encoding="utf-8")
+    target = open(args.output, "w") if args.output else sys.stdout
+
+    try:
+        reader = TelemetryReader(source, column_map=column_map, chunk_size=args.chunk_size)
+        pipeline = TelemetryPipeline(
+            TBMAdvanceRateCalculator(settings.REGRESSION_MODEL_PATH), context, bin_by=args.bin_by, bin_size=args.bin_size
+        )
+        for aggregate in pipeline.process(reader):
+            target.write(json.dumps(aggregate) + "\n")
+    except ValueError as e:
+        print(f"❌ Telemetry error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+    print(f"✅ {json.dumps(pipeline.summary())}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,9 @@ from pathlib import Path
 app_dir = Path(__file__).parent
 sys.path.insert(0, str(app_dir))
 
+from app.core.config import settings
+from app.core.metrics import reset_directory
+
 def main():
     """Run the TBM calculator application"""
     
@@ -34,6 +37,9 @@ def main():
     print(f"🌐 Docs: http://{host}:{port}/docs")
     print(f"📖 ReDoc: http://{host}:{port}/redoc")
     
+    # Snapshots of a previous run's workers would be summed into /metrics
+    reset_directory(settings.METRICS_DIR)
+    
     try:
         uvicorn.run(
             "app.main:app",
@@ -120,7 +120,7 @@ run_tests() {
     fi
     
     # Install test dependencies
-    pip install pytest pytest-asyncio httpx pytest-cov
+    pip install -r requirements-dev.txt
     
     # Run tests
     pytest tests/ -v --cov=app
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import pytest
+
+# Keep the application's SQLite database out of the working tree
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='tbm-tests-')}/tbm_calculator.db")
+
+from app.services.calculator import TBMAdvanceRateCalculator
+
+@pytest.fixture
+def calculator():
+    """Fresh calculator instance"""
+    return TBMAdvanceRateCalculator()
+
+@pytest.fixture
+def sample_parameters():
+    """Typical soft ground metro tunnel parameters"""
+    return {
+        "tbm_diameter": 6.2,
+        "tbm_type": "epb",
+        "cutterhead_power": 2000,
+        "soil_type": "clay",
+        "thrust_force": 15000,
+        "cutterhead_speed": 2.5,
+        "depth": 15,
+        "water_pressure": 1.5,
+        "chamber_pressure": 1.2,
+        "temperature": 18
+    }
+
+@pytest.fixture
+def rock_parameters():
+    """Hard rock water tunnel parameters"""
+    return {
+        "tbm_diameter": 4.5,
+        "tbm_type": "open",
+        "cutterhead_power": 1500,
+        "soil_type": "rock_hard",
+        "ucs": 150,
+        "rqd": 85,
+        "thrust_force": 8000,
+        "cutterhead_speed": 3.5,
+        "depth": 80,
+        "water_pressure": 6.0,
+        "chamber_pressure": 0,
+        "temperature": 25
+    }
+
+@pytest.fixture
+def client():
+    """Test client for the FastAPI application"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,56 @@
+import json
+import pytest
+from app.core.config import settings
+
+def read_ndjson(response):
+    """Parse a newline-delimited JSON response body"""
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+def test_calculate_endpoint(client, sample_parameters):
+    """Test single calculation endpoint"""
+    response = client.post("/api/v1/calculate", json=sample_parameters)
+
+    assert response.status_code == 200
+    assert response.json()["advance_rate"] > 0
+
+def test_batch_endpoint_streams_results_in_order(client, sample_parameters, rock_parameters):
+    """Test batch endpoint returns one NDJSON line per input"""
+    items = [sample_parameters, rock_parameters] * 3
+    response = client.post("/api/v1/calculate/batch", json=items)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = read_ndjson(response)
+    assert [line["index"] for line in lines] == list(range(len(items)))
+
+    single = client.post("/api/v1/calculate", json=sample_parameters).json()
+    detailed = read_ndjson(client.post("/api/v1/calculate/batch?risk_detail=true", json=items))
+    assert detailed[0]["result"] == single
+    assert lines[0]["result"]["risk_factors"] == {
+        "code": single["risk_factors"]["code"],
+        "overall_risk_level": single["risk_factors"]["overall_risk_level"]
+    }
+
+def test_batch_endpoint_inline_validation_errors(client, sample_parameters, monkeypatch):
+    """Test invalid rows are reported inline without failing the batch"""
+    monkeypatch.setattr(settings, "BATCH_CHUNK_SIZE", 2)
+    items = [
+        sample_parameters,
+        {**sample_parameters, "tbm_diameter": 50},
+        "not an object",
+        sample_parameters
+    ]
+    lines = read_ndjson(client.post("/api/v1/calculate/batch", json=items))
+
+    assert [line["index"] for line in lines] == [0, 1, 2, 3]
+    assert "result" in lines[0] and "result" in lines[3]
+    assert lines[1]["errors"][0]["loc"] == ["tbm_diameter"]
+    assert "errors" in lines[2]
+
+def test_batch_endpoint_size_limit(client, sample_parameters, monkeypatch):
+    """Test oversized batches are rejected"""
+    monkeypatch.setattr(settings, "BATCH_MAX_ITEMS", 2)
+    response = client.post("/api/v1/calculate/batch", json=[sample_parameters] * 3)
+
+    assert response.status_code == 413
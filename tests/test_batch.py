@@ -0,0 +1,102 @@
+import pytest
+import random
+import numpy as np
+from app.services.calculator import TBMAdvanceRateCalculator, parameters_to_columns, SOIL_TYPES, TBM_TYPES
+from app.models.schemas import TBMParameters, SoilType, TBMType
+
+def random_parameters(count: int, seed: int = 42):
+    """Random valid parameter sets covering every soil and TBM type"""
+    rng = random.Random(seed)
+    params_list = []
+    for i in range(count):
+        soil_type = SOIL_TYPES[i % len(SOIL_TYPES)]
+        is_rock = 'rock' in soil_type
+        params_list.append(TBMParameters(
+            tbm_diameter=rng.uniform(1.0, 20.0),
+            tbm_type=TBM_TYPES[i % len(TBM_TYPES)],
+            cutterhead_power=rng.uniform(100, 10000),
+            soil_type=soil_type,
+            ucs=rng.choice([0.0, rng.uniform(1, 300)]) if is_rock else rng.choice([None, rng.uniform(0, 300)]),
+            rqd=rng.uniform(0, 100) if is_rock else rng.choice([None, rng.uniform(0, 100)]),
+            water_pressure=rng.uniform(0, 10),
+            thrust_force=rng.uniform(100, 50000),
+            cutterhead_speed=rng.uniform(0.1, 10.0),
+            chamber_pressure=rng.uniform(0, 10),
+            depth=rng.uniform(1, 200),
+            temperature=rng.uniform(-10, 60)
+        ))
+    return params_list
+
+def test_batch_matches_scalar_methods(calculator: TBMAdvanceRateCalculator):
+    """Test that every batch stage reproduces the scalar stage"""
+    params_list = random_parameters(400)
+    batch = calculator.calculate_batch(parameters_to_columns(params_list))
+
+    for i, params in enumerate(params_list):
+        rates = {
+            "empirical": calculator._empirical_method(params),
+            "theoretical": calculator._theoretical_method(params),
+            "regression": calculator._regression_method(params)
+        }
+        for method, rate in rates.items():
+            assert batch[method][i] == pytest.approx(rate, rel=1e-12)
+
+        weights = calculator._get_method_weights(params)
+        advance_rate = sum(rates[method] * weights[method] for method in rates)
+        assert batch["advance_rate"][i] == pytest.approx(advance_rate, rel=1e-12)
+        assert batch["confidence_score"][i] == pytest.approx(
+            calculator._calculate_confidence_score(params, rates), rel=1e-12
+        )
+        assert batch["specific_energy"][i] == pytest.approx(
+            calculator._calculate_specific_energy(params, advance_rate), rel=1e-12
+        )
+
+def test_calculate_many_matches_calculate_advance_rate(calculator: TBMAdvanceRateCalculator):
+    """Test that batch results equal scalar results field by field"""
+    params_list = random_parameters(200, seed=7)
+    results = calculator.calculate_many(params_list)
+
+    assert len(results) == len(params_list)
+    for params, result in zip(params_list, results):
+        assert result == calculator.calculate_advance_rate(params)
+
+def test_batch_accepts_strings_enums_and_indices(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test category columns given as strings, enum members or integer codes"""
+    columns = {field: [value] for field, value in sample_parameters.items()}
+    by_string = calculator.calculate_batch(columns)
+
+    columns["soil_type"] = [SoilType.CLAY]
+    columns["tbm_type"] = [TBMType.EPB]
+    by_enum = calculator.calculate_batch(columns)
+
+    columns["soil_type"] = np.array([SOIL_TYPES.index(SoilType.CLAY)])
+    columns["tbm_type"] = np.array([TBM_TYPES.index(TBMType.EPB)])
+    by_index = calculator.calculate_batch(columns)
+
+    for metric in ("advance_rate", "confidence_score"):
+        assert by_string[metric][0] == by_enum[metric][0] == by_index[metric][0]
+
+def test_batch_optional_columns_default(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test that omitted optional columns use the schema defaults"""
+    required = {k: [v] for k, v in sample_parameters.items() if k not in ("water_pressure", "chamber_pressure", "temperature")}
+    batch = calculator.calculate_batch(required)
+
+    params = TBMParameters(**{k: v[0] for k, v in required.items()})
+    assert batch["advance_rate"][0] == pytest.approx(calculator.calculate_advance_rate(params).advance_rate, abs=0.005)
+
+def test_batch_rejects_bad_columns(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test errors for missing columns, unknown categories and ragged lengths"""
+    columns = {field: [value] for field, value in sample_parameters.items()}
+
+    with pytest.raises(ValueError):
+        calculator.calculate_batch({k: v for k, v in columns.items() if k != "thrust_force"})
+
+    with pytest.raises(ValueError):
+        calculator.calculate_batch({**columns, "soil_type": ["lava"]})
+
+    with pytest.raises(ValueError):
+        calculator.calculate_batch({**columns, "depth": [15, 20]})
+
+def test_calculate_many_empty(calculator: TBMAdvanceRateCalculator):
+    """Test that an empty batch returns no results"""
+    assert calculator.calculate_many([]) == []
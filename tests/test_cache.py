@@ -0,0 +1,127 @@
+import pytest
+from app.services.cache import ResultCache
+from app.services.shared_cache import SharedResultStore
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.models.schemas import TBMParameters, SoilType
+from app.core.config import settings
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_cache_hit_returns_same_result(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test repeated parameters are served from the cache"""
+    cache = ResultCache(max_size=10)
+    params = TBMParameters(**sample_parameters)
+
+    first = cache.get_or_calculate(params, calculator)
+    second = cache.get_or_calculate(TBMParameters(**sample_parameters), calculator)
+
+    assert second is first
+    assert first == calculator.calculate_advance_rate(params)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_cache_lru_eviction(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test least recently used entries are evicted beyond max_size"""
+    cache = ResultCache(max_size=2)
+    params = [TBMParameters(**{**sample_parameters, "depth": depth}) for depth in (10, 20, 30)]
+
+    cache.get_or_calculate(params[0], calculator)
+    cache.get_or_calculate(params[1], calculator)
+    cache.get_or_calculate(params[0], calculator)  # refresh 10 m
+    cache.get_or_calculate(params[2], calculator)  # evicts 20 m
+
+    assert cache.evictions == 1
+    assert cache.get(cache.make_key(params[0])) is not None
+    assert cache.get(cache.make_key(params[1])) is None
+
+def test_cache_ttl_expiry(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test entries expire after the TTL"""
+    clock = FakeClock()
+    cache = ResultCache(max_size=10, ttl=60, clock=clock)
+    params = TBMParameters(**sample_parameters)
+
+    cache.get_or_calculate(params, calculator)
+    clock.now = 59
+    cache.get_or_calculate(params, calculator)
+    clock.now = 121
+    cache.get_or_calculate(params, calculator)
+
+    assert cache.hits == 1
+    assert cache.expirations == 1
+
+def test_cache_quantized_keys(sample_parameters):
+    """Test significant-digit quantization merges near-identical inputs"""
+    exact = ResultCache(significant_digits=0)
+    quantized = ResultCache(significant_digits=3)
+    a = TBMParameters(**sample_parameters)
+    b = TBMParameters(**{**sample_parameters, "thrust_force": 15004})
+
+    assert exact.make_key(a) != exact.make_key(b)
+    assert quantized.make_key(a) == quantized.make_key(b)
+
+def test_cache_invalidated_on_model_change(calculator: TBMAdvanceRateCalculator, sample_parameters, monkeypatch):
+    """Test coefficient or model version changes clear the cache"""
+    cache = ResultCache(max_size=10)
+    params = TBMParameters(**sample_parameters)
+    cache.get_or_calculate(params, calculator)
+
+    calculator.soil_coefficients[SoilType.CLAY] = {"k1": 0.9, "k2": 1.2, "resistance": 0.6}
+    changed = cache.get_or_calculate(params, calculator)
+    assert cache.invalidations == 1
+    assert changed == calculator.calculate_advance_rate(params)
+
+    monkeypatch.setattr(settings, "MODEL_VERSION", "test")
+    cache.get_or_calculate(params, calculator)
+    assert cache.invalidations == 2
+    assert cache.hits == 0
+
+def test_cache_stats_endpoint(client, sample_parameters):
+    """Test cache counters are exposed through the health router"""
+    client.post("/api/v1/calculate", json=sample_parameters)
+    client.post("/api/v1/calculate", json=sample_parameters)
+    stats = client.get("/api/v1/cache").json()["result_cache"]
+
+    assert stats["hits"] >= 1
+    assert {"misses", "evictions", "size", "hit_rate"} <= set(stats)
+
+def test_shared_store_serves_other_workers(calculator: TBMAdvanceRateCalculator, sample_parameters, tmp_path):
+    """Test a fresh worker cache is warmed from the shared store"""
+    path = tmp_path / "results.sqlite3"
+    params = TBMParameters(**sample_parameters)
+
+    worker_a = ResultCache(max_size=10, shared=SharedResultStore(str(path)))
+    expected = worker_a.get_or_calculate(params, calculator)
+
+    # A second worker (or a restarted one) with its own connection and an empty local cache
+    worker_b = ResultCache(max_size=10, shared=SharedResultStore(str(path)))
+    result = worker_b.get_or_calculate(params, TBMAdvanceRateCalculator())
+
+    assert result == expected
+    assert worker_b.shared.hits == 1
+    assert worker_b.misses == 1
+
+def test_shared_store_keyed_by_model(calculator: TBMAdvanceRateCalculator, sample_parameters, tmp_path, monkeypatch):
+    """Test results from another model version are not reused"""
+    store = SharedResultStore(str(tmp_path / "results.sqlite3"))
+    params = TBMParameters(**sample_parameters)
+    ResultCache(shared=store).get_or_calculate(params, calculator)
+
+    monkeypatch.setattr(settings, "MODEL_VERSION", "2.0")
+    ResultCache(shared=store).get_or_calculate(params, calculator)
+
+    assert store.hits == 0
+    assert store.stats()["entries"] == 2
+
+def test_shared_store_bounded(tmp_path):
+    """Test the shared store keeps only the newest entries"""
+    store = SharedResultStore(str(tmp_path / "results.sqlite3"), max_entries=5, evict_every=1)
+    for i in range(12):
+        store.put(bytes([i]), "{}")
+
+    assert store.stats()["entries"] == 5
+    assert store.get(bytes([0])) is None
+    assert store.get(bytes([11])) == "{}"
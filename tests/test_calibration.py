@@ -0,0 +1,173 @@
+import io
+import pytest
+import numpy as np
+from app.services.calculator import TBMAdvanceRateCalculator, SOIL_TYPES, TBM_TYPES
+from app.services.calibration import (RecursiveCalibrator, CalibrationStore, CALIBRATED_PARAMETERS,
+                                      read_observations, calibration_store)
+from app.models.schemas import TBMParameters, SoilType
+from app.routers import calculator as calculator_router
+import calibrate
+
+def drive_columns(rows: int, seed: int = 0):
+    """Batch columns of random rings over every soil and TBM type"""
+    rng = np.random.default_rng(seed)
+    soil = np.arange(rows) % len(SOIL_TYPES)
+    is_rock = np.isin(soil, [SOIL_TYPES.index(s) for s in SOIL_TYPES if 'rock' in s])
+    return {
+        "tbm_diameter": rng.uniform(3, 12, rows),
+        "tbm_type": rng.integers(0, len(TBM_TYPES), rows),
+        "cutterhead_power": rng.uniform(1000, 8000, rows),
+        "soil_type": soil,
+        "ucs": np.where(is_rock, rng.uniform(20, 200, rows), np.nan),
+        "rqd": np.where(is_rock, rng.uniform(30, 100, rows), np.nan),
+        "water_pressure": rng.uniform(0, 5, rows),
+        "thrust_force": rng.uniform(5000, 40000, rows),
+        "cutterhead_speed": rng.uniform(1, 5, rows),
+        "chamber_pressure": rng.uniform(0, 3, rows),
+        "depth": rng.uniform(5, 100, rows),
+        "temperature": rng.uniform(10, 30, rows)
+    }
+
+def true_calculator(calculator: TBMAdvanceRateCalculator) -> TBMAdvanceRateCalculator:
+    """Calculator with the ground 30% more resistant than the built-in tables"""
+    return calculator.with_coefficients(
+        {soil: {**coeffs, "resistance": coeffs["resistance"] * 1.3} for soil, coeffs in calculator.soil_coefficients.items()},
+        calculator.tbm_efficiency
+    )
+
+def observed_rates(calculator: TBMAdvanceRateCalculator, columns, seed: int = 0):
+    rates = true_calculator(calculator).calculate_batch(columns)["advance_rate"]
+    return rates * np.random.default_rng(seed).normal(1, 0.01, len(rates))
+
+def test_with_coefficients_leaves_original(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test a calibrated copy uses its own tables and the original keeps its own"""
+    params = TBMParameters(**sample_parameters)
+    original = calculator.calculate_advance_rate(params).advance_rate
+    calibrated = true_calculator(calculator)
+
+    assert calibrated.calculate_advance_rate(params).advance_rate < original
+    assert calculator.calculate_advance_rate(params).advance_rate == original
+    assert calibrated.regression is calculator.regression
+
+def test_online_update_matches_refit(calculator: TBMAdvanceRateCalculator):
+    """Test recursive updates in chunks approach the batch refit of the same observations"""
+    columns = drive_columns(1600)
+    observed = observed_rates(calculator, columns)
+
+    online = RecursiveCalibrator(calculator)
+    for start in range(0, 1600, 400):
+        chunk = {name: values[start:start + 400] for name, values in columns.items()}
+        fit = online.update(chunk, observed[start:start + 400])
+        assert fit["rmse_after"] < fit["rmse_before"]
+    refit = RecursiveCalibrator(calculator)
+    fit = refit.refit(columns, observed)
+
+    assert online.samples == refit.samples == 1600
+    assert fit["rmse_after"] < fit["rmse_before"] / 2
+    resistance = slice(len(SOIL_TYPES), 2 * len(SOIL_TYPES))
+    assert np.median(refit.theta[resistance]) == pytest.approx(1.3, abs=0.1)
+    assert online.theta[resistance] == pytest.approx(refit.theta[resistance], abs=0.1)
+
+def test_prior_keeps_unobserved_coefficients(calculator: TBMAdvanceRateCalculator):
+    """Test coefficients of soil types without observations stay at the built-in values"""
+    columns = drive_columns(200)
+    columns["soil_type"] = np.full(200, SOIL_TYPES.index(SoilType.CLAY))
+    calibrator = RecursiveCalibrator(calculator)
+    calibrator.update(columns, observed_rates(calculator, columns))
+    multipliers = calibrator.multipliers()
+
+    assert multipliers["resistance.clay"] != 1.0
+    assert multipliers["resistance.sand"] == 1.0
+    assert multipliers["k1.rock_hard"] == 1.0
+
+def test_state_and_versions_round_trip(calculator: TBMAdvanceRateCalculator, tmp_path):
+    """Test the online state persists and published versions are numbered and immutable"""
+    store = CalibrationStore(str(tmp_path), check_interval=0)
+    columns = drive_columns(100)
+    with store.calibrator("line-3", calculator) as calibrator:
+        calibrator.update(columns, observed_rates(calculator, columns))
+        first = store.publish("line-3", calibrator.coefficients())
+    with store.calibrator("line-3", calculator) as calibrator:
+        assert calibrator.samples == 100
+        second = store.publish("line-3", calibrator.coefficients({"source": "test"}))
+
+    assert (first.version, second.version) == (1, 2)
+    assert store.versions("line-3") == [1, 2]
+    assert CalibrationStore(str(tmp_path)).load("line-3").as_dict() == second.as_dict()
+    assert store.load("line-3", 1).soil_coefficients == first.soil_coefficients
+    assert store.load("line-3", 3) is None
+    assert store.load("other") is None
+    with pytest.raises(ValueError):
+        store.versions("../escape")
+
+def test_read_observations(calculator: TBMAdvanceRateCalculator):
+    """Test drive records become batch columns, skipping unusable rows"""
+    text = (
+        "tbm_diameter,tbm_type,cutterhead_power,soil_type,thrust_force,cutterhead_speed,depth,ucs,advance_rate\n"
+        "6.2,epb,2000,clay,15000,2.5,15,,21.5\n"
+        "4.5,open,1500,rock_hard,8000,3.5,80,150,4.2\n"
+        "4.5,open,1500,basalt,8000,3.5,80,150,4.2\n"
+    )
+    columns, observed = read_observations(io.StringIO(text))
+
+    assert observed.tolist() == [21.5, 4.2]
+    assert columns["soil_type"].tolist() == [SOIL_TYPES.index(SoilType.CLAY), SOIL_TYPES.index(SoilType.ROCK_HARD)]
+    assert np.isnan(columns["ucs"][0]) and columns["ucs"][1] == 150
+    assert calculator.calculate_batch(columns)["advance_rate"].shape == (2,)
+    with pytest.raises(ValueError):
+        read_observations(io.StringIO("tbm_diameter,advance_rate\n6.2,21.5\n"))
+
+def test_refit_script_publishes(calculator: TBMAdvanceRateCalculator, tmp_path, capsys):
+    """Test calibrate.py refits a CSV and publishes the first version"""
+    columns = drive_columns(300)
+    observed = observed_rates(calculator, columns)
+    names = [name for name in columns if name not in ("soil_type", "tbm_type")]
+    lines = [",".join(names + ["soil_type", "tbm_type", "advance_rate"])]
+    for i in range(300):
+        values = ["" if np.isnan(columns[name][i]) else str(columns[name][i]) for name in names]
+        soil, tbm = SOIL_TYPES[columns["soil_type"][i]].value, TBM_TYPES[columns["tbm_type"][i]].value
+        lines.append(",".join(values + [soil, tbm, str(observed[i])]))
+    records = tmp_path / "rings.csv"
+    records.write_text("\n".join(lines))
+
+    assert calibrate.main(["line-3", str(records), "--directory", str(tmp_path / "store")]) == 0
+    assert "Published line-3 version 1" in capsys.readouterr().out
+    published = CalibrationStore(str(tmp_path / "store")).load("line-3")
+    assert published.metadata["source"] == "refit"
+    assert published.metadata["rmse_after"] < published.metadata["rmse_before"]
+
+def test_calibration_endpoints(client, sample_parameters, tmp_path, monkeypatch):
+    """Test observations update a project, publish a version and change its predictions"""
+    monkeypatch.setattr(calibration_store, "directory", tmp_path)
+    monkeypatch.setattr(calibration_store, "_sets", {})
+    monkeypatch.setattr(calibration_store, "_latest", {})
+    monkeypatch.setattr(calculator_router, "_calibrated_calculators", {})
+    baseline = client.post("/api/v1/calculate", json=sample_parameters).json()["advance_rate"]
+
+    assert client.get("/api/v1/calibration/line-3").status_code == 404
+    assert client.post("/api/v1/calculate?project=line-3", json=sample_parameters).status_code == 404
+    assert client.get("/api/v1/calibration/bad%20name").status_code == 400
+
+    observations = [
+        {**sample_parameters, "thrust_force": thrust, "observed_advance_rate": baseline * 0.8}
+        for thrust in (14000, 15000, 16000)
+    ]
+    response = client.post("/api/v1/calibration/line-3/observations", json={"observations": observations, "publish": True})
+    assert response.status_code == 200
+    status = response.json()
+    assert status["samples"] == 3
+    assert status["published_version"] == 1
+    assert status["rmse_after"] < status["rmse_before"]
+    assert client.get("/api/v1/calibration/line-3").json()["versions"] == [1]
+
+    calibrated = client.post("/api/v1/calculate?project=line-3", json=sample_parameters).json()["advance_rate"]
+    assert calculator_router.calibrated_calculator("line-3")[1] == 1
+    assert calibrated < baseline
+    line = client.post("/api/v1/calculate/batch?project=line-3&calibration_version=1", json=[sample_parameters]).json()
+    assert line["result"]["advance_rate"] == calibrated
+
+    published = client.post("/api/v1/calibration/line-3/versions").json()
+    assert published["version"] == 2
+    assert client.get("/api/v1/calibration/line-3/versions/2").json()["samples"] == 3
+    assert client.get("/api/v1/calibration/line-3/versions/9").status_code == 404
+    assert len(published["multipliers"]) == len(CALIBRATED_PARAMETERS)
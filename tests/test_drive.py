@@ -0,0 +1,77 @@
+import pytest
+from pydantic import ValidationError
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.drive import DriveSimulation
+from app.models.schemas import DriveRequest, TBMParameters
+
+MACHINE = {
+    "tbm_diameter": 6.2,
+    "tbm_type": "epb",
+    "cutterhead_power": 2000,
+    "thrust_force": 15000,
+    "cutterhead_speed": 2.5
+}
+
+def drive_request(**overrides):
+    request = {
+        "machine": MACHINE,
+        "segments": [
+            {"start_chainage": 0, "end_chainage": 300, "soil_type": "clay", "depth": 15},
+            {"start_chainage": 300, "end_chainage": 450, "soil_type": "rock_soft", "ucs": 45, "rqd": 65, "depth": 25}
+        ]
+    }
+    request.update(overrides)
+    return DriveRequest(**request)
+
+def test_ring_times_match_calculator(calculator: TBMAdvanceRateCalculator):
+    """Test each segment's advance rate equals a scalar calculation for its ground"""
+    simulation = DriveSimulation.simulate(calculator, drive_request())
+    clay = calculator.calculate_advance_rate(TBMParameters(**MACHINE, soil_type="clay", depth=15))
+
+    summaries = simulation.segment_summaries()
+    assert summaries[0]["rings"] == 200
+    assert summaries[1]["rings"] == 100
+    assert summaries[0]["advance_rate"] == pytest.approx(clay.advance_rate, abs=0.01)
+    assert summaries[0]["hours"] == pytest.approx(300 * 1000 / clay.advance_rate / 60, rel=1e-3)
+
+def test_range_query_uses_prefix_sums(calculator: TBMAdvanceRateCalculator):
+    """Test range times are differences of the cumulative curve and add up"""
+    simulation = DriveSimulation.simulate(calculator, drive_request(ring_build_time=30))
+    total = simulation.cumulative[-1] / 60
+
+    assert simulation.hours_between(0, 450) == pytest.approx(total)
+    assert simulation.hours_between(0, 200) + simulation.hours_between(200, 450) == pytest.approx(total)
+    # 200 rings of boring plus 30 minutes of ring build each
+    assert simulation.hours_between(0, 300) == pytest.approx(
+        simulation.segment_summaries()[0]["hours"], abs=0.01
+    )
+
+def test_partial_last_ring(calculator: TBMAdvanceRateCalculator):
+    """Test an alignment that is not a whole number of rings ends with a short ring"""
+    request = drive_request(segments=[{"start_chainage": 0, "end_chainage": 10, "soil_type": "sand", "depth": 10}])
+    simulation = DriveSimulation.simulate(calculator, request)
+
+    assert len(simulation.ring_minutes) == 7
+    assert simulation.boundaries[-1] == 10
+
+def test_segments_must_be_contiguous():
+    """Test gaps between segments and rock without UCS are rejected"""
+    with pytest.raises(ValidationError):
+        drive_request(segments=[
+            {"start_chainage": 0, "end_chainage": 100, "soil_type": "clay", "depth": 15},
+            {"start_chainage": 120, "end_chainage": 200, "soil_type": "clay", "depth": 15}
+        ])
+    with pytest.raises(ValidationError):
+        drive_request(segments=[{"start_chainage": 0, "end_chainage": 100, "soil_type": "rock_hard", "depth": 15}])
+
+def test_drive_endpoint(client):
+    """Test the drive simulation endpoint"""
+    request = drive_request(profile_points=5, ranges=[{"start": 100, "end": 350}])
+    response = client.post("/api/v1/drive/simulate", json=request.model_dump(mode="json"))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["rings"] == 300
+    assert len(body["profile"]) == 5
+    assert body["profile"][-1]["hours"] == body["total_hours"]
+    assert 0 < body["ranges"][0]["hours"] < body["total_hours"]
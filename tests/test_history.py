@@ -0,0 +1,128 @@
+import random
+import sqlite3
+import time
+from datetime import datetime, timezone
+import pytest
+from app.models.schemas import TBMParameters
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.history import HistoryStore, HistoryRecorder
+
+def synthetic_rows(count: int, start: float, span: float, rng: random.Random):
+    """Rows in HistoryStore INSERT column order at random times within the span"""
+    rows = []
+    for _ in range(count):
+        rate = round(rng.uniform(5, 60), 3)
+        rows.append((
+            start + rng.uniform(0, span), rng.choice(["clay", "sand", "rock_hard"]), rng.choice(["epb", "slurry"]),
+            "1.0", rng.choice([None, "line-3"]), None, "calculate", "{}", rate, rate * 1.2, rate / 2, 10.0,
+            rng.uniform(0.5, 1), "low"
+        ))
+    return rows
+
+def test_recorder_writes_behind(calculator: TBMAdvanceRateCalculator, sample_parameters, tmp_path):
+    """Test recorded calculations are written by flush with their parameters and results"""
+    store = HistoryStore(str(tmp_path / "history.db"))
+    recorder = HistoryRecorder(store, flush_size=2)
+    params = TBMParameters(**sample_parameters)
+    result = calculator.calculate_advance_rate(params)
+    for _ in range(3):
+        recorder.record(params, result, calculator.regression.current(), project="line-3", calibration_version=2)
+
+    assert store.page({})[0] == []
+    assert recorder.flush() == 2
+    recorder.stop()
+    entries, cursor = store.page({})
+    assert len(entries) == 3 and cursor is None
+    assert entries[0]["parameters"] == params.model_dump(mode="json")
+    assert entries[0]["advance_rate"] == result.advance_rate
+    assert entries[0]["project"] == "line-3" and entries[0]["calibration_version"] == 2
+    assert recorder.stats()["written"] == 3
+
+def test_full_buffer_drops_oldest(calculator: TBMAdvanceRateCalculator, sample_parameters, tmp_path):
+    """Test a full buffer drops and counts the oldest calculations instead of blocking"""
+    params = TBMParameters(**sample_parameters)
+    result = calculator.calculate_advance_rate(params)
+    model = calculator.regression.current()
+
+    class BrokenStore(HistoryStore):
+        def insert_many(self, rows):
+            # Calculations recorded while the failing write is in progress
+            for project in ("new-1", "new-2"):
+                recorder.record(params, result, model, project=project)
+            raise sqlite3.OperationalError("database is locked")
+
+    recorder = HistoryRecorder(BrokenStore(str(tmp_path / "history.db")), buffer_size=3, flush_size=2)
+    for project in ("old-1", "old-2", "old-3", "old-4", "old-5"):
+        recorder.record(params, result, model, project=project)
+    assert recorder.stats()["dropped"] == 2
+
+    assert recorder.flush() == 0
+    stats = recorder.stats()
+    assert [entry[5] for entry in recorder._buffer] == ["old-5", "new-1", "new-2"]
+    assert stats["buffered"] == 3 and stats["dropped"] == 4 and stats["errors"] == 1
+
+def test_keyset_pages_cover_every_row(tmp_path):
+    """Test following the cursor returns every matching row once, newest first"""
+    store = HistoryStore(str(tmp_path / "history.db"))
+    rows = synthetic_rows(500, 1.7e9, 86400, random.Random(0))
+    # Identical timestamps must not be skipped or repeated across pages
+    rows += [rows[0]] * 5
+    store.insert_many(rows)
+
+    seen, cursor = [], None
+    while True:
+        entries, cursor = store.page({"soil_type": "clay"}, limit=37, cursor=cursor)
+        seen.extend(entries)
+        if cursor is None:
+            break
+    assert len({entry["id"] for entry in seen}) == len(seen) == sum(row[1] == "clay" for row in rows)
+    assert [entry["created_at"] for entry in seen] == sorted((row[0] for row in rows if row[1] == "clay"), reverse=True)
+
+def test_aggregates_match_raw_rows(tmp_path):
+    """Test rollup-based aggregates equal aggregates over the raw rows for unaligned ranges"""
+    store = HistoryStore(str(tmp_path / "history.db"))
+    rng = random.Random(1)
+    rows = synthetic_rows(3000, 1.7e9, 5 * 86400, rng)
+    for start in range(0, len(rows), 400):
+        store.insert_many(rows[start:start + 400])
+
+    for _ in range(20):
+        start = 1.7e9 + rng.uniform(-3600, 5 * 86400)
+        end = start + rng.uniform(0, 2 * 86400)
+        filters = {"start": start, "end": end, "soil_type": rng.choice([None, "clay"])}
+        groups, _ = store.aggregate(filters, ["day", "project"], limit=1000)
+        expected = {}
+        for row in rows:
+            if start <= row[0] < end and filters["soil_type"] in (None, row[1]):
+                expected.setdefault((int(row[0] // 86400) * 86400, row[4]), []).append(row[8])
+        assert len(groups) == len(expected)
+        for group in groups:
+            day = time.mktime(time.strptime(group["key"]["day"][:10], "%Y-%m-%d")) - time.timezone
+            rates = expected[(int(day), group["key"]["project"])]
+            assert group["count"] == len(rates)
+            assert group["advance_rate_mean"] == pytest.approx(sum(rates) / len(rates), abs=1e-3)
+            assert group["advance_rate_min"] == min(rates) and group["advance_rate_max"] == max(rates)
+
+    page, next_offset = store.aggregate({}, ["hour"], limit=10)
+    assert len(page) == 10 and next_offset == 10
+    assert store.aggregate({}, ["hour"], limit=10, offset=next_offset)[0][0]["key"]["hour"] > page[-1]["key"]["hour"]
+
+def test_history_endpoints(client, sample_parameters):
+    """Test calculations are recorded and can be listed and aggregated"""
+    from app.services.history import history_recorder
+    history_recorder.flush()
+    since = datetime.now(timezone.utc)
+    client.post("/api/v1/calculate", json=sample_parameters)
+    client.post("/api/v1/calculate/batch", json=[sample_parameters, {**sample_parameters, "soil_type": "sand"}])
+    history_recorder.flush()
+
+    params = {"start": since.isoformat()}
+    first = client.get("/api/v1/history", params={**params, "limit": 2}).json()
+    assert [item["source"] for item in first["items"]] == ["batch", "batch"]
+    rest = client.get("/api/v1/history", params={**params, "cursor": first["next_cursor"]}).json()
+    assert [item["source"] for item in rest["items"]] == ["calculate"] and rest["next_cursor"] is None
+
+    groups = client.get("/api/v1/history/aggregate", params={**params, "group_by": "soil_type"}).json()["groups"]
+    assert [(group["key"]["soil_type"], group["count"]) for group in groups] == [("clay", 2), ("sand", 1)]
+    assert client.get("/api/v1/history", params={"cursor": "bad"}).status_code == 400
+    assert client.get("/api/v1/history/stats").json()["dropped"] == 0
@@ -0,0 +1,112 @@
+import json
+import time
+import pytest
+from app.services.jobs import JobStore, JobQueue, JobContext, JobQueueFull, JobCancelled
+
+def wait_for(store: JobStore, job_id: str, timeout: float = 10.0):
+    """Poll until the job leaves the queued and running states"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+def echo_runner(payload, context):
+    for completed in range(1, payload["steps"] + 1):
+        context.progress(completed, payload["steps"])
+    return json.dumps(payload), "application/json"
+
+def test_queued_jobs_survive_restart(tmp_path):
+    """Test jobs queued while no worker runs are executed by the next start"""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job = JobQueue(store, {"echo": echo_runner}).submit("echo", {"steps": 3}, 3)
+    assert job["status"] == "queued" and job["total"] == 3
+
+    queue = JobQueue(JobStore(store.path), {"echo": echo_runner}, poll_interval=0.05)
+    queue.start()
+    try:
+        finished = wait_for(store, job["id"])
+    finally:
+        queue.stop()
+    assert finished["status"] == "succeeded" and finished["completed"] == 3 and finished["attempts"] == 1
+    assert store.result(job["id"]) == ('{"steps": 3}', "application/json")
+
+def test_expired_lease_is_claimed_again(tmp_path):
+    """Test a running job whose worker stopped heartbeating is resumed, up to the attempt limit"""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.submit("echo", {"steps": 1}, 1, max_queued=10)["id"]
+    assert store.claim("dead-worker", lease_timeout=60, max_attempts=2)["id"] == job_id
+    assert store.claim("other-worker", lease_timeout=60, max_attempts=2) is None
+
+    assert store.claim("other-worker", lease_timeout=-1, max_attempts=2)["id"] == job_id
+    assert not store.progress(job_id, "dead-worker", 1, 1)
+    assert store.get(job_id)["attempts"] == 2
+
+    assert store.claim("third-worker", lease_timeout=-1, max_attempts=2) is None
+    failed = store.get(job_id)
+    assert failed["status"] == "failed" and "every attempt" in failed["error"]
+
+def test_queue_bound_and_cancellation(tmp_path):
+    """Test submissions beyond the bound are refused and cancelled jobs stop"""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    first = store.submit("echo", {"steps": 1}, 1, max_queued=1)
+    with pytest.raises(JobQueueFull):
+        store.submit("echo", {"steps": 1}, 1, max_queued=1)
+
+    queue = JobQueue(store, {"echo": echo_runner})
+    store.claim(queue.worker, lease_timeout=60, max_attempts=3)
+    assert store.cancel(first["id"])["status"] == "cancelled"
+    with pytest.raises(JobCancelled):
+        echo_runner({"steps": 2}, JobContext(queue, first["id"]))
+    assert not store.finish(first["id"], queue.worker, "{}", "application/json")
+
+def test_stop_requeues_running_jobs(tmp_path):
+    """Test stopping a worker puts its running jobs back without counting the attempt"""
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.submit("echo", {"steps": 1}, 1, max_queued=10)["id"]
+    store.claim("worker-a", lease_timeout=60, max_attempts=3)
+    assert store.release("worker-a") == 1
+    job = store.get(job_id)
+    assert job["status"] == "queued" and job["attempts"] == 0
+
+def test_job_endpoints(client, sample_parameters):
+    """Test batch, Monte Carlo and drive jobs return what the synchronous endpoints do"""
+    from app.routers import jobs
+    items = [sample_parameters, {**sample_parameters, "cutterhead_speed": -1}]
+    monte_carlo = {
+        "parameters": sample_parameters, "samples": 2000, "seed": 7,
+        "distributions": {"thrust_force": {"kind": "normal", "mean": 15000, "std": 1500}}
+    }
+    drive = {
+        "machine": {k: sample_parameters[k] for k in
+                    ("tbm_diameter", "tbm_type", "cutterhead_power", "thrust_force", "cutterhead_speed")},
+        "segments": [{"start_chainage": 0, "end_chainage": 300, "soil_type": "clay", "depth": 15}]
+    }
+    submissions = [
+        ("/api/v1/jobs/batch", items, client.post("/api/v1/calculate/batch", json=items).text),
+        ("/api/v1/jobs/montecarlo", monte_carlo, client.post("/api/v1/montecarlo", json=monte_carlo).json()),
+        ("/api/v1/jobs/drive", drive, client.post("/api/v1/drive/simulate", json=drive).json())
+    ]
+    for path, body, expected in submissions:
+        response = client.post(path, json=body)
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+
+        events = [json.loads(line) for line in client.get(f"/api/v1/jobs/{job_id}/events").text.splitlines()]
+        assert events[-1]["status"] == "succeeded"
+        assert events[-1]["completed"] == events[-1]["total"]
+        result = client.get(f"/api/v1/jobs/{job_id}/result")
+        assert (result.text if path.endswith("batch") else result.json()) == expected
+        assert client.delete(f"/api/v1/jobs/{job_id}").json()["status"] == "succeeded"
+
+    assert client.get("/api/v1/jobs/unknown").status_code == 404
+    assert client.post("/api/v1/jobs/batch?project=unknown-project", json=items).status_code == 404
+    jobs.job_queue.stop()
+    try:
+        job_id = client.post("/api/v1/jobs/drive", json=drive).json()["id"]
+        assert client.get(f"/api/v1/jobs/{job_id}/result").status_code == 409
+        assert client.delete(f"/api/v1/jobs/{job_id}").json()["status"] == "cancelled"
+    finally:
+        jobs.job_queue.start()
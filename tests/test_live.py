@@ -0,0 +1,87 @@
+import random
+import pytest
+from pydantic import ValidationError
+from starlette.websockets import WebSocketDisconnect
+from app.models.schemas import TBMParameters
+from app.services.calculator import TBMAdvanceRateCalculator, result_values
+from app.services.live import LiveSession
+
+def test_incremental_updates_match_full_calculation(calculator: TBMAdvanceRateCalculator, sample_parameters,
+                                                    rock_parameters):
+    """Test a session's result equals a full calculation after every single-field change"""
+    rng = random.Random(0)
+    changes = [
+        ("cutterhead_speed", lambda: rng.uniform(0.5, 6)), ("thrust_force", lambda: rng.uniform(2000, 40000)),
+        ("depth", lambda: rng.uniform(5, 120)), ("water_pressure", lambda: rng.uniform(0, 8)),
+        ("ucs", lambda: rng.uniform(20, 250)), ("rqd", lambda: rng.uniform(10, 100)),
+        ("tbm_diameter", lambda: rng.uniform(2, 14)), ("temperature", lambda: rng.uniform(0, 40))
+    ]
+    for base in (sample_parameters, rock_parameters):
+        session = LiveSession(calculator)
+        session.update(base)
+        values = dict(base)
+        for _ in range(200):
+            name, draw = rng.choice(changes)
+            values[name] = round(draw(), 3)
+            session.update({name: values[name]})
+            expected = result_values(calculator.calculate_record(TBMParameters(**values), risk_factors=True))
+            assert session.result == expected
+
+def test_only_dependent_stages_rerun(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test an RPM change skips the empirical method and a temperature change reruns nothing"""
+    session = LiveSession(calculator)
+    first = session.update(sample_parameters)
+    assert first["recomputed"] == ["empirical", "theoretical", "regression", "method_weights", "risk_factors"]
+    assert first["result"] == session.result
+
+    speed = session.update({"cutterhead_speed": 3.0})
+    assert speed["changed"] == ["cutterhead_speed"]
+    assert "empirical" not in speed["recomputed"] and "risk_factors" not in speed["recomputed"]
+    assert "advance_rate" in speed["result"] and "risk_factors" not in speed["result"]
+
+    assert session.update({"temperature": 25}) == {"changed": ["temperature"], "recomputed": [], "result": {}}
+    assert session.update({"cutterhead_speed": 3.0})["changed"] == []
+
+def test_invalid_update_keeps_state(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test rejected updates leave the session as it was"""
+    session = LiveSession(calculator)
+    with pytest.raises(ValidationError):
+        session.update({"cutterhead_speed": 2.5})
+    session.update(sample_parameters)
+    result = session.result
+    with pytest.raises(ValidationError):
+        session.update({"cutterhead_speed": -1})
+    assert session.result == result and session.updates == 1
+    assert session.params.cutterhead_speed == 2.5
+
+def test_risk_rule_inputs(calculator: TBMAdvanceRateCalculator):
+    """Test the risk stage depends on its rules' fields, derived quantities' inputs included"""
+    assert calculator.risk_rules.inputs == {
+        "water_pressure", "cutterhead_power", "tbm_diameter", "depth", "ucs", "soil_type"
+    }
+
+def test_live_websocket(client, sample_parameters):
+    """Test the WebSocket streams full then partial results and reports invalid updates"""
+    expected = client.post("/api/v1/calculate", json=sample_parameters).json()
+    with client.websocket_connect("/api/v1/live/ws") as websocket:
+        websocket.send_json(sample_parameters)
+        first = websocket.receive_json()
+        assert first["seq"] == 1 and first["result"] == expected
+
+        websocket.send_json({"cutterhead_speed": 3.0})
+        second = websocket.receive_json()
+        assert second["seq"] == 2 and second["changed"] == ["cutterhead_speed"]
+        assert second["result"]["advance_rate"] == client.post(
+            "/api/v1/calculate", json={**sample_parameters, "cutterhead_speed": 3.0}
+        ).json()["advance_rate"]
+
+        websocket.send_json({"cutterhead_speed": -1})
+        assert websocket.receive_json()["errors"][0]["loc"] == ["cutterhead_speed"]
+        websocket.send_text("not json")
+        assert "Invalid update" in websocket.receive_json()["errors"][0]["msg"]
+
+    with pytest.raises(WebSocketDisconnect) as excinfo:
+        with client.websocket_connect("/api/v1/live/ws?project=unknown-project") as websocket:
+            websocket.receive_json()
+    assert excinfo.value.code == 1008
+    assert client.get("/api/v1/live").json()["status"] == "alive"
@@ -0,0 +1,59 @@
+import json
+import logging
+import pytest
+from app.core.logging_config import JsonFormatter, SamplingFilter, BoundedQueueHandler, parse_sampling_rates
+
+def make_record(name="app.test", level=logging.INFO, msg="Advance rate %s mm/min", args=(21.34,), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_merges_args_and_extra_fields():
+    """Test JSON records carry the lazily formatted message and extra fields"""
+    entry = json.loads(JsonFormatter().format(make_record(request_id="abc")))
+
+    assert entry["message"] == "Advance rate 21.34 mm/min"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.test"
+    assert entry["request_id"] == "abc"
+    assert "args" not in entry
+
+def test_sampling_keeps_exact_fraction_per_logger():
+    """Test sampling rates apply per logger prefix, most specific first"""
+    sampling = SamplingFilter({"app": 0.5, "app.services.calculator": 0.1})
+
+    kept = sum(sampling.filter(make_record("app.services.calculator")) for _ in range(100))
+    assert kept == 10
+    assert sum(sampling.filter(make_record("app.routers")) for _ in range(100)) == 50
+    assert all(sampling.filter(make_record("uvicorn")) for _ in range(10))
+    assert sampling.filter(make_record("app.services.calculator"))  # first of the next ten
+    assert sampling.sampled_out == 140
+
+def test_warnings_are_never_sampled():
+    """Test WARNING and above always pass the sampling filter"""
+    sampling = SamplingFilter({"app": 0.0})
+
+    assert not sampling.filter(make_record("app"))
+    assert sampling.filter(make_record("app", level=logging.WARNING))
+    assert sampling.filter(make_record("app", level=logging.ERROR))
+
+def test_full_queue_drops_instead_of_blocking():
+    """Test records beyond the queue capacity are dropped and counted"""
+    drops = []
+    handler = BoundedQueueHandler(capacity=3, on_drop=lambda: drops.append(1))
+    for _ in range(5):
+        handler.handle(make_record())
+
+    assert handler.stats() == {"queued": 3, "capacity": 3, "dropped": 2}
+    assert len(drops) == 2
+    # Queued records are not formatted on the caller's thread
+    assert handler.queue.get_nowait().args == (21.34,)
+
+def test_parse_sampling_rates():
+    """Test LOG_SAMPLING parsing"""
+    assert parse_sampling_rates("app.routers=0.5, app.services.calculator=0.1,") == {
+        "app.routers": 0.5, "app.services.calculator": 0.1
+    }
+    assert parse_sampling_rates("") == {}
+    with pytest.raises(ValueError):
+        parse_sampling_rates("app.routers")
@@ -0,0 +1,115 @@
+import json
+import pickle
+from pathlib import Path
+from app.core.metrics import (MetricsRegistry, MetricsExporter, PENDING_LIMIT, STAGE_BUCKETS,
+                              instrument_methods, merge_snapshots, render)
+from app.models.records import ParameterRecord
+from app.services.calculator import STAGE_METHODS, TBMAdvanceRateCalculator
+
+def test_histogram_buckets_are_upper_inclusive():
+    """Test observations land in the first bucket whose bound they do not exceed"""
+    histogram = MetricsRegistry().histogram("test_seconds", "Test", buckets=(1.0, 2.0))
+    series = histogram.labels()
+    for value in (0.5, 1.0, 1.5, 3.0):
+        series.observe(value)
+
+    counts, total = series.snapshot()
+    assert counts == [2, 1, 1]
+    assert total == 6.0
+
+    text = render(merge_snapshots([{"test_seconds": histogram.collect()}]))
+    assert 'test_seconds_bucket{le="1"} 2' in text
+    assert 'test_seconds_bucket{le="2"} 3' in text
+    assert 'test_seconds_bucket{le="+Inf"} 4' in text
+    assert "test_seconds_count 4" in text
+    assert "# TYPE test_seconds histogram" in text
+
+def test_pending_observations_are_folded():
+    """Test buffered observations are bucketed once the buffer fills"""
+    series = MetricsRegistry().histogram("test_seconds", "Test", buckets=(1.0,)).labels()
+    for _ in range(PENDING_LIMIT + 1):
+        series.observe(0.5)
+
+    assert len(series._pending) == 1
+    assert series.snapshot()[0] == [PENDING_LIMIT + 1, 0]
+
+def test_snapshots_from_workers_are_summed(tmp_path):
+    """Test a scrape adds other workers' snapshot files to live values"""
+    def registry_with(count):
+        registry = MetricsRegistry()
+        counter = registry.counter("test_requests_total", "Test", ("route",))
+        histogram = registry.histogram("test_seconds", "Test", ("route",), (0.1, 1.0))
+        for _ in range(count):
+            counter.labels("/a").inc()
+            histogram.labels("/a").observe(0.05)
+        return registry
+
+    (tmp_path / "metrics-1.json").write_text(json.dumps(registry_with(2).collect()))
+    (tmp_path / "metrics-2.json").write_text(json.dumps(registry_with(3).collect()))
+    exporter = MetricsExporter(registry_with(1), str(tmp_path))
+
+    text = exporter.exposition()
+    assert 'test_requests_total{route="/a"} 6' in text
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 6' in text
+
+    exporter.flush()
+    assert exporter.path.exists()
+    assert 'test_requests_total{route="/a"} 6' in exporter.exposition()
+
+def test_server_start_discards_previous_snapshots(tmp_path, monkeypatch):
+    """Test run.py, which the Docker image starts, empties METRICS_DIR before the workers start"""
+    import run
+    (tmp_path / "metrics-7.json").write_text(json.dumps(MetricsRegistry().collect()))
+    (tmp_path / "metrics-8.json.tmp").write_text("{")
+    monkeypatch.setattr(run.settings, "METRICS_DIR", str(tmp_path))
+    started = []
+    monkeypatch.setattr(run.uvicorn, "run", lambda *args, **kwargs: started.append(list(tmp_path.iterdir())))
+    run.main()
+
+    assert started == [[]]
+    dockerfile = (Path(run.__file__).parent / "Dockerfile").read_text()
+    assert 'CMD ["python", "run.py"]' in dockerfile
+
+def test_label_values_are_escaped():
+    """Test quotes, backslashes and newlines in label values are escaped"""
+    registry = MetricsRegistry()
+    registry.counter("test_total", "Test", ("path",)).labels('a"b\\c\nd').inc()
+
+    assert 'test_total{path="a\\"b\\\\c\\nd"} 1' in render(merge_snapshots([registry.collect()]))
+
+def test_instrumented_calculator_times_stages(sample_parameters):
+    """Test stage wrappers record durations without changing results"""
+    histogram = MetricsRegistry().histogram("stage_seconds", "Test", ("stage",), STAGE_BUCKETS)
+    plain = TBMAdvanceRateCalculator()
+    instrumented = TBMAdvanceRateCalculator()
+    instrument_methods(instrumented, STAGE_METHODS, histogram)
+    record = ParameterRecord(**sample_parameters)
+
+    expected = plain.calculate_record(record, risk_factors=True)
+    result = instrumented.calculate_record(record, risk_factors=True)
+
+    assert result.advance_rate == expected.advance_rate
+    assert result.risk_factors == expected.risk_factors
+    for stage in STAGE_METHODS:
+        assert sum(histogram.labels(stage).snapshot()[0]) == 1
+
+    # Pickled copies (Monte Carlo workers) run the plain methods
+    copy = pickle.loads(pickle.dumps(instrumented))
+    assert "_empirical_method" not in vars(copy)
+    assert copy.calculate_record(record).advance_rate == expected.advance_rate
+
+def test_metrics_endpoint(client, sample_parameters):
+    """Test /metrics reports per-route requests, serialization time and predictions by soil type"""
+    assert client.post("/api/v1/calculate", json=sample_parameters).status_code == 200
+    client.get("/no-such-page")
+
+    response = client.get("/metrics")
+    text = response.text
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'tbm_http_requests_total{method="POST",route="/api/v1/calculate",status="200"}' in text
+    assert 'tbm_http_request_duration_seconds_count{method="POST",route="/api/v1/calculate"}' in text
+    assert 'route="<unmatched>",status="404"' in text
+    assert 'tbm_calculator_stage_duration_seconds_count{stage="serialization"}' in text
+    assert 'tbm_predicted_advance_rate_mm_per_min_count{soil_type="clay"}' in text
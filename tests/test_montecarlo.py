@@ -0,0 +1,86 @@
+import pytest
+import numpy as np
+from pydantic import ValidationError
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.montecarlo import MonteCarloEngine, sample_distribution
+from app.models.schemas import MonteCarloRequest, InputDistribution
+
+def monte_carlo_request(rock_parameters, **overrides):
+    request = {
+        "parameters": rock_parameters,
+        "distributions": {
+            "ucs": {"kind": "lognormal", "mean": 150, "std": 30},
+            "rqd": {"kind": "triangular", "low": 60, "mode": 85, "high": 100},
+            "thrust_force": {"kind": "normal", "mean": 8000, "std": 500}
+        },
+        "samples": 20000,
+        "seed": 7
+    }
+    request.update(overrides)
+    return MonteCarloRequest(**request)
+
+def test_quantiles_are_ordered(calculator: TBMAdvanceRateCalculator, rock_parameters):
+    """Test P10 <= P50 <= P90 and histogram counts cover all samples"""
+    result = MonteCarloEngine(workers=1, chunk_size=5000).simulate(calculator, monte_carlo_request(rock_parameters)).run()
+
+    for output in result["outputs"].values():
+        assert output["p10"] <= output["p50"] <= output["p90"]
+        assert sum(output["histogram_counts"]) == 20000
+        assert len(output["histogram_edges"]) == len(output["histogram_counts"]) + 1
+
+def test_seed_reproducible_across_workers(calculator: TBMAdvanceRateCalculator, rock_parameters):
+    """Test the same seed gives identical results in-process and on a process pool"""
+    request = monte_carlo_request(rock_parameters)
+    in_process = MonteCarloEngine(workers=1, chunk_size=5000).simulate(calculator, request).run()
+
+    engine = MonteCarloEngine(workers=2, chunk_size=5000)
+    try:
+        parallel = engine.simulate(calculator, request).run()
+    finally:
+        engine.shutdown()
+
+    assert parallel == in_process
+
+def test_progress_reports_every_chunk(calculator: TBMAdvanceRateCalculator, rock_parameters):
+    """Test progress yields cumulative sample counts up to the total"""
+    run = MonteCarloEngine(workers=1, chunk_size=6000).simulate(calculator, monte_carlo_request(rock_parameters))
+
+    assert list(run.progress()) == [6000, 12000, 18000, 20000]
+
+def test_fixed_inputs_give_point_distribution(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test that without distributions every sample equals the exact result"""
+    request = MonteCarloRequest(parameters=sample_parameters, distributions={}, samples=1000, seed=1)
+    result = MonteCarloEngine(workers=1).simulate(calculator, request).run()
+    exact = calculator.calculate_advance_rate(request.parameters)
+
+    assert result["outputs"]["advance_rate"]["p10"] == pytest.approx(exact.advance_rate, abs=0.005)
+    assert result["outputs"]["advance_rate"]["std"] == 0
+
+def test_lognormal_matches_requested_moments():
+    """Test lognormal samples have the requested mean and standard deviation"""
+    spec = InputDistribution(kind="lognormal", mean=150, std=30).model_dump()
+    values = sample_distribution(np.random.default_rng(0), spec, 200000)
+
+    assert values.mean() == pytest.approx(150, rel=0.01)
+    assert values.std() == pytest.approx(30, rel=0.02)
+
+def test_invalid_distributions_rejected(rock_parameters):
+    """Test incomplete distributions and unknown fields fail validation"""
+    with pytest.raises(ValidationError):
+        InputDistribution(kind="triangular", low=1, high=5, mode=7)
+    with pytest.raises(ValidationError):
+        monte_carlo_request(rock_parameters, distributions={"cutter_count": {"kind": "uniform", "low": 1, "high": 2}})
+
+def test_monte_carlo_endpoint_streams_progress(client, rock_parameters):
+    """Test the endpoint streams progress lines before the result"""
+    body = monte_carlo_request(rock_parameters, samples=2000).model_dump(mode="json")
+    response = client.post("/api/v1/montecarlo?progress=true", json=body)
+
+    assert response.status_code == 200
+    lines = [line for line in response.text.splitlines() if line]
+    assert '"progress"' in lines[0]
+    assert '"result"' in lines[-1]
+
+    plain = client.post("/api/v1/montecarlo", json=body).json()
+    assert plain["seed"] == 7
+    assert set(plain["outputs"]) == {"advance_rate", "daily_advance"}
@@ -0,0 +1,68 @@
+import math
+import pytest
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.optimizer import OperatingPointOptimizer
+from app.models.schemas import OptimizationRequest, TBMParameters
+
+def required_power(thrust, speed, diameter, coefficient=0.1):
+    return coefficient * thrust * diameter / 3 * 2 * math.pi * speed / 60
+
+def test_optimum_respects_limits(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test the optimum stays within installed power, energy ceiling and machine limits"""
+    request = OptimizationRequest(
+        parameters=sample_parameters, max_specific_energy=40, max_thrust_force=30000, max_cutterhead_speed=4
+    )
+    optimum = OperatingPointOptimizer(calculator, request).optimize()["optimum"]
+
+    assert optimum["feasible"]
+    assert optimum["thrust_force"] <= 30000
+    assert optimum["cutterhead_speed"] <= 4
+    assert optimum["specific_energy"] <= 40
+    assert required_power(optimum["thrust_force"], optimum["cutterhead_speed"], 6.2) <= 2000 + 1
+
+def test_optimum_beats_grid_and_current(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test the refined optimum is at least as fast as every feasible grid point"""
+    request = OptimizationRequest(parameters=sample_parameters, grid_points=11)
+    result = OperatingPointOptimizer(calculator, request).optimize()
+    surface = result["surface"]
+
+    feasible_rates = [
+        rate
+        for rates, feasible in zip(surface["advance_rate"], surface["feasible"])
+        for rate, ok in zip(rates, feasible) if ok
+    ]
+    assert result["optimum"]["advance_rate"] >= max(feasible_rates)
+    assert result["optimum"]["advance_rate"] >= result["current"]["advance_rate"]
+    assert result["evaluations"] > 11 * 11
+
+def test_optimum_matches_scalar_calculation(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test the reported optimum reproduces with a scalar calculation"""
+    request = OptimizationRequest(parameters=sample_parameters)
+    optimum = OperatingPointOptimizer(calculator, request).optimize()["optimum"]
+    params = TBMParameters(**{
+        **sample_parameters,
+        "thrust_force": optimum["thrust_force"],
+        "cutterhead_speed": optimum["cutterhead_speed"]
+    })
+
+    assert calculator.calculate_advance_rate(params).advance_rate == pytest.approx(optimum["advance_rate"], abs=0.02)
+
+def test_infeasible_limits_raise(calculator: TBMAdvanceRateCalculator, rock_parameters):
+    """Test an unreachable specific energy ceiling is reported as an error"""
+    request = OptimizationRequest(parameters=rock_parameters, max_specific_energy=1)
+
+    with pytest.raises(ValueError):
+        OperatingPointOptimizer(calculator, request).optimize()
+
+def test_optimize_endpoint(client, sample_parameters):
+    """Test the optimisation endpoint returns the optimum and surface"""
+    response = client.post("/api/v1/optimize", json={"parameters": sample_parameters, "grid_points": 9})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["surface"]["advance_rate"]) == 9
+    assert len(body["surface"]["advance_rate"][0]) == 9
+    assert body["optimum"]["feasible"]
+
+    response = client.post("/api/v1/optimize", json={"parameters": sample_parameters, "max_specific_energy": 0.01})
+    assert response.status_code == 400
@@ -0,0 +1,58 @@
+import json
+from app.core.config import settings
+from app.routers.calculator import calculator_service
+from app.services.profiling import RequestProfiler
+
+def test_profiled_calculation_returns_stage_breakdown(client, sample_parameters):
+    """Test ?profile=stages returns the result next to per-stage timings"""
+    plain = client.post("/api/v1/calculate", json=sample_parameters).json()
+    response = client.post("/api/v1/calculate?profile=stages", json=sample_parameters)
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["result"] == plain
+    stages = {stage["stage"]: stage for stage in data["profile"]["stages"]}
+    for name in ("empirical", "theoretical", "regression", "risk_factors", "serialization", "other"):
+        assert stages[name]["calls"] == 1
+    assert "cprofile" not in data["profile"]
+    assert "empirical;dur=" in response.headers["server-timing"]
+    assert "total;dur=" in response.headers["server-timing"]
+
+def test_cprofile_header_and_saved_report(client, sample_parameters, tmp_path, monkeypatch):
+    """Test X-Profile: cprofile adds top functions and saves the report when PROFILE_DIR is set"""
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    response = client.post("/api/v1/calculate", json=sample_parameters, headers={"X-Profile": "cprofile"})
+    profile = response.json()["profile"]
+
+    assert any("calculate_advance_rate" in row["function"] for row in profile["cprofile"])
+    assert json.loads(open(profile["saved_to"]).read())["mode"] == "cprofile"
+    assert len(list(tmp_path.glob("*.prof"))) == 1
+
+def test_profiled_batch_appends_profile_line(client, sample_parameters, rock_parameters):
+    """Test a profiled batch ends with one profile line covering the batch stages"""
+    items = [sample_parameters, {"tbm_diameter": 100}, rock_parameters]
+    lines = [json.loads(line) for line in
+             client.post("/api/v1/calculate/batch?profile=stages", json=items).text.splitlines()]
+
+    assert [line["index"] for line in lines[:3]] == [0, 1, 2]
+    stages = {stage["stage"]: stage["calls"] for stage in lines[3]["profile"]["stages"]}
+    assert stages["validation"] == 1
+    assert stages["empirical"] == 1
+    # Risk codes for the whole chunk in one vectorized call
+    assert stages["risk_factors"] == 1
+
+def test_profiling_can_be_disabled(client, sample_parameters, monkeypatch):
+    """Test the profile flag is ignored when profiling is switched off"""
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+    response = client.post("/api/v1/calculate?profile=stages", json=sample_parameters)
+
+    assert "profile" not in response.json()
+    assert "server-timing" not in response.headers
+
+def test_profiler_leaves_shared_calculator_untouched(sample_parameters):
+    """Test profiling instruments a copy, not the calculator serving other requests"""
+    before = dict(vars(calculator_service))
+    profiled = RequestProfiler().calculator(calculator_service)
+
+    assert vars(calculator_service) == before
+    assert profiled.regression is calculator_service.regression
@@ -0,0 +1,109 @@
+import random
+import pytest
+from app.services.calculator import TBMAdvanceRateCalculator, result_from_record, parameters_to_columns
+from app.services.regression import RegressionModel
+from app.models.records import ParameterRecord
+from app.models.schemas import TBMParameters
+
+def test_record_path_matches_validated_path(calculator: TBMAdvanceRateCalculator, rock_parameters):
+    """Test the fast path gives the same result as calculate_advance_rate"""
+    params = TBMParameters(**rock_parameters)
+    expected = calculator.calculate_advance_rate(params)
+    record = calculator.calculate_record(ParameterRecord.from_parameters(params), risk_factors=True)
+    raw = calculator.calculate_record(ParameterRecord(**rock_parameters))
+
+    assert result_from_record(record) == expected
+    assert raw.advance_rate == record.advance_rate
+
+def test_records_use_slots(sample_parameters):
+    """Test records have no per-instance dict"""
+    record = ParameterRecord(**sample_parameters)
+
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(AttributeError):
+        record.cutter_count = 40
+
+def test_risk_factors_only_on_request(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test risk factors are skipped unless requested"""
+    record = ParameterRecord(**sample_parameters)
+
+    assert calculator.calculate_record(record).risk_factors is None
+    assert "overall_risk_level" in calculator.calculate_record(record, risk_factors=True).risk_factors
+
+def test_record_conversions(sample_parameters):
+    """Test conversion to and from TBMParameters and field replacement"""
+    params = TBMParameters(**sample_parameters)
+    record = ParameterRecord.from_parameters(params)
+
+    assert record.to_parameters() == params
+    faster = record.replace(thrust_force=20000)
+    assert faster.thrust_force == 20000
+    assert record.thrust_force == 15000
+    with pytest.raises(TypeError):
+        record.replace(cutter_count=40)
+
+def test_records_feed_batch_engine(calculator: TBMAdvanceRateCalculator, sample_parameters, rock_parameters):
+    """Test records can be transposed into batch columns"""
+    records = [ParameterRecord(**sample_parameters), ParameterRecord(**rock_parameters)]
+    metrics = calculator.calculate_batch(parameters_to_columns(records))
+
+    for i, record in enumerate(records):
+        assert metrics["advance_rate"][i] == pytest.approx(calculator.calculate_record(record).advance_rate, rel=1e-12)
+
+def test_recalculate_matches_full_calculation(calculator: TBMAdvanceRateCalculator, sample_parameters,
+                                              rock_parameters):
+    """Test partial recomputation equals calculate_record after random changes, with and without risk"""
+    rng = random.Random(1)
+    changes = [
+        ("cutterhead_speed", 0.5, 6), ("thrust_force", 2000, 40000), ("depth", 5, 120),
+        ("water_pressure", 0, 8), ("ucs", 20, 250), ("rqd", 10, 100), ("temperature", 0, 40),
+        ("tbm_diameter", 2, 14), ("cutterhead_power", 500, 8000)
+    ]
+    for base in (sample_parameters, rock_parameters):
+        record = ParameterRecord(**base)
+        staged = calculator.calculate_staged(record)
+        for _ in range(200):
+            name, low, high = rng.choice(changes)
+            record = record.replace(**{name: round(rng.uniform(low, high), 3)})
+            risk = rng.random() < 0.5
+            staged = calculator.recalculate(staged, record, risk_factors=risk)
+            assert repr(staged.record) == repr(calculator.calculate_record(record, risk))
+            assert ("risk_factors" in staged.stages) == risk
+
+def test_recalculate_reruns_dependent_stages(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test only stages reading a changed field rerun, and risk factors rerun when first requested"""
+    record = ParameterRecord(**sample_parameters)
+    staged = calculator.calculate_staged(record)
+    assert staged.recomputed == ("empirical", "theoretical", "regression", "method_weights")
+
+    faster = calculator.recalculate(staged, record.replace(cutterhead_speed=3.0))
+    assert "empirical" not in faster.recomputed and "theoretical" in faster.recomputed
+    assert calculator.recalculate(faster, record.replace(cutterhead_speed=3.0, temperature=25)).record is faster.record
+    assert calculator.recalculate(faster, faster.params, risk_factors=True).recomputed == ("risk_factors",)
+    # The earlier result's stage outputs are left untouched
+    assert staged.stages["theoretical"] == calculator._theoretical_method(record)
+
+def test_recalculate_reruns_regression_after_reload(sample_parameters, tmp_path):
+    """Test a regression model reload reruns the regression stage"""
+    path = tmp_path / "model.json"
+    calculator = TBMAdvanceRateCalculator(str(path))
+    calculator.regression.check_interval = 0
+    record = ParameterRecord(**sample_parameters)
+    staged = calculator.calculate_staged(record)
+
+    RegressionModel(10.0, [0.0] * 6).save(str(path))
+    reloaded = calculator.recalculate(staged, record)
+
+    assert reloaded.recomputed == ("regression",)
+    assert reloaded.stages["regression"] == 10.0
+    assert repr(reloaded.record) == repr(calculator.calculate_record(record))
+
+@pytest.mark.parametrize("field,values", [
+    ("cutterhead_speed", [1.0, 2.0, 3.5]), ("ucs", [30, 90, 180]), ("temperature", [5, 20, 35])
+])
+def test_sweep_record_matches_full_calculation(calculator: TBMAdvanceRateCalculator, rock_parameters, field, values):
+    """Test a one-parameter sweep equals a full calculation per value"""
+    base = ParameterRecord(**rock_parameters)
+    for risk in (False, True):
+        expected = [calculator.calculate_record(base.replace(**{field: value}), risk) for value in values]
+        assert [repr(r) for r in calculator.sweep_record(base, field, values, risk)] == [repr(r) for r in expected]
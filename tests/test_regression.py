@@ -0,0 +1,115 @@
+import json
+import pytest
+import numpy as np
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.regression import (
+    RegressionModel, RegressionModelStore, fit_ridge, read_drive_records, regression_features
+)
+from app.services.cache import ResultCache
+from app.models.schemas import TBMParameters
+from app.core.config import settings
+import train_regression
+
+def synthetic_records(path, rows=400, seed=0):
+    """Write drive records generated from known coefficients plus noise"""
+    rng = np.random.default_rng(seed)
+    soils = ["clay", "sand", "gravel", "mixed"]
+    resistance = {"clay": 0.6, "sand": 0.4, "gravel": 0.7, "mixed": 1.0}
+    lines = ["tbm_diameter,cutterhead_power,thrust_force,cutterhead_speed,depth,soil_type,advance_rate"]
+    for _ in range(rows):
+        d, p, f = rng.uniform(4, 10), rng.uniform(1000, 6000), rng.uniform(5000, 40000)
+        n, z, soil = rng.uniform(1, 4), rng.uniform(5, 60), soils[rng.integers(4)]
+        x = regression_features(d, p, f, n, z, resistance[soil])
+        rate = 3.0 + np.dot([-0.5, 0.1, 0.01, 1.0, 2.0, -3.0], x) + rng.normal(0, 0.05)
+        lines.append(f"{d},{p},{f},{n},{z},{soil},{rate}")
+    lines.append("6.0,,15000,2.5,15,clay,10")  # incomplete row is skipped
+    path.write_text("\n".join(lines))
+
+def test_default_model_matches_original_coefficients(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test the built-in coefficients reproduce the original regression formula"""
+    params = TBMParameters(**sample_parameters)
+    area = np.pi * (6.2/2)**2
+    expected = (2.5 - 0.8 * 6.2 + 0.15 * 2000 / area + 0.008 * 15000 / area
+                + 1.2 * 2.5 + 3.0 / (1 + 15 * 0.01) - 2.1 * 0.6)
+
+    assert calculator._regression_method(params) == pytest.approx(max(0.5, min(expected, 45.0)))
+
+def test_batch_and_scalar_predictions_are_identical():
+    """Test matrix and single-vector predictions sum the terms in the same order"""
+    model = RegressionModel(2.5, [-0.8, 0.15, 0.008, 1.2, 3.0, -2.1])
+    features = np.random.default_rng(3).uniform([1, 1, 1, 0.1, 0.3, 0.1], [20, 400, 50, 10, 1, 2], size=(2000, 6))
+
+    assert model.predict(features).tolist() == [model.predict_one(row) for row in features.tolist()]
+
+def test_ridge_recovers_coefficients(calculator: TBMAdvanceRateCalculator, tmp_path):
+    """Test ridge regression recovers the generating coefficients"""
+    path = tmp_path / "drives.csv"
+    synthetic_records(path)
+    with open(path) as stream:
+        features, targets = read_drive_records(stream, calculator.soil_coefficients)
+    model = fit_ridge(features, targets, alpha=1e-6)
+
+    assert len(targets) == 400
+    assert model.intercept == pytest.approx(3.0, abs=0.1)
+    assert model.weights == pytest.approx([-0.5, 0.1, 0.01, 1.0, 2.0, -3.0], abs=0.02)
+
+def test_artifact_version_is_checked(tmp_path, monkeypatch):
+    """Test artifacts round-trip and are rejected for another model version"""
+    path = tmp_path / "model.json"
+    RegressionModel(1.0, [0.1] * 6, {"alpha": 1.0}).save(str(path))
+
+    assert RegressionModel.load(str(path)).fingerprint == (1.0,) + (0.1,) * 6
+
+    monkeypatch.setattr(settings, "MODEL_VERSION", "2.0")
+    with pytest.raises(ValueError):
+        RegressionModel.load(str(path))
+
+def test_hot_reload_updates_scalar_and_batch(sample_parameters, tmp_path):
+    """Test a new artifact is picked up without recreating the calculator"""
+    path = tmp_path / "model.json"
+    calculator = TBMAdvanceRateCalculator(str(path))
+    calculator.regression.check_interval = 0
+    params = TBMParameters(**sample_parameters)
+    before = calculator._regression_method(params)
+
+    RegressionModel(10.0, [0.0] * 6).save(str(path))
+
+    assert calculator._regression_method(params) == 10.0
+    batch = calculator.calculate_batch({k: [v] for k, v in sample_parameters.items()})
+    assert batch["regression"][0] == 10.0
+    assert before != 10.0
+
+def test_broken_artifact_keeps_previous_model(tmp_path):
+    """Test an unreadable artifact leaves the current model in place"""
+    path = tmp_path / "model.json"
+    store = RegressionModelStore(str(path), check_interval=0)
+    RegressionModel(7.0, [0.0] * 6).save(str(path))
+    assert store.current().intercept == 7.0
+
+    path.write_text(json.dumps({"model_version": settings.MODEL_VERSION, "features": ["diameter"]}))
+    assert store.current().intercept == 7.0
+
+def test_reload_invalidates_result_cache(sample_parameters, tmp_path):
+    """Test cached results are dropped when the regression model changes"""
+    path = tmp_path / "model.json"
+    calculator = TBMAdvanceRateCalculator(str(path))
+    calculator.regression.check_interval = 0
+    cache = ResultCache(max_size=10)
+    params = TBMParameters(**sample_parameters)
+    first = cache.get_or_calculate(params, calculator)
+
+    RegressionModel(40.0, [0.0] * 6).save(str(path))
+    second = cache.get_or_calculate(params, calculator)
+
+    assert second.advance_rate != first.advance_rate
+    assert cache.stats()["invalidations"] == 1
+
+def test_train_command_writes_artifact(tmp_path):
+    """Test the training command fits and saves a loadable artifact"""
+    records = tmp_path / "drives.csv"
+    output = tmp_path / "model.json"
+    synthetic_records(records)
+
+    assert train_regression.main([str(records), "--output", str(output), "--alpha", "0.001"]) == 0
+    model = RegressionModel.load(str(output))
+    assert model.metadata["metrics"]["holdout"]["r2"] > 0.95
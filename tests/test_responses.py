@@ -0,0 +1,51 @@
+import gzip
+from app.core.responses import PrecomputedResponse, accepts_gzip, etag_matches
+from app.routers.calculator import example_scenarios
+
+def test_metadata_served_with_etag_and_cache_control(client):
+    """Test metadata endpoints return the same payload with caching headers"""
+    response = client.get("/api/v1/examples")
+
+    assert response.status_code == 200
+    assert response.json()[0]["parameters"]["tbm_type"] == "epb"
+    assert len(response.json()) == len(example_scenarios())
+    assert response.headers["etag"].startswith('"')
+    assert "max-age" in response.headers["cache-control"]
+
+def test_if_none_match_returns_304(client):
+    """Test a matching ETag is answered with an empty 304"""
+    for path in ("/api/v1/examples", "/api/v1/soil-types", "/api/v1/tbm-types", "/api/v1/calculation-info"):
+        etag = client.get(path).headers["etag"]
+        response = client.get(path, headers={"If-None-Match": f'W/"other", {etag}'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+def test_gzip_negotiation(client):
+    """Test gzip is only sent to clients that accept it, under its own ETag"""
+    plain = client.get("/api/v1/examples", headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/api/v1/examples", headers={"Accept-Encoding": "gzip, br"})
+
+    assert "content-encoding" not in plain.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.headers["etag"] != plain.headers["etag"]
+    assert compressed.json() == plain.json()
+
+def test_precomputed_body_is_encoded_once():
+    """Test the body and its gzip form are built at construction"""
+    response = PrecomputedResponse.json({"values": list(range(200))})
+
+    assert gzip.decompress(response.gzipped) == response.body
+    assert PrecomputedResponse.json({"small": 1}).gzipped is None
+
+def test_header_parsing():
+    """Test Accept-Encoding quality values and If-None-Match lists"""
+    assert accepts_gzip("gzip;q=0.5, br")
+    assert accepts_gzip("*")
+    assert not accepts_gzip("gzip;q=0")
+    assert not accepts_gzip("br, deflate")
+    assert etag_matches('"a", W/"b"', ('"b"', None))
+    assert etag_matches("*", ('"a"', None))
+    assert not etag_matches('"c"', ('"a"', '"a-gzip"'))
@@ -0,0 +1,66 @@
+import pytest
+import numpy as np
+from app.models.schemas import TBMParameters
+from app.services.calculator import TBMAdvanceRateCalculator, parameters_to_columns
+from app.services.risk import RiskRule, RiskRuleSet, RISK_RULES, RISK_LEVELS
+
+def test_rock_parameters_risk_code(calculator: TBMAdvanceRateCalculator, rock_parameters):
+    """Test each fired rule sets its bit and renders the readable risk on demand"""
+    params = TBMParameters(**rock_parameters)
+    risk_factors = calculator._assess_risk_factors(params)
+
+    assert risk_factors["code"] == 0b1111
+    assert risk_factors["overall_risk_level"] == "high"
+    assert list(risk_factors["risks"]) == [rule.name for rule in RISK_RULES]
+    assert risk_factors["risks"]["high_water_pressure"]["description"] == \
+        "Water pressure of 6.0 bar may cause stability issues"
+    assert risk_factors["risks"]["low_power"]["description"] == "Power density of 94.3 kW/m² may be insufficient"
+    assert len(risk_factors["recommendations"]) == 4
+
+def test_rock_only_rule_skips_soil(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test the hard rock rule ignores UCS given for soil"""
+    params = TBMParameters(**{**sample_parameters, "ucs": 250})
+    hard_rock_bit = 1 << [rule.name for rule in RISK_RULES].index("hard_rock")
+    assert not calculator.risk_rules.code(params) & hard_rock_bit
+    assert "hard_rock" not in calculator._assess_risk_factors(params)["risks"]
+
+def test_vectorized_levels_match_scalar(calculator: TBMAdvanceRateCalculator, sample_parameters, rock_parameters):
+    """Test batch codes and levels agree with the scalar assessment"""
+    params_list = [
+        TBMParameters(**{**sample_parameters, "water_pressure": water_pressure, "depth": depth})
+        for water_pressure in (0, 3, 3.5) for depth in (10, 50, 60)
+    ] + [TBMParameters(**rock_parameters), TBMParameters(**{**rock_parameters, "ucs": None, "soil_type": "mixed"})]
+    codes = calculator.calculate_batch(parameters_to_columns(params_list), risk_factors=True)["risk_code"]
+    levels = calculator.risk_rules.levels(codes)
+
+    for params, code, level in zip(params_list, codes.tolist(), levels.tolist()):
+        expected = calculator._assess_risk_factors(params)
+        assert code == expected["code"]
+        assert RISK_LEVELS[level] == expected["overall_risk_level"]
+
+def test_compact_batch_risk_factors(calculator: TBMAdvanceRateCalculator, rock_parameters):
+    """Test calculate_many returns only code and level without risk_detail"""
+    result = calculator.calculate_many([TBMParameters(**rock_parameters)], risk_detail=False)[0]
+    assert result.risk_factors == {"code": 0b1111, "overall_risk_level": "high"}
+
+def test_custom_rules():
+    """Test rules are validated and new rules need no code changes"""
+    with pytest.raises(ValueError):
+        RiskRule("bad", "depth", "!=", 1, "high", "", "")
+    with pytest.raises(ValueError):
+        RiskRule("bad", "depth", ">", 1, "severe", "", "")
+
+    rules = RiskRuleSet([RiskRule("hot", "temperature", ">=", 40, "medium", "{value} °C", "Cool the face")])
+    cols = {"soil_index": np.zeros(3, dtype=np.intp), "temperature": np.array([20.0, 40.0, 55.0])}
+    assert rules.codes(cols).tolist() == [0, 1, 1]
+    assert rules.levels(rules.codes(cols)).tolist() == [0, 1, 1]
+
+def test_risk_rules_endpoint(client, rock_parameters):
+    """Test /risk-rules decodes the risk code of a compact batch result"""
+    catalog = client.get("/api/v1/risk-rules").json()
+    line = client.post("/api/v1/calculate/batch", json=[rock_parameters]).json()
+    code = line["result"]["risk_factors"]["code"]
+
+    names = [rule["name"] for rule in catalog["rules"] if code & (1 << rule["bit"])]
+    assert names == ["high_water_pressure", "low_power", "deep_tunneling", "hard_rock"]
+    assert catalog["levels"] == ["low", "medium", "high"]
@@ -0,0 +1,57 @@
+import pytest
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.sensitivity import analyze_sensitivity
+from app.models.schemas import TBMParameters
+
+def test_sensitivity_single_batch(calculator: TBMAdvanceRateCalculator, sample_parameters, monkeypatch):
+    """Test all perturbations are evaluated in exactly one batch call"""
+    calls = []
+    original = calculator.calculate_batch
+    monkeypatch.setattr(calculator, "calculate_batch", lambda columns: calls.append(1) or original(columns))
+
+    result = analyze_sensitivity(calculator, TBMParameters(**sample_parameters))
+
+    assert len(calls) == 1
+    fields = {s["field"] for s in result["sensitivities"]}
+    assert "ucs" not in fields  # not given for clay
+    assert result["evaluations"] == 1 + 4 * len(fields)
+
+def test_elasticity_matches_finite_difference(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test the thrust elasticity against two scalar calculations"""
+    params = TBMParameters(**sample_parameters)
+    result = analyze_sensitivity(calculator, params, relative_step=0.01)
+    thrust = next(s for s in result["sensitivities"] if s["field"] == "thrust_force")
+
+    low = calculator.calculate_batch({k: [v] for k, v in {**sample_parameters, "thrust_force": 15000 * 0.99}.items()})
+    high = calculator.calculate_batch({k: [v] for k, v in {**sample_parameters, "thrust_force": 15000 * 1.01}.items()})
+    base = calculator.calculate_batch({k: [v] for k, v in sample_parameters.items()})
+    expected = (high["advance_rate"][0] - low["advance_rate"][0]) / (15000 * 0.02) * 15000 / base["advance_rate"][0]
+
+    assert thrust["elasticities"]["advance_rate"] == pytest.approx(expected, abs=1e-4)
+    assert thrust["elasticities"]["advance_rate"] > 0
+
+def test_irrelevant_input_has_zero_sensitivity(calculator: TBMAdvanceRateCalculator, sample_parameters):
+    """Test temperature, which no method uses, has zero elasticity"""
+    result = analyze_sensitivity(calculator, TBMParameters(**sample_parameters))
+    temperature = next(s for s in result["sensitivities"] if s["field"] == "temperature")
+
+    assert all(value == 0 for value in temperature["elasticities"].values())
+
+def test_tornado_sorted_and_bounded(calculator: TBMAdvanceRateCalculator, rock_parameters):
+    """Test tornado bars are sorted by swing and stay within schema bounds"""
+    params = TBMParameters(**{**rock_parameters, "rqd": 100})
+    result = analyze_sensitivity(calculator, params, tornado_step=0.2)
+
+    swings = [bar["swing"] for bar in result["tornado"]]
+    assert swings == sorted(swings, reverse=True)
+    rqd = next(bar for bar in result["tornado"] if bar["field"] == "rqd")
+    assert rqd["high_value"] == 100
+
+def test_sensitivity_endpoint(client, sample_parameters):
+    """Test the sensitivity endpoint response"""
+    response = client.post("/api/v1/sensitivity", json=sample_parameters)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert set(body["base"]) == {"advance_rate", "specific_energy", "confidence_score"}
+    assert body["tornado"][0]["swing"] >= body["tornado"][-1]["swing"]
@@ -0,0 +1,69 @@
+import os
+import zlib
+from starlette.requests import Request
+from app.core import responses
+from app.core.static import StaticAssets
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").lower().encode(), value.encode()) for name, value in headers.items()]
+    })
+
+def test_index_served_with_validators(client):
+    """Test the main page is served with ETag and Last-Modified validators"""
+    response = client.get("/")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/html; charset=utf-8"
+    assert "<html" in response.text.lower()
+    assert response.headers["etag"]
+    assert response.headers["last-modified"]
+
+    cached = client.get("/", headers={"If-Modified-Since": response.headers["last-modified"]})
+    assert cached.status_code == 304
+
+def test_static_assets_negotiate_encoding(client):
+    """Test static assets are gzipped only for clients that accept it"""
+    compressed = client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/static/app.js", headers={"Accept-Encoding": "identity"})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in plain.headers
+    assert compressed.text == plain.text
+    assert plain.headers["content-type"].endswith("javascript; charset=utf-8")
+    assert client.get("/static/../main.py").status_code == 404
+    assert client.get("/static/missing.js").status_code == 404
+
+def test_files_read_once_without_reload(tmp_path):
+    """Test assets are served from memory and only reloaded in reload mode"""
+    (tmp_path / "index.html").write_text("<p>v1</p>")
+    frozen = StaticAssets(str(tmp_path))
+    live = StaticAssets(str(tmp_path), reload=True)
+
+    (tmp_path / "index.html").write_text("<p>v2</p>")
+    os.utime(tmp_path / "index.html", (1, 1))
+    (tmp_path / "new.css").write_text("p {}")
+
+    assert frozen.get("index.html").body == b"<p>v1</p>"
+    assert frozen.get("new.css") is None
+    assert live.get("index.html").body == b"<p>v2</p>"
+    assert live.get("new.css").respond(make_request()).headers["content-type"] == "text/css; charset=utf-8"
+    assert live.get("../index.html") is None
+
+def test_brotli_preferred_when_available(tmp_path, monkeypatch):
+    """Test a brotli variant is built and preferred when the package is present"""
+    class FakeBrotli:
+        @staticmethod
+        def compress(body, quality):
+            return zlib.compress(body)
+
+    monkeypatch.setattr(responses, "brotli", FakeBrotli)
+    (tmp_path / "app.js").write_text("console.log('tbm');\n" * 100)
+    asset = StaticAssets(str(tmp_path)).get("app.js")
+
+    assert asset.respond(make_request(accept_encoding="gzip, br")).headers["content-encoding"] == "br"
+    assert asset.respond(make_request(accept_encoding="gzip, br;q=0")).headers["content-encoding"] == "gzip"
+    assert asset.respond(make_request(accept_encoding="")).headers.get("content-encoding") is None
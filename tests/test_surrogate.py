@@ -0,0 +1,93 @@
+import pytest
+import numpy as np
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.surrogate import SurrogateGrid, SurrogateService, AXES
+from app.models.schemas import TBMParameters, SoilType
+
+@pytest.fixture(scope="module")
+def grid():
+    """Small grid over a narrow range so interpolation is accurate"""
+    ranges = {
+        "tbm_diameter": (5.0, 7.0),
+        "thrust_force": (10000, 20000),
+        "cutterhead_power": (1500, 2500),
+        "cutterhead_speed": (2.0, 3.0),
+        "depth": (10, 20)
+    }
+    return SurrogateGrid.build(TBMAdvanceRateCalculator(), points=5, ranges=ranges, probes=200)
+
+def covered_parameters(**overrides):
+    params = {
+        "tbm_diameter": 6.2,
+        "tbm_type": "epb",
+        "cutterhead_power": 2000,
+        "soil_type": "clay",
+        "thrust_force": 15000,
+        "cutterhead_speed": 2.5,
+        "depth": 15
+    }
+    params.update(overrides)
+    return TBMParameters(**params)
+
+def test_grid_nodes_are_exact(grid):
+    """Test interpolation reproduces the calculator on grid nodes"""
+    params = covered_parameters(tbm_diameter=6.0, thrust_force=15000, cutterhead_power=2000, cutterhead_speed=2.5, depth=15)
+    prediction = grid.predict(params)
+    exact = TBMAdvanceRateCalculator().calculate_advance_rate(params)
+
+    assert prediction["metrics"]["advance_rate"] == pytest.approx(exact.advance_rate, abs=0.011)
+
+def test_prediction_within_error_bound(grid):
+    """Test off-node predictions stay within the reported error bound"""
+    calculator = TBMAdvanceRateCalculator()
+    params = covered_parameters()
+    prediction = grid.predict(params)
+    exact = calculator.calculate_advance_rate(params)
+
+    bound = prediction["error_bound"]["advance_rate"]
+    assert abs(prediction["metrics"]["advance_rate"] - exact.advance_rate) <= bound + 0.01
+
+def test_scalar_and_vectorized_interpolation_agree(grid):
+    """Test the single-point and batch interpolation paths"""
+    params = covered_parameters()
+    point = np.array([[getattr(params, name) for name in AXES]])
+    batch = grid.interpolate(np.array([0]), np.array([0]), point)
+
+    assert batch[0, 0] == pytest.approx(grid.predict(params)["metrics"]["advance_rate"], abs=0.005)
+
+def test_uncovered_inputs(grid):
+    """Test inputs outside the grid or its fixed context are not covered"""
+    assert grid.predict(covered_parameters(thrust_force=30000)) is None
+    assert grid.predict(covered_parameters(water_pressure=1.5)) is None
+    assert grid.predict(covered_parameters(ucs=20)) is None
+    assert grid.predict(covered_parameters(soil_type="rock_soft", ucs=50, rqd=75)) is not None
+
+def test_save_and_memory_mapped_load(grid, tmp_path):
+    """Test a saved grid loads memory-mapped with identical predictions"""
+    path = tmp_path / "grid.npy"
+    grid.save(str(path))
+    loaded = SurrogateGrid.load(str(path))
+
+    assert isinstance(loaded.values, np.memmap)
+    assert loaded.predict(covered_parameters()) == grid.predict(covered_parameters())
+
+def test_service_ignores_stale_grid(grid, tmp_path):
+    """Test a grid built for other coefficients is not used"""
+    path = tmp_path / "grid.npy"
+    grid.save(str(path))
+    service = SurrogateService(str(path))
+    calculator = TBMAdvanceRateCalculator()
+
+    assert service.predict(covered_parameters(), calculator) is not None
+
+    calculator.soil_coefficients[SoilType.CLAY] = {"k1": 0.9, "k2": 1.2, "resistance": 0.6}
+    assert service.predict(covered_parameters(), calculator) is None
+
+def test_surrogate_endpoint_falls_back_to_exact(client, sample_parameters):
+    """Test the endpoint computes exactly when asked or when not covered"""
+    response = client.post("/api/v1/calculate/surrogate?exact=true", json=sample_parameters)
+    exact = client.post("/api/v1/calculate", json=sample_parameters).json()
+
+    assert response.status_code == 200
+    assert response.json()["source"] == "exact"
+    assert response.json()["advance_rate"] == exact["advance_rate"]
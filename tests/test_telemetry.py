@@ -0,0 +1,110 @@
+import io
+import json
+import pytest
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.telemetry import TelemetryReader, TelemetryPipeline
+from app.models.schemas import TBMParameters, TelemetryContext
+
+CONTEXT = {
+    "tbm_diameter": 6.2,
+    "tbm_type": "epb",
+    "soil_type": "clay",
+    "depth": 15,
+    "water_pressure": 1.5
+}
+
+def make_log(rings: int = 4, samples_per_ring: int = 5) -> str:
+    """Build a small telemetry CSV with an idle sample during each ring build"""
+    lines = ["timestamp,Ring,Chainage_m,Thrust_kN,RPM,Power_kW,Chamber_Pressure"]
+    t = 0
+    for ring in range(1, rings + 1):
+        for i in range(samples_per_ring):
+            chainage = (ring - 1) * 1.5 + i * 0.3
+            lines.append(f"{t},{ring},{chainage:.2f},{12000 + 500 * i},{2.0 + 0.1 * ring},{1800 + 10 * i},1.2")
+            t += 1
+        lines.append(f"{t},{ring},{ring * 1.5:.2f},0,0,0,1.2")  # ring build, cutterhead stopped
+        t += 1
+    return "\n".join(lines) + "\n"
+
+def run_pipeline(log: str, chunk_size: int = 4, **kwargs):
+    calculator = TBMAdvanceRateCalculator()
+    pipeline = TelemetryPipeline(calculator, TelemetryContext(**CONTEXT), **kwargs)
+    reader = TelemetryReader(io.StringIO(log), chunk_size=chunk_size)
+    return list(pipeline.process(reader)), pipeline.summary()
+
+def test_ring_aggregates_match_scalar_calculations():
+    """Test per-ring means against scalar calculations, across chunk boundaries"""
+    log = make_log()
+    bins, summary = run_pipeline(log)
+
+    assert [b["ring"] for b in bins] == [1, 2, 3, 4]
+    assert summary == {"rows": 24, "used": 20, "skipped": 4, "bins": 4}
+
+    calculator = TBMAdvanceRateCalculator()
+    rows = [line.split(",") for line in log.splitlines()[1:]]
+    ring_rows = [r for r in rows if r[1] == "2" and float(r[4]) > 0]
+    rates = [
+        calculator.calculate_advance_rate(TBMParameters(
+            **CONTEXT, thrust_force=float(r[3]), cutterhead_speed=float(r[4]),
+            cutterhead_power=float(r[5]), chamber_pressure=float(r[6])
+        )).advance_rate
+        for r in ring_rows
+    ]
+
+    assert bins[1]["samples"] == len(ring_rows)
+    assert bins[1]["advance_rate_mean"] == pytest.approx(sum(rates) / len(rates), abs=0.01)
+    assert bins[1]["advance_rate_min"] == pytest.approx(min(rates), abs=0.01)
+
+def test_chunk_size_does_not_change_results():
+    """Test that aggregates are independent of the chunk size"""
+    log = make_log(rings=6)
+    assert run_pipeline(log, chunk_size=3)[0] == run_pipeline(log, chunk_size=1000)[0]
+
+def test_chainage_bins():
+    """Test aggregation per chainage bin"""
+    bins, _ = run_pipeline(make_log(), bin_by="chainage", bin_size=3.0)
+
+    assert [b["chainage"] for b in bins] == [0.0, 3.0]
+    assert sum(b["samples"] for b in bins) == 20
+
+def test_missing_fields_rejected():
+    """Test that fields absent from both the log and the context are reported"""
+    log = "ring,thrust\n1,12000\n"
+    with pytest.raises(ValueError, match="cutterhead_speed"):
+        run_pipeline(log)
+
+def test_custom_column_map():
+    """Test mapping nonstandard log headers onto fields"""
+    log = "RingNo,F,N,P\n1,12000,2.5,1800\n1,12500,2.5,1800\n"
+    calculator = TBMAdvanceRateCalculator()
+    pipeline = TelemetryPipeline(calculator, TelemetryContext(**CONTEXT))
+    reader = TelemetryReader(io.StringIO(log), column_map={
+        "RingNo": "ring", "F": "thrust_force", "N": "cutterhead_speed", "P": "cutterhead_power"
+    })
+
+    bins = list(pipeline.process(reader))
+    assert bins[0]["ring"] == 1
+    assert bins[0]["samples"] == 2
+
+def test_ingest_endpoint(client):
+    """Test telemetry upload endpoint streams bins and a summary"""
+    response = client.post(
+        "/api/v1/telemetry/ingest",
+        files={"file": ("drive.csv", make_log().encode(), "text/csv")},
+        data={"context": json.dumps(CONTEXT)}
+    )
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["ring"] for line in lines[:-1]] == [1, 2, 3, 4]
+    assert lines[-1]["summary"]["bins"] == 4
+
+def test_ingest_endpoint_rejects_bad_context(client):
+    """Test that an invalid context fails before streaming"""
+    response = client.post(
+        "/api/v1/telemetry/ingest",
+        files={"file": ("drive.csv", make_log().encode(), "text/csv")},
+        data={"context": json.dumps({**CONTEXT, "tbm_diameter": 50})}
+    )
+
+    assert response.status_code == 422
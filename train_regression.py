@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Regression model trainer for TBM Advance Rate Calculator
+
+Fits the regression method's coefficients by ridge least squares on
+historical drive records and writes them as a JSON artifact for the
+current MODEL_VERSION. A running API picks up the new artifact without a
+restart.
+
+The CSV needs tbm_diameter, cutterhead_power, thrust_force,
+cutterhead_speed, depth, soil_type and the observed advance_rate (mm/min).
+
+Example:
+    python train_regression.py drives.csv --alpha 1.0 --holdout 0.2
+"""
+
+import argparse
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add the app directory to Python path
+app_dir = Path(__file__).parent
+sys.path.insert(0, str(app_dir))
+
+import numpy as np
+from app.core.config import settings
+from app.services.calculator import TBMAdvanceRateCalculator
+from app.services.regression import RegressionModel, fit_ridge, evaluate_fit, read_drive_records, REGRESSION_FEATURES
+
+def main(argv=None):
+    """Fit and save the regression coefficients"""
+    parser = argparse.ArgumentParser(description="Fit regression coefficients from historical drive records")
+    parser.add_argument("records", help="CSV of historical drive records")
+    parser.add_argument("--output", "-o", default=settings.REGRESSION_MODEL_PATH, help="Model artifact path")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Ridge penalty on standardized features")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction of records held out for validation")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the holdout split")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.records, newline="") as stream:
+            features, targets = read_drive_records(stream, TBMAdvanceRateCalculator().soil_coefficients)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    order = np.random.default_rng(args.seed).permutation(len(targets))
+    split = int(len(targets) * (1 - args.holdout))
+    train, test = order[:split], order[split:]
+
+    model = fit_ridge(features[train], targets[train], alpha=args.alpha)
+    metrics = {"train": evaluate_fit(model, features[train], targets[train])}
+    if len(test):
+        metrics["holdout"] = evaluate_fit(model, features[test], targets[test])
+    baseline = evaluate_fit(RegressionModel.default(), features, targets)
+
+    model.metadata.update({
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "records": args.records,
+        "metrics": metrics
+    })
+    model.save(args.output)
+
+    print(f"✅ Saved {args.output} (model version {settings.MODEL_VERSION}, {len(train)} training records)")
+    print(f"   intercept: {model.intercept:.4f}")
+    for name, weight in zip(REGRESSION_FEATURES, model.weights):
+        print(f"   {name}: {weight:.6f}")
+    for name, values in metrics.items():
+        print(f"   {name} RMSE {values['rmse']} mm/min, R² {values['r2']}")
+    print(f"   built-in coefficients: RMSE {baseline['rmse']} mm/min, R² {baseline['r2']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())